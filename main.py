@@ -3,6 +3,7 @@ import time
 import threading
 import os
 import sys
+import multiprocessing
 from scanner.core import ScannerAPI
 
 def get_resource_path(relative_path):
@@ -60,4 +61,6 @@ def main():
     webview.start(debug=False)
 
 if __name__ == '__main__':
+    # Нужно для пула процессов анализа в собранном .exe
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
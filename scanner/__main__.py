@@ -0,0 +1,8 @@
+import sys
+import multiprocessing
+from scanner.cli import main
+
+if __name__ == '__main__':
+    # Нужно для пула процессов анализа в собранном .exe
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import os
+import time
+from typing import Dict, Any, Optional, Sequence
+from scanner.matcher import SignatureMatcher
+from scanner.sigpack import SignaturePack
+from scanner.jarinspect import JarInspector, ARCHIVE_LIMIT_VERDICT
+from scanner.hashing import quick_hash, full_sha256
+from scanner.hashdb import KnownHashDatabase
+from scanner.cancel import CancellationToken, ScanCancelled
+from scanner.telemetry import FileProfile
+
+# Версия логики анализа - входит в ключ кеша, увеличивать при изменении правил детекта
+ANALYSIS_VERSION = 8
+
+# Архив с вложенными уровнями сверх лимитов - подозрение, а не опознанный чит
+ARCHIVE_LIMIT_SEVERITY = 1
+
+# Вердикты проверки JAR по быстрому хешу (в пределах процесса)
+_jar_verdicts = {}
+_JAR_VERDICTS_LIMIT = 8192
+
+
+def match_file_name(matcher: SignatureMatcher, file_name: str, extensions: Sequence[str]) -> tuple:
+    """Проверить, является ли файл читом Minecraft по названию"""
+    file_name_lower = file_name.lower()
+
+    # Проверяем расширение
+    if not file_name_lower.endswith(tuple(extensions)):
+        return False, None
+
+    # Убираем расширение для проверки
+    name_without_ext = os.path.splitext(file_name_lower)[0]
+
+    # Один проход матчера покрывает и точные названия, и вариации с версиями
+    # (например, liquidbounce-1.8.9)
+    cheat_name = matcher.first(name_without_ext)
+    if cheat_name:
+        return True, cheat_name
+
+    return False, None
+
+
+def inspect_jar(matcher: SignatureMatcher, file_path: str,
+                metadata_matcher: Optional[SignatureMatcher] = None,
+                cancel: Optional[CancellationToken] = None,
+                profile: Optional[FileProfile] = None,
+                class_matcher: Optional[SignatureMatcher] = None) -> Optional[str]:
+    """Проверить имена записей, метаданные и байткод JAR файла на наличие маркеров читов"""
+    if not file_path.lower().endswith('.jar'):
+        return None
+
+    started = time.perf_counter()
+    try:
+        # Разбираем только центральный каталог, без ZipInfo на каждую запись
+        return JarInspector(
+            matcher, metadata_matcher=metadata_matcher, cancel=cancel, class_matcher=class_matcher
+        ).inspect(file_path)
+    except ScanCancelled:
+        # Отмена не должна превращаться в вердикт "чисто"
+        raise
+    except Exception as e:
+        # Повреждённый или нечитаемый архив считаем чистым, но ошибку учитываем
+        if profile is not None:
+            profile.error('jar', e)
+    finally:
+        if profile is not None:
+            profile.add('jar', time.perf_counter() - started)
+
+    return None
+
+
+def _cached_jar_verdict(pack: SignaturePack, file_path: str, content_key: Optional[str],
+                        cancel: Optional[CancellationToken] = None,
+                        profile: Optional[FileProfile] = None) -> Optional[str]:
+    """Проверка JAR с запоминанием вердикта по быстрому хешу (копии одного мода)"""
+    if content_key is None:
+        return inspect_jar(pack.entry_matcher, file_path, pack.metadata_matcher, cancel, profile, pack.class_matcher)
+
+    key = (content_key, pack.version)
+    if key not in _jar_verdicts:
+        if len(_jar_verdicts) >= _JAR_VERDICTS_LIMIT:
+            _jar_verdicts.clear()
+        _jar_verdicts[key] = inspect_jar(
+            pack.entry_matcher, file_path, pack.metadata_matcher, cancel, profile, pack.class_matcher
+        )
+    return _jar_verdicts[key]
+
+
+def analyze_file(pack: SignaturePack, file_path: str, file_size: int,
+                 extensions: Sequence[str], hash_dbs: Sequence[KnownHashDatabase] = (),
+                 cancel: Optional[CancellationToken] = None,
+                 profile: Optional[FileProfile] = None) -> Dict[str, Any]:
+    """Проанализировать содержимое файла (без проверки процессов)
+
+    Функция не трогает состояние ScannerAPI, поэтому её можно
+    выполнять в отдельном процессе. При отмене выбрасывает ScanCancelled.
+    В profile (если передан) записываются время этапов и ошибки.
+    """
+    started = time.perf_counter()
+    # Быстрый хеш (начало + конец + размер) - ключ дедупликации
+    try:
+        content_key = quick_hash(file_path, file_size, cancel)
+    except OSError as e:
+        content_key = None
+        if profile is not None:
+            profile.error('hash', e)
+
+    file_name = os.path.basename(file_path)
+    sha256_hash = None
+
+    # Сначала базы известных сборок: ловят переименованные читы
+    is_threat, threat_type = False, None
+    for hash_db in hash_dbs:
+        try:
+            if sha256_hash is not None:
+                # SHA-256 уже посчитан для предыдущей базы - не читаем файл повторно
+                threat_type = hash_db.lookup_sha256(sha256_hash) if hash_db.might_contain(content_key) else None
+            else:
+                threat_type, sha256_hash = hash_db.check_file(file_path, content_key, cancel)
+        except OSError as e:
+            if profile is not None:
+                profile.error('hash', e)
+            continue
+        if threat_type is not None:
+            is_threat = True
+            break
+    if profile is not None:
+        profile.add('hash', time.perf_counter() - started)
+
+    # Проверяем по названию
+    if not is_threat:
+        match_started = time.perf_counter()
+        is_threat, threat_type = match_file_name(pack.name_matcher, file_name, extensions)
+        if profile is not None:
+            profile.add('match', time.perf_counter() - match_started)
+
+    # Если не обнаружено по названию, проверяем содержимое JAR
+    if not is_threat and file_path.lower().endswith('.jar'):
+        jar_threat = _cached_jar_verdict(pack, file_path, content_key, cancel, profile)
+        if jar_threat:
+            is_threat = True
+            threat_type = jar_threat
+
+    # Полный SHA-256 считаем только для подозрительных файлов
+    if is_threat and sha256_hash is None:
+        hash_started = time.perf_counter()
+        try:
+            sha256_hash = full_sha256(file_path, cancel)
+        except OSError as e:
+            if profile is not None:
+                profile.error('hash', e)
+        if profile is not None:
+            profile.add('hash', time.perf_counter() - hash_started)
+
+    # Уровень угрозы задаётся в пакете сигнатур
+    if not is_threat:
+        threat_level = 0
+    elif threat_type == ARCHIVE_LIMIT_VERDICT:
+        threat_level = ARCHIVE_LIMIT_SEVERITY
+    else:
+        threat_level = pack.severity(threat_type)
+
+    return {
+        'path': file_path,
+        'name': file_name,
+        'size': file_size,
+        'hash': sha256_hash,
+        'quickHash': content_key,
+        'isThreat': is_threat,
+        'threatLevel': threat_level,
+        'threatType': threat_type if is_threat else None,
+        'scanDate': time.time(),
+        'isRunning': False
+    }
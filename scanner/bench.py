@@ -0,0 +1,725 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import zipfile
+import platform
+import struct
+import argparse
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from scanner.bytecode import CLASS_MAGIC, CONSTANT_UTF8
+
+# Формат файла результатов; увеличивать при несовместимом изменении полей
+BENCH_FORMAT = 2
+TREE_MANIFEST = 'bench_tree.json'
+TREE_HOME = 'home'
+# Состояние сканера при прогонах (пакет сигнатур, кеш) - не в домашней папке пользователя
+BENCH_STATE = '.bench_state'
+
+DEFAULT_TREE_PARAMS = {
+    'files': 100000,
+    'jar_ratio': 0.02,
+    'exe_ratio': 0.005,
+    'jar_entries': 300,
+    'templates': 32,
+    'files_per_dir': 25,
+    'max_depth': 12,
+    'cheats': 24,
+    'seed': 1,
+}
+# Описания параметров дерева для --help
+_TREE_PARAM_HELP = {
+    'files': 'total number of files',
+    'jar_ratio': 'share of clean files that are JARs',
+    'exe_ratio': 'share of clean files that are executables',
+    'jar_entries': 'typical number of entries in a clean JAR',
+    'templates': 'distinct clean JAR contents reused across the tree',
+    'files_per_dir': 'average number of files per directory',
+    'max_depth': 'maximum directory depth',
+    'cheats': 'number of planted cheats',
+    'seed': 'random seed; the same parameters and seed give the same tree',
+}
+
+# Словарь для имён чистых файлов и записей JAR; слова, совпадающие с сигнатурами, отбрасываются
+_WORDS = [
+    'core', 'util', 'render', 'network', 'common', 'config', 'mixin', 'model', 'texture',
+    'sound', 'world', 'block', 'item', 'entity', 'biome', 'recipe', 'gui', 'screen', 'loader',
+    'api', 'event', 'data', 'storage', 'energy', 'fluid', 'magic', 'tech', 'farm', 'tools',
+    'chest', 'map', 'shader', 'font', 'lang', 'tweak', 'compat', 'helper', 'library', 'extra',
+]
+_NOISE_EXTENSIONS = ['.txt', '.dll', '.png', '.json', '.log', '.dat', '.ogg', '.cfg', '.class', '.zip']
+_PLANT_KINDS = ('name', 'entry', 'manifest', 'exe', 'bytecode')
+
+
+def _load_signatures():
+    from scanner.sigpack import BUNDLED_PACK, SignaturePack, load_source_pack
+    revision, signatures = load_source_pack(BUNDLED_PACK)
+    return SignaturePack(revision, signatures)
+
+
+def build_class(strings: Iterable[str], padding: bytes = b'') -> bytes:
+    """Минимальный class-файл с заданными Utf8 константами (для синтетических JAR)"""
+    pool = bytearray()
+    count = 1
+    for value in strings:
+        encoded = value.encode('utf-8')
+        pool += struct.pack('>BH', CONSTANT_UTF8, len(encoded)) + encoded
+        count += 1
+    # minor 0, major 52 (Java 8); остальное тело класса не разбирается
+    return CLASS_MAGIC + struct.pack('>HHH', 0, 52, count) + bytes(pool) + padding
+
+
+class TreeGenerator:
+    """Воспроизводимое синтетическое дерево: домашняя папка с Minecraft и глубокой вложенностью
+
+    Одинаковые параметры и seed дают одинаковые имена, размеры и содержимое.
+    Чистые JAR собираются из нескольких шаблонов с сотнями записей, читы
+    подкладываются пяти видов: по имени файла, по записям JAR, по
+    манифесту, .exe по имени и обфусцированные JAR с маркером в байткоде.
+    """
+
+    def __init__(self, root: str, params: Dict[str, Any]):
+        self.root = root
+        self.home = os.path.join(root, TREE_HOME)
+        self.params = {**DEFAULT_TREE_PARAMS, **params}
+        self.rng = random.Random(self.params['seed'])
+        self.pack = _load_signatures()
+        self.words = [word for word in _WORDS if not self._matches(word)]
+        # Общий пул байтов для содержимого файлов (срезы по случайному смещению)
+        self.pool = self.rng.randbytes(1 << 20)
+        self.files = 0
+        self.bytes = 0
+        self.candidates = 0
+        self.planted: List[Dict[str, str]] = []
+        self.jar_templates: List[bytes] = []
+
+    def _matches(self, text: str) -> bool:
+        text = text.lower()
+        return bool(self.pack.name_matcher.first(text) or self.pack.entry_matcher.first(text)
+                    or self.pack.metadata_matcher.first(text) or self.pack.class_matcher.first(text))
+
+    def _clean_name(self, suffix: str) -> str:
+        while True:
+            name = f'{self.rng.choice(self.words)}-{self.rng.randrange(1 << 20):x}{suffix}'
+            if not self._matches(name):
+                return name
+
+    def _payload(self, size: int) -> bytes:
+        offset = self.rng.randrange(len(self.pool) - size) if size < len(self.pool) else 0
+        return self.pool[offset:offset + size]
+
+    def _write(self, path: str, data: bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.files += 1
+        self.bytes += len(data)
+
+    @staticmethod
+    def _entry(name: str) -> zipfile.ZipInfo:
+        # Фиксированная дата записи: иначе содержимое JAR зависит от времени генерации
+        info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    def _class(self, name: str, size: int, strings: Sequence[str] = ()) -> bytes:
+        """Класс с правдоподобным пулом констант; половина тела - повторяющиеся байты,
+        поэтому сжимается примерно как настоящий байткод"""
+        pool = [name[:-len('.class')], 'java/lang/Object', '<init>', '()V', 'Code', 'LineNumberTable']
+        pool += [f'{self.rng.choice(self.words)}{index}' for index in range(self.rng.randint(4, 24))]
+        pool += strings
+        return build_class(pool, self._payload(size // 2) + b'\0' * (size // 2))
+
+    def _build_jar(self, entries: int, extra_entries: Sequence[str] = (), manifest_extra: str = '',
+                   class_strings: Sequence[str] = ()) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as jar:
+            jar.writestr(self._entry('META-INF/MANIFEST.MF'),
+                         f'Manifest-Version: 1.0\r\nCreated-By: bench\r\n{manifest_extra}\r\n')
+            vendor = self.rng.choice(self.words)
+            mod = self.rng.choice(self.words)
+            for index in range(entries):
+                package = '/'.join(self.rng.choice(self.words) for _ in range(self.rng.randint(1, 3)))
+                name = f'com/{vendor}/{mod}/{package}/C{index}.class'
+                if self._matches(name):
+                    continue
+                jar.writestr(self._entry(name), self._class(name, self.rng.randint(200, 2000)))
+            for name in extra_entries:
+                jar.writestr(self._entry(name), self._class(name, 512))
+            if class_strings:
+                # Обфусцированные имена: сборку выдают только строки в пуле констант
+                name = 'a/a/a.class'
+                jar.writestr(self._entry(name), self._class(name, 1024, class_strings))
+        return buffer.getvalue()
+
+    def _make_dirs(self) -> Dict[str, List[str]]:
+        """Директории по областям: папки Minecraft, Загрузки/Рабочий стол и глубокие данные"""
+        minecraft = os.path.join(self.home, '.minecraft')
+        areas = {
+            'mods': [os.path.join(minecraft, 'mods')],
+            'versions': [os.path.join(minecraft, 'versions', f'1.{minor}.{patch}')
+                         for minor in (8, 12, 16, 20) for patch in (0, 2)],
+            'user': [os.path.join(self.home, 'Downloads'), os.path.join(self.home, 'Desktop')],
+            'data': [os.path.join(self.home, 'data')],
+        }
+
+        # Глубокая вложенность: новая директория чаще продолжает последнюю цепочку
+        data_dirs = areas['data']
+        depths = {data_dirs[0]: 0}
+        count = max(1, self.params['files'] // self.params['files_per_dir'])
+        while len(data_dirs) < count:
+            parent = data_dirs[-1] if self.rng.random() < 0.3 else self.rng.choice(data_dirs)
+            if depths[parent] >= self.params['max_depth']:
+                parent = data_dirs[0]
+            path = os.path.join(parent, f'{self.rng.choice(self.words)}{len(data_dirs)}')
+            depths[path] = depths[parent] + 1
+            data_dirs.append(path)
+
+        for dirs in areas.values():
+            for path in dirs:
+                os.makedirs(path, exist_ok=True)
+        return areas
+
+    def _plant(self, index: int, directory: str):
+        kind = _PLANT_KINDS[index % len(_PLANT_KINDS)]
+        with_entries = [signature for signature in self.pack.signatures if signature.entry_patterns]
+        with_markers = [signature for signature in self.pack.signatures if signature.manifest_markers]
+        with_class_markers = [signature for signature in self.pack.signatures if signature.class_markers]
+
+        if kind == 'entry' and with_entries:
+            signature = self.rng.choice(with_entries)
+            pattern = signature.entry_patterns[0]
+            data = self._build_jar(self.params['jar_entries'] // 4, [f'{pattern}Main.class', f'{pattern}module/Module.class'])
+            name = self._clean_name('.jar')
+        elif kind == 'manifest' and with_markers:
+            signature = self.rng.choice(with_markers)
+            data = self._build_jar(self.params['jar_entries'] // 4,
+                                   manifest_extra=f'Main-Class: {signature.manifest_markers[0]}.Main\r\n')
+            name = self._clean_name('.jar')
+        elif kind == 'bytecode' and with_class_markers:
+            signature = self.rng.choice(with_class_markers)
+            data = self._build_jar(self.params['jar_entries'] // 4,
+                                   class_strings=[f'https://{signature.class_markers[0]}/api'])
+            name = self._clean_name('.jar')
+        else:
+            signature = self.rng.choice(self.pack.signatures)
+            if kind == 'exe':
+                data = b'MZ' + self._payload(self.rng.randint(16, 256) * 1024)
+                name = f'{signature.key}-loader-{index}.exe'
+            else:
+                data = self.rng.choice(self.jar_templates)
+                name = f'{signature.key}-{self.rng.randint(1, 9)}.{index}.jar'
+
+        path = os.path.join(directory, name)
+        self._write(path, data)
+        self.candidates += 1
+        self.planted.append({
+            'path': os.path.relpath(path, self.root),
+            'kind': kind,
+            'signature': signature.name
+        })
+
+    def generate(self) -> Dict[str, Any]:
+        started = time.time()
+        areas = self._make_dirs()
+        self.jar_templates = [self._build_jar(self.rng.randint(self.params['jar_entries'] // 2, self.params['jar_entries'] * 2))
+                              for _ in range(self.params['templates'])]
+
+        # Читы - в mods, в Загрузках и в глубине данных
+        plant_dirs = areas['mods'] + areas['user'] + areas['data']
+        for index in range(self.params['cheats']):
+            directory = plant_dirs[index % 3] if index % 4 else self.rng.choice(areas['data'])
+            self._plant(index, directory)
+
+        for index in range(max(0, self.params['files'] - self.params['cheats'])):
+            roll = self.rng.random()
+            if roll < self.params['jar_ratio']:
+                area = self.rng.choices(('mods', 'versions', 'user', 'data'), (40, 5, 10, 45))[0]
+                directory = self.rng.choice(areas[area])
+                self._write(os.path.join(directory, self._clean_name('.jar')), self.rng.choice(self.jar_templates))
+                self.candidates += 1
+            elif roll < self.params['jar_ratio'] + self.params['exe_ratio']:
+                directory = self.rng.choice(areas['user'] + areas['data'])
+                data = b'MZ' + self._payload(self.rng.randint(16, 512) * 1024)
+                self._write(os.path.join(directory, self._clean_name('.exe')), data)
+                self.candidates += 1
+            else:
+                directory = self.rng.choice(areas['data'])
+                extension = self.rng.choice(_NOISE_EXTENSIONS)
+                self._write(os.path.join(directory, f'f{index}{extension}'), self._payload(self.rng.randint(0, 8192)))
+
+        manifest = {
+            'format': BENCH_FORMAT,
+            'params': self.params,
+            'files': self.files,
+            'bytes': self.bytes,
+            'candidates': self.candidates,
+            'planted': self.planted,
+            'generated_in': round(time.time() - started, 2),
+        }
+        with open(os.path.join(self.root, TREE_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def load_tree_manifest(root: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(root, TREE_MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_tree(root: str, params: Optional[Dict[str, Any]] = None, force: bool = False) -> Dict[str, Any]:
+    """Создать дерево (или взять готовое с теми же параметрами)"""
+    params = {**DEFAULT_TREE_PARAMS, **(params or {})}
+    manifest = load_tree_manifest(root)
+    if manifest and manifest.get('params') == params and manifest.get('format') == BENCH_FORMAT and not force:
+        return manifest
+    if manifest is not None or os.path.exists(os.path.join(root, TREE_HOME)):
+        if not force:
+            raise ValueError(f'{root} already holds a tree with different parameters (use --force)')
+        shutil.rmtree(os.path.join(root, TREE_HOME), ignore_errors=True)
+        shutil.rmtree(os.path.join(root, BENCH_STATE), ignore_errors=True)
+
+    os.makedirs(root, exist_ok=True)
+    return TreeGenerator(root, params).generate()
+
+
+def quick_roots(home: str):
+    """Корни быстрого режима для синтетической домашней папки"""
+    from scanner.modes import QuickScanStrategy
+
+    overrides = {
+        'HOME': home,
+        'USERPROFILE': home,
+        'APPDATA': home,
+        'XDG_DATA_HOME': os.path.join(home, '.local', 'share'),
+    }
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        return QuickScanStrategy().roots()
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 4),
+        'p50_ms': round(percentile(0.50), 4),
+        'p95_ms': round(percentile(0.95), 4),
+        'max_ms': round(ordered[-1] * 1000, 4),
+    }
+
+
+def _peak_rss() -> Dict[str, Optional[int]]:
+    """Пиковое потребление памяти (байты) процесса и его дочерних процессов анализа"""
+    try:
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return {
+            'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            'peak_rss_children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+        }
+    except ImportError:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return {'peak_rss': getattr(memory, 'peak_wset', memory.rss), 'peak_rss_children': None}
+
+
+def run_once(tree: str, mode: str, workers: Optional[int], warm: bool = False, sample: int = 200) -> Dict[str, Any]:
+    """Один прогон в текущем процессе (вызывается в отдельном процессе ради чистого пикового RSS)"""
+    from scanner import analysis
+    from scanner.core import ScannerAPI
+    from scanner.walker import ParallelWalker, ScanRoot
+
+    manifest = load_tree_manifest(tree)
+    if manifest is None:
+        raise ValueError(f'No benchmark tree in {tree} (run "generate" first)')
+    home = os.path.join(tree, TREE_HOME)
+
+    if mode == 'quick':
+        roots = quick_roots(home)
+    elif mode == 'custom':
+        roots = [ScanRoot(home, None)]
+    else:
+        raise ValueError(f'Unsupported benchmark mode: {mode}')
+
+    api = ScannerAPI()
+    api.analysis_workers = workers
+    api.precount_files = False
+    api.use_scan_cache = warm
+
+    # Обход отдельно: время листинга и список кандидатов для замеров отдельных этапов
+    candidates = []
+    started = time.perf_counter()
+    walker = ParallelWalker(workers=api.walker_workers, skip_dir=api._should_skip_dir, file_filter=api._is_candidate)
+    walker.walk(roots, lambda entry: candidates.append(entry.path))
+    walk_elapsed = time.perf_counter() - started
+
+    if warm:
+        # Прогрев кеша: измеряется повторный (инкрементальный) проход
+        api.run_scan(mode, roots)
+
+    started = time.perf_counter()
+    result = api.run_scan(mode, roots)
+    scan_elapsed = time.perf_counter() - started
+    if not result['success']:
+        raise RuntimeError(result['message'])
+    memory = _peak_rss()
+    done_bytes = api.progress.done_bytes if api.progress else 0
+    telemetry = api.telemetry.snapshot()
+
+    planted = {os.path.join(tree, item['path']) for item in manifest['planted']}
+    expected = {path for path in planted if any(os.path.commonpath([path, root.path]) == root.path for root in roots)}
+    detected = {record.path for record in api.results.threats()}
+
+    # Отдельные этапы на выборке кандидатов (в этом процессе, без пула)
+    stages = {
+        'walk': {'elapsed': round(walk_elapsed, 4), 'files': len(candidates)},
+        'scan': {'elapsed': round(scan_elapsed, 4), 'files': result['scanned']},
+    }
+    rng = random.Random(0)
+    sampled = rng.sample(sorted(candidates), min(sample, len(candidates)))
+    analysis._jar_verdicts.clear()
+    timings = {'match_name': [], 'jar_inspect': [], 'scan_file': []}
+    for path in sampled:
+        name = os.path.basename(path)
+        started = time.perf_counter()
+        api.is_minecraft_cheat(path, name)
+        timings['match_name'].append(time.perf_counter() - started)
+        if name.lower().endswith('.jar'):
+            started = time.perf_counter()
+            api.check_jar_manifest(path)
+            timings['jar_inspect'].append(time.perf_counter() - started)
+    analysis._jar_verdicts.clear()
+    for path in sampled:
+        started = time.perf_counter()
+        api.scan_file(path)
+        timings['scan_file'].append(time.perf_counter() - started)
+    for stage, samples in timings.items():
+        stages[stage] = _latency_summary(samples)
+
+    return {
+        'mode': mode,
+        'workers': 'auto' if workers is None else workers,
+        'cache': 'warm' if warm else 'cold',
+        'roots': len(roots),
+        'files': result['scanned'],
+        'bytes': done_bytes,
+        'elapsed': round(scan_elapsed, 4),
+        'files_per_s': round(result['scanned'] / scan_elapsed, 2) if scan_elapsed else 0,
+        'bytes_per_s': round(done_bytes / scan_elapsed, 2) if scan_elapsed else 0,
+        'threats': result['threats'],
+        'planted_expected': len(expected),
+        'planted_detected': len(expected & detected),
+        'signature_version': api.signature_pack.version,
+        **memory,
+        'stages': stages,
+        # Профиль самого сканирования (время этапов суммируется по потокам и процессам)
+        'telemetry': {
+            'stages': telemetry['stages'],
+            'file_latency': telemetry['file_latency'],
+            'dir_latency': telemetry['dir_latency'],
+            'errors': sum(error['count'] for error in telemetry['errors']),
+        },
+    }
+
+
+def _run_subprocess(tree: str, mode: str, workers: Optional[int], warm: bool, sample: int) -> Dict[str, Any]:
+    command = [sys.executable, '-m', 'scanner.bench', 'run-one', tree, '--mode', mode,
+               '--workers', 'auto' if workers is None else str(workers), '--sample', str(sample)]
+    if warm:
+        command.append('--warm')
+
+    state = os.path.join(tree, BENCH_STATE)
+    os.makedirs(state, exist_ok=True)
+    env = dict(os.environ, HOME=state, USERPROFILE=state)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'Benchmark run failed ({mode}, workers={workers}):\n{completed.stderr.strip()}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmark(tree: str, modes: Sequence[str], workers: Sequence[Optional[int]],
+                  cache: bool = False, repeat: int = 1, sample: int = 200,
+                  on_run=None) -> Dict[str, Any]:
+    """Полный прогон: режимы x число процессов (x холодный/тёплый кеш) x повторы"""
+    from scanner import __version__
+    from scanner.analysis import ANALYSIS_VERSION
+
+    manifest = load_tree_manifest(tree)
+    if manifest is None:
+        raise ValueError(f'No benchmark tree in {tree} (run "generate" first)')
+
+    runs = []
+    for mode in modes:
+        for worker_count in workers:
+            for warm in ((False, True) if cache else (False,)):
+                for index in range(repeat):
+                    run = _run_subprocess(tree, mode, worker_count, warm, sample)
+                    run['repeat'] = index
+                    runs.append(run)
+                    if on_run:
+                        on_run(run)
+
+    return {
+        'format': BENCH_FORMAT,
+        'created_at': time.time(),
+        'scanner_version': __version__,
+        'analysis_version': ANALYSIS_VERSION,
+        'machine': machine_info(),
+        'tree': {key: manifest[key] for key in ('params', 'files', 'bytes', 'candidates')},
+        'runs': runs,
+    }
+
+
+def _collect_jars(paths: Sequence[str]) -> List[str]:
+    jars = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, _, names in os.walk(path):
+                jars.extend(os.path.join(dir_path, name) for name in names if name.lower().endswith('.jar'))
+        else:
+            jars.append(path)
+    return sorted(jars)
+
+
+def _zipfile_baseline(pack, file_path: str) -> Optional[str]:
+    """Прежняя проверка JAR через zipfile: namelist, манифест и имена записей"""
+    with zipfile.ZipFile(file_path) as jar:
+        names = jar.namelist()
+        if 'META-INF/MANIFEST.MF' in names:
+            cheat_name = pack.metadata_matcher.first(jar.read('META-INF/MANIFEST.MF').decode('utf-8', 'ignore'))
+            if cheat_name:
+                return cheat_name
+        return pack.entry_matcher.first_in_lines(names)
+
+
+def bench_jars(paths: Sequence[str], repeat: int = 3) -> Dict[str, Any]:
+    """Время проверки JAR (мс на файл): zipfile-базовая линия и JarInspector
+
+    names - только имена записей (то же, что проверяет базовая линия),
+    full - все этапы инспектора (метаданные, байткод, вложенные архивы).
+    Берётся лучший из repeat проходов, файлы читаются из кеша ОС.
+    """
+    from scanner.analysis import inspect_jar
+    from scanner.jarinspect import JarInspector, ZipCentralDirectory
+
+    jars = _collect_jars(paths)
+    if not jars:
+        raise ValueError('No JAR files to benchmark')
+    pack = _load_signatures()
+    inspector = JarInspector(pack.entry_matcher)
+
+    def names_only(file_path):
+        with open(file_path, 'rb') as f:
+            return inspector.match_entry_names(ZipCentralDirectory(f))
+
+    def full(file_path):
+        return inspect_jar(pack.entry_matcher, file_path, pack.metadata_matcher, class_matcher=pack.class_matcher)
+
+    variants = {
+        'zipfile': lambda file_path: _zipfile_baseline(pack, file_path),
+        'names': names_only,
+        'full': full,
+    }
+    timings = {}
+    for name, check in variants.items():
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            for file_path in jars:
+                try:
+                    check(file_path)
+                except Exception:
+                    # Повреждённый архив одинаково пропускается всеми вариантами
+                    pass
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = round(best / len(jars) * 1000, 3)
+
+    return {'jars': len(jars), 'ms_per_jar': timings}
+
+
+def _run_key(run: Dict[str, Any]) -> tuple:
+    return run['mode'], str(run['workers']), run['cache']
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """Сравнить два файла результатов по медианам повторов одинаковых конфигураций"""
+    def grouped(document):
+        groups = {}
+        for run in document['runs']:
+            groups.setdefault(_run_key(run), []).append(run)
+        return groups
+
+    old_groups, new_groups = grouped(old), grouped(new)
+    rows = []
+    for key in sorted(set(old_groups) & set(new_groups)):
+        old_fps = _median([run['files_per_s'] for run in old_groups[key]])
+        new_fps = _median([run['files_per_s'] for run in new_groups[key]])
+        old_rss = _median([run['peak_rss'] or 0 for run in old_groups[key]])
+        new_rss = _median([run['peak_rss'] or 0 for run in new_groups[key]])
+        change = (new_fps - old_fps) / old_fps if old_fps else 0.0
+        rows.append({
+            'mode': key[0],
+            'workers': key[1],
+            'cache': key[2],
+            'old_files_per_s': old_fps,
+            'new_files_per_s': new_fps,
+            'change': round(change, 4),
+            'rss_change': round((new_rss - old_rss) / old_rss, 4) if old_rss else 0.0,
+            'regression': change < -threshold,
+        })
+    return rows
+
+
+def _parse_workers(value: str) -> List[Optional[int]]:
+    return [None if item == 'auto' else int(item) for item in value.split(',') if item]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m scanner.bench',
+        description='Matrix Scanner benchmarks on a synthetic file tree'
+    )
+    # run-one - внутренняя команда для прогона в отдельном процессе, в справку не выводится
+    commands = parser.add_subparsers(dest='command', required=True, metavar='{generate,run,jar,compare}')
+
+    generate = commands.add_parser('generate', help='create a reproducible synthetic tree')
+    generate.add_argument('tree', help='directory for the tree')
+    for key, value in DEFAULT_TREE_PARAMS.items():
+        generate.add_argument(f'--{key.replace("_", "-")}', dest=key, type=type(value), default=value,
+                              help=f'{_TREE_PARAM_HELP[key]} (default: {value})')
+    generate.add_argument('--force', action='store_true', help='replace a tree with different parameters')
+
+    run = commands.add_parser('run', help='benchmark scan modes and worker counts')
+    run.add_argument('tree', help='directory created by "generate"')
+    run.add_argument('--modes', default='quick,custom', help='comma-separated: quick, custom (default: both)')
+    run.add_argument('--workers', default='0,auto', help='comma-separated process counts, "auto" = CPU count')
+    run.add_argument('--cache', action='store_true', help='also measure a warm incremental-cache pass')
+    run.add_argument('--repeat', type=int, default=1, help='runs per configuration (default: 1)')
+    run.add_argument('--sample', type=int, default=200, help='files sampled for per-stage latency')
+    run.add_argument('-o', '--output', default=None, help='results JSON (default: stdout)')
+
+    one = commands.add_parser('run-one')
+    one.add_argument('tree')
+    one.add_argument('--mode', default='custom')
+    one.add_argument('--workers', default='auto')
+    one.add_argument('--warm', action='store_true')
+    one.add_argument('--sample', type=int, default=200)
+
+    jar = commands.add_parser('jar', help='time JAR inspection against the zipfile baseline')
+    jar.add_argument('paths', nargs='+', help='JAR files or directories to search for them')
+    jar.add_argument('--repeat', type=int, default=3, help='passes per variant, the best one counts')
+
+    compare = commands.add_parser('compare', help='compare two results files')
+    compare.add_argument('old', help='baseline results JSON')
+    compare.add_argument('new', help='results JSON to check against the baseline')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help='files/s drop treated as a regression (default: 0.1 = 10%%)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа бенчмарков
+
+    Код выхода: 0 - успех, 2 - ошибка; compare возвращает 1, если хотя бы
+    одна конфигурация стала медленнее порога.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return _run_command(args)
+    except (ValueError, RuntimeError, OSError) as e:
+        sys.stderr.write(f'{e}\n')
+        return 2
+
+
+def _run_command(args: argparse.Namespace) -> int:
+    if args.command == 'generate':
+        params = {key: getattr(args, key) for key in DEFAULT_TREE_PARAMS}
+        manifest = generate_tree(args.tree, params, force=args.force)
+        sys.stderr.write(f'{manifest["files"]} files, {manifest["candidates"]} candidates, '
+                         f'{manifest["bytes"] / 1024 / 1024:.1f} MB, {len(manifest["planted"])} planted cheats\n')
+        return 0
+
+    if args.command == 'run-one':
+        workers = _parse_workers(args.workers)[0]
+        print(json.dumps(run_once(args.tree, args.mode, workers, args.warm, args.sample)))
+        return 0
+
+    if args.command == 'jar':
+        results = bench_jars(args.paths, args.repeat)
+        for name, value in results['ms_per_jar'].items():
+            print(f'{name:>8}: {value:.3f} ms/jar ({results["jars"]} jars)')
+        return 0
+
+    if args.command == 'run':
+        def on_run(run):
+            sys.stderr.write(f'{run["mode"]:>6} workers={run["workers"]!s:<4} {run["cache"]}: '
+                             f'{run["files_per_s"]:.0f} files/s, {run["bytes_per_s"] / 1024 / 1024:.1f} MB/s, '
+                             f'peak RSS {(run["peak_rss"] or 0) / 1024 / 1024:.0f} MB, '
+                             f'planted {run["planted_detected"]}/{run["planted_expected"]}\n')
+
+        results = run_benchmark(args.tree, args.modes.split(','), _parse_workers(args.workers),
+                                cache=args.cache, repeat=args.repeat, sample=args.sample, on_run=on_run)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        return 0
+
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    rows = compare_results(old, new, args.threshold)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f'{row["mode"]:>6} workers={row["workers"]:<4} {row["cache"]}: '
+              f'{row["old_files_per_s"]:.0f} -> {row["new_files_per_s"]:.0f} files/s '
+              f'({row["change"]:+.1%}), RSS {row["rss_change"]:+.1%}{flag}')
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import struct
+from typing import Iterable, List
+
+CLASS_MAGIC = b'\xca\xfe\xba\xbe'
+# magic, minor, major, constant_pool_count
+CLASS_HEADER_SIZE = 10
+
+CONSTANT_UTF8 = 1
+CONSTANT_LONG = 5
+CONSTANT_DOUBLE = 6
+
+# Размер тела константы (без байта тега) для всех тегов, кроме Utf8
+_CONSTANT_SIZES = {
+    3: 4,   # Integer
+    4: 4,   # Float
+    5: 8,   # Long
+    6: 8,   # Double
+    7: 2,   # Class
+    8: 2,   # String
+    9: 4,   # Fieldref
+    10: 4,  # Methodref
+    11: 4,  # InterfaceMethodref
+    12: 4,  # NameAndType
+    15: 3,  # MethodHandle
+    16: 2,  # MethodType
+    17: 4,  # Dynamic
+    18: 4,  # InvokeDynamic
+    19: 2,  # Module
+    20: 2,  # Package
+}
+
+# Лимит на пул констант одного класса (обычно - единицы килобайт)
+DEFAULT_MAX_POOL_SIZE = 256 * 1024
+
+
+class ClassFormatError(Exception):
+    """Запись не является корректным class-файлом"""
+
+
+def read_constant_strings(chunks: Iterable[bytes], max_size: int = DEFAULT_MAX_POOL_SIZE) -> tuple:
+    """Строковые (Utf8) константы класса из потока байтов
+
+    Читается только заголовок и пул констант: итератор chunks дальше
+    не запрашивается, поэтому код методов не распаковывается. В Utf8
+    лежат имена классов и пакетов, имена и дескрипторы методов и полей,
+    строковые литералы и значения аннотаций (в том числе цели миксинов).
+    Возвращает (список строк, число прочитанных байтов).
+    """
+    chunks = iter(chunks)
+    data = bytearray()
+
+    def ensure(size: int):
+        while len(data) < size:
+            if size > max_size:
+                raise ClassFormatError('Constant pool is too large')
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ClassFormatError('Truncated class file')
+            data.extend(chunk)
+
+    ensure(CLASS_HEADER_SIZE)
+    if data[:4] != CLASS_MAGIC:
+        raise ClassFormatError('Bad class file magic')
+    count = struct.unpack_from('>H', data, 8)[0]
+
+    strings: List[bytes] = []
+    pos = CLASS_HEADER_SIZE
+    index = 1
+    while index < count:
+        # Тег и два байта тела есть у любой константы
+        ensure(pos + 3)
+        tag = data[pos]
+        if tag == CONSTANT_UTF8:
+            length = struct.unpack_from('>H', data, pos + 1)[0]
+            end = pos + 3 + length
+            ensure(end)
+            strings.append(bytes(data[pos + 3:end]))
+            pos = end
+        else:
+            size = _CONSTANT_SIZES.get(tag)
+            if size is None:
+                raise ClassFormatError(f'Unknown constant pool tag {tag}')
+            pos += 1 + size
+            # Long и Double занимают две ячейки пула
+            if tag in (CONSTANT_LONG, CONSTANT_DOUBLE):
+                index += 1
+        index += 1
+
+    return strings, pos
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class ScanCache:
+    """Постоянный кеш результатов сканирования (SQLite в режиме WAL)
+
+    Для каждого файла хранится (size, mtime, inode), хеш и вердикт.
+    Файл с неизменным stat и той же версией сигнатур повторно не читается.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, signature_version: str = ''):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser('~'), '.matrix_scanner', 'scan_cache.db')
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.db_path = db_path
+        self.signature_version = signature_version
+        # Счётчики меняются под _lock: get вызывается из нескольких потоков
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                signature_version TEXT NOT NULL,
+                hash TEXT,
+                quick_hash TEXT,
+                is_threat INTEGER NOT NULL,
+                threat_type TEXT,
+                threat_level INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            )
+        ''')
+
+        # Старые базы создавались без колонки быстрого хеша
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(files)')}
+        if 'quick_hash' not in columns:
+            self._conn.execute('ALTER TABLE files ADD COLUMN quick_hash TEXT')
+        self._conn.commit()
+
+    @staticmethod
+    def _stat_key(file_stats: os.stat_result) -> Tuple[int, int, int]:
+        # На Windows DirEntry.stat() отдаёт st_ino = 0, тогда сравниваются только size и mtime
+        return file_stats.st_size, file_stats.st_mtime_ns, file_stats.st_ino
+
+    def get(self, file_path: str, file_stats: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Получить закешированный результат, если файл не менялся"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, inode, signature_version, hash, is_threat, '
+                'threat_type, threat_level, scanned_at, quick_hash FROM files WHERE path = ?',
+                (file_path,)
+            ).fetchone()
+
+            if row is None or row[:3] != self._stat_key(file_stats) or row[3] != self.signature_version:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return {
+            'path': file_path,
+            'name': os.path.basename(file_path),
+            'size': row[0],
+            'hash': row[4],
+            'quickHash': row[9],
+            'isThreat': bool(row[5]),
+            'threatLevel': row[7],
+            'threatType': row[6],
+            'scanDate': row[8],
+            'isRunning': False
+        }
+
+    def put_many(self, entries: List[Tuple[Dict[str, Any], os.stat_result]]):
+        """Сохранить пачку результатов (result, stat) одной транзакцией"""
+        rows = [
+            (
+                result['path'], *self._stat_key(file_stats), self.signature_version,
+                result['hash'], result.get('quickHash'), int(result['isThreat']), result['threatType'],
+                result['threatLevel'], result['scanDate']
+            )
+            for result, file_stats in entries
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, signature_version, '
+                'hash, quick_hash, is_threat, threat_type, threat_level, scanned_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Очистить кеш"""
+        with self._lock:
+            self._conn.execute('DELETE FROM files')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
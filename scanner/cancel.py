@@ -0,0 +1,41 @@
+import os
+import multiprocessing
+
+
+class ScanCancelled(Exception):
+    """Сканирование остановлено или поставлено на паузу"""
+
+
+class CancellationToken:
+    """Флаг отмены, который проверяется внутри долгих операций
+
+    Основан на multiprocessing.Event и передаётся процессам анализа при
+    создании пула, поэтому отмена видна и при хешировании/распаковке
+    в другом процессе. В процессе, создавшем флаг, проверяется обычный
+    флаг без межпроцессной синхронизации; в любом другом (и при fork,
+    когда копия не проходит через pickle) - Event.
+    """
+
+    def __init__(self):
+        self._event = multiprocessing.Event()
+        self._cancelled = False
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        return {'_event': self._event, '_cancelled': False, '_pid': None}
+
+    def cancel(self):
+        self._cancelled = True
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._cancelled:
+            return True
+        if self._pid != os.getpid() and self._event.is_set():
+            self._cancelled = True
+        return self._cancelled
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise ScanCancelled()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+from typing import Any, Dict, List, Optional
+from scanner.walker import ScanRoot
+
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.expanduser('~'), '.matrix_scanner', 'scan_checkpoint.json')
+
+
+class ScanCheckpoint:
+    """Точка продолжения приостановленного сканирования
+
+    frontier - необойдённые директории (очереди обходчика и директории,
+    листинг которых прервался), pending_files - найденные, но не
+    проверенные файлы, processed - уже проверенные файлы из прерванных
+    директорий (их не нужно проверять повторно при новом листинге).
+    roots - корни исходного сканирования с ограничениями глубины: по ним
+    восстанавливаются режим custom и правила .matrixignore.
+    """
+
+    def __init__(self,
+                 mode: str,
+                 frontier: List[ScanRoot],
+                 pending_files: List[str],
+                 processed: List[str],
+                 stats: Dict[str, int],
+                 threats: List[Dict[str, Any]],
+                 total_files: int = 0,
+                 total_bytes: int = 0,
+                 done_bytes: int = 0,
+                 elapsed: float = 0.0,
+                 created_at: Optional[float] = None,
+                 roots: Optional[List[ScanRoot]] = None):
+        self.mode = mode
+        self.frontier = frontier
+        self.pending_files = pending_files
+        self.processed = processed
+        self.stats = stats
+        self.threats = threats
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.done_bytes = done_bytes
+        self.elapsed = elapsed
+        self.created_at = created_at or time.time()
+        self.roots = list(roots or [])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': CHECKPOINT_VERSION,
+            'mode': self.mode,
+            'frontier': [[root.path, root.max_depth] for root in self.frontier],
+            'pending_files': self.pending_files,
+            'processed': self.processed,
+            'stats': self.stats,
+            'threats': self.threats,
+            'total_files': self.total_files,
+            'total_bytes': self.total_bytes,
+            'done_bytes': self.done_bytes,
+            'elapsed': self.elapsed,
+            'created_at': self.created_at,
+            'roots': [[root.path, root.max_depth] for root in self.roots]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScanCheckpoint':
+        return cls(
+            data['mode'],
+            [ScanRoot(path, depth) for path, depth in data['frontier']],
+            data['pending_files'],
+            data['processed'],
+            data['stats'],
+            data['threats'],
+            data.get('total_files', 0),
+            data.get('total_bytes', 0),
+            data.get('done_bytes', 0),
+            data.get('elapsed', 0.0),
+            data.get('created_at'),
+            [ScanRoot(path, depth) for path, depth in data.get('roots', [])]
+        )
+
+    def save(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        """Записать точку продолжения (атомарно, через временный файл)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CHECKPOINT_PATH) -> Optional['ScanCheckpoint']:
+        """Прочитать точку продолжения; None - её нет или она несовместима"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != CHECKPOINT_VERSION:
+            return None
+
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def discard(path: str = DEFAULT_CHECKPOINT_PATH):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
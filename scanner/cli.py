@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import signal
+import argparse
+from typing import List, Optional
+from scanner.core import ScannerAPI
+from scanner.modes import SCAN_STRATEGIES
+from scanner.watch import WATCH_BACKENDS
+from scanner.sinks import NDJSONSink, TextSink
+from scanner.exclude import parse_size, read_ignore_file
+from scanner.export import EXPORT_FORMATS, EXPORT_COMPRESSIONS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m scanner',
+        description='Matrix Scanner - headless Minecraft cheat scan'
+    )
+    parser.add_argument('roots', nargs='*',
+                        help='directories to scan (overrides --mode roots)')
+    parser.add_argument('-m', '--mode', default='quick', choices=sorted(SCAN_STRATEGIES),
+                        help='scan mode when no roots are given (default: quick)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='analysis processes (default: CPU count, 0 - analyse in-process)')
+    parser.add_argument('--walkers', type=int, default=None,
+                        help='directory walker threads (default: 4 x CPU count, max 32)')
+    parser.add_argument('-f', '--format', default='ndjson', choices=('ndjson', 'text'),
+                        help='output format (default: ndjson)')
+    parser.add_argument('--all', action='store_true',
+                        help='report clean files too, not only threats')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ignore the incremental scan cache')
+    parser.add_argument('--no-precount', action='store_true',
+                        help='skip the file counting pass')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='only print warnings and errors to the log')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue the scan paused earlier (Ctrl+C pauses a running scan)')
+    parser.add_argument('--update-signatures', action='store_true',
+                        help='download changed signature chunks before scanning')
+    parser.add_argument('--signature-source', default=None,
+                        help='signature update source: HTTP mirror, file:// URL or directory')
+    parser.add_argument('--watch', action='store_true',
+                        help='after the scan keep watching the roots (or Minecraft folders) '
+                             'for new files until Ctrl+C')
+    parser.add_argument('--watch-backend', default=None, choices=sorted(WATCH_BACKENDS),
+                        help='file watch backend (default: best available)')
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help='write scan telemetry in Prometheus text format after the scan')
+    parser.add_argument('--export', default=None, metavar='PATH',
+                        help='write a report after the scan (threats, or all files with --all)')
+    parser.add_argument('--export-format', default=None, choices=sorted(EXPORT_FORMATS),
+                        help='report format (default: by extension, e.g. .csv, .sarif, .mxr)')
+    parser.add_argument('--export-compression', default=None, choices=sorted(EXPORT_COMPRESSIONS),
+                        help='compress the report (default: by extension, e.g. .ndjson.gz)')
+    parser.add_argument('-x', '--exclude', action='append', default=[], metavar='PATTERN',
+                        help='exclude paths matching a gitignore-style pattern (repeatable, "!" re-includes)')
+    parser.add_argument('--exclude-from', action='append', default=[], metavar='FILE',
+                        help='read exclude patterns from a file (one per line)')
+    parser.add_argument('--no-default-excludes', action='store_true',
+                        help='do not skip system folders (Windows, /proc, node_modules, ...)')
+    parser.add_argument('--min-size', type=parse_size, default=None, metavar='SIZE',
+                        help='skip files smaller than SIZE (e.g. 4K)')
+    parser.add_argument('--max-size', type=parse_size, default=None, metavar='SIZE',
+                        help='skip files larger than SIZE (e.g. 200M)')
+    parser.add_argument('--max-age', type=float, default=None, metavar='DAYS',
+                        help='only scan files modified in the last DAYS days')
+    parser.add_argument('--max-io-rate', type=parse_size, default=None, metavar='SIZE',
+                        help='read at most SIZE bytes per second (e.g. 20M)')
+    parser.add_argument('--max-file-rate', type=float, default=None, metavar='N',
+                        help='analyse at most N files per second')
+    parser.add_argument('--adaptive-throttle', action='store_true',
+                        help='slow down while disk latency or CPU load from other programs is high')
+    parser.add_argument('--low-priority', action='store_true',
+                        help='run walker threads and analysis processes at low CPU and I/O priority')
+    return parser
+
+
+def write_metrics(api: ScannerAPI, path: str):
+    """Записать метрики атомарно (textfile collector может читать файл в любой момент)"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(api.get_metrics())
+    os.replace(temp_path, path)
+
+
+def watch(api: ScannerAPI, roots: List[str], backend: Optional[str]) -> int:
+    """Наблюдение за файлами до Ctrl+C"""
+    result = api.start_watch(roots or None, backend)
+    if not result['success']:
+        sys.stderr.write(f'{result["message"]}\n')
+        return 2
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.stop_watch()
+
+    return 1 if api.results.counts()[1] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI
+
+    Код выхода: 0 - чисто, 1 - найдены угрозы, 2 - ошибка,
+    3 - сканирование приостановлено (продолжить: --resume).
+    С --watch код выхода учитывает и угрозы, найденные наблюдением.
+    """
+    args = build_parser().parse_args(argv)
+
+    api = ScannerAPI()
+    api.analysis_workers = args.workers
+    api.walker_workers = args.walkers
+    api.use_scan_cache = not args.no_cache
+    api.precount_files = not args.no_precount
+    if args.signature_source:
+        api.updater.signature_source = args.signature_source
+
+    patterns = [] if args.no_default_excludes else list(api.exclude_patterns)
+    for path in args.exclude_from:
+        if not os.path.isfile(path):
+            sys.stderr.write(f'Exclude file not found: {path}\n')
+            return 2
+        patterns.extend(read_ignore_file(path))
+    patterns.extend(args.exclude)
+    exclusions = api.set_exclusions(patterns, min_size=args.min_size, max_size=args.max_size,
+                                    max_age_days=args.max_age)
+    if not exclusions['success']:
+        sys.stderr.write(f'{exclusions["message"]}\n')
+        return 2
+
+    io_limits = api.set_io_limits(args.max_io_rate, args.max_file_rate,
+                                  adaptive=args.adaptive_throttle, low_priority=args.low_priority)
+    if not io_limits['success']:
+        sys.stderr.write(f'{io_limits["message"]}\n')
+        return 2
+
+    if args.format == 'ndjson':
+        api.add_sink(NDJSONSink(include_clean=args.all, verbose=not args.quiet))
+    else:
+        api.add_sink(TextSink(include_clean=args.all, verbose=not args.quiet))
+
+    if args.update_signatures:
+        update = api.update_signatures()
+        if not update['success']:
+            sys.stderr.write(f'{update.get("error") or update.get("message")}\n')
+            return 2
+
+    def on_interrupt(signum, frame):
+        # Первый Ctrl+C ставит сканирование на паузу, повторный прерывает сразу
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        api.pause_scan()
+
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    try:
+        result = api.run_scan(args.mode, args.roots or None, resume=args.resume)
+    except KeyboardInterrupt:
+        api.stop_scan()
+        return 2
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    if not result['success']:
+        sys.stderr.write(f'{result["message"]}\n')
+        return 2
+
+    if args.metrics:
+        try:
+            write_metrics(api, args.metrics)
+        except OSError as e:
+            sys.stderr.write(f'Failed to write metrics: {e}\n')
+
+    if args.export:
+        export = api.export_results(args.export, args.export_format, args.export_compression,
+                                    'all' if args.all else 'threats')
+        if not export['success']:
+            sys.stderr.write(f'{export["message"]}\n')
+
+    if result['paused']:
+        return 3
+
+    if args.watch:
+        return watch(api, args.roots, args.watch_backend)
+
+    return 1 if result['threats'] else 0
@@ -1,15 +1,31 @@
 import os
+import re
 from updater import AutoUpdater
 import time
 import hashlib
-import random
 import threading
 import psutil
-import webview
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import platform
-import zipfile
+from scanner.sigpack import SignaturePack, SignaturePackLoader, load_source_pack
+from scanner.walker import ParallelWalker, ScanRoot
+from scanner.pipeline import ScanPipeline
+from scanner.analysis import match_file_name, inspect_jar, analyze_file, ANALYSIS_VERSION
+from scanner.cache import ScanCache
+from scanner.hashdb import KnownHashDatabase
+from scanner.processes import ProcessIndex
+from scanner.sinks import ScanSink, WebviewSink
+from scanner.progress import ProgressTracker, count_candidates
+from scanner.cancel import CancellationToken
+from scanner.checkpoint import ScanCheckpoint, DEFAULT_CHECKPOINT_PATH
+from scanner.results import ScanRecord, ResultStore
+from scanner.watch import FileWatcher, create_watch_backend
+from scanner.telemetry import ScanTelemetry
+from scanner.throttle import IOGovernor, lower_priority
+from scanner.export import export_records, ExportError, EXPORT_FILE_TYPES
+from scanner.exclude import ExclusionMatcher, DEFAULT_EXCLUDES, IGNORE_FILE, max_age_filter
+from scanner.modes import ScanStrategy, CustomScanStrategy, get_scan_strategy, get_all_system_directories, SCAN_STRATEGIES
 
 class ScannerAPI:
     """API для поиска читов Minecraft"""
@@ -17,96 +33,32 @@ class ScannerAPI:
     
     def __init__(self):
         self.window = None
+        # Получатели событий сканирования (окно, консоль, файл)
+        self.sinks: List[ScanSink] = []
         self.scanning = False
         self.scan_thread = None
+        # Токен отмены текущего сканирования (проверяется и внутри хеширования/чтения JAR)
+        self.cancel_token = None
+        # Пауза: при остановке сохраняется точка продолжения
+        self._pause_requested = False
+        self.checkpoint_path = DEFAULT_CHECKPOINT_PATH
+        self._resume_processed = []
+        # Корни текущего сканирования (при продолжении - исходного), сохраняются в точке продолжения
+        self._scan_roots: List[ScanRoot] = []
         self.files_to_scan = []
-        self.found_threats = []
-        self.stats = {
-            'scanned': 0,
-            'threats': 0,
-            'clean': 0,
-            'start_time': None
-        }
+        # Результаты и счётчики: пишет поток сканирования, читают и меняют вызовы из UI
+        self.results = ResultStore()
+        # Профиль последнего сканирования: время этапов, медленные файлы и папки, ошибки
+        self.telemetry = ScanTelemetry()
         
         
-        # Список известных читов для Minecraft (точные названия)
-        self.minecraft_cheats = {
-            # Популярные читы
-            'liquidbounce': 'LiquidBounce',
-            'nursultan': 'Nursultan',
-            'excellent': 'Excellent',
-            'expensive': 'Expensive',
-            'delta': 'Delta',
-            'wexside': 'Wexside',
-            'celestial': 'Celestial',
-            'wurst': 'Wurst',
-            'impact': 'Impact',
-            'meteor': 'Meteor Client',
-            
-            # Другие известные читы
-            'aristois': 'Aristois',
-            'sigma': 'Sigma',
-            'flux': 'Flux',
-            'lambda': 'Lambda',
-            'inertia': 'Inertia',
-            'ares': 'Ares',
-            'wolfram': 'Wolfram',
-            'pyro': 'Pyro',
-            'rusherhack': 'RusherHack',
-            'future': 'Future',
-            'konas': 'Konas',
-            'salhack': 'SalHack',
-            'phobos': 'Phobos',
-            'kamihack': 'KamiHack',
-            'creepy salhack': 'Creepy SalHack',
-            'earthhack': 'EarthHack',
-            'gamesense': 'GameSense',
-            'kami blue': 'Kami Blue',
-            'zenith': 'Zenith',
-            'abyss': 'Abyss',
-            'bleachhack': 'BleachHack',
-            'valhalla': 'Valhalla',
-            'devil': 'Devil',
-            'xulu': 'Xulu',
-            'remix': 'Remix',
-            'vonware': 'Vonware',
-            'thunderhack': 'ThunderHack',
-            'banana': 'Banana',
-            'catalyst': 'Catalyst',
-            'backdoored': 'Backdoored',
-            'forgehax': 'ForgeHax',
-            'huzuni': 'Huzuni',
-            'nodus': 'Nodus',
-            'wizardhax': 'WizardHax',
-            'xray': 'XRay',
-            'mineplex': 'Mineplex',
-            'vape': 'Vape',
-            'entropy': 'Entropy',
-            'azura': 'Azura',
-            'atlas': 'Atlas',
-            'vertex': 'Vertex',
-            'astolfo': 'Astolfo',
-            'exhibition': 'Exhibition',
-            'rise': 'Rise',
-            'novoline': 'Novoline',
-            'suicide': 'Suicide',
-            'jello': 'Jello',
-            'winterware': 'Winterware',
-            'crypt': 'Crypt',
-            'moon': 'Moon',
-            'slinky': 'Slinky',
-            'gopro': 'GoPro',
-            'lblc': 'LBLC',
-            'vestige': 'Vestige',
-            'tenacity': 'Tenacity',
-            'eject': 'Eject',
-            'rockstar': 'Rockstar',
-            'drip': 'Drip',
-            'shield': 'Shield',
-            'akrien': 'Akrien',
-            'spicy': 'Spicy',
-            'augustus': 'Augustus',
-        }
+        # Сигнатуры читов загружаются из внешнего пакета (scanner/signatures/default.json),
+        # скомпилированного в бинарный файл; пакет можно обновлять без перезапуска
+        self.signature_loader = SignaturePackLoader()
+        self.signature_pack = None
+        self.minecraft_cheats = {}
+        self.cheat_matcher = None
+        self._apply_signature_pack(self.signature_loader.load())
         
         # Расширения файлов читов
         self.cheat_extensions = ['.jar', '.exe']
@@ -114,8 +66,52 @@ class ScannerAPI:
         # Директории для сканирования ВСЕЙ СИСТЕМЫ
         self.scan_directories = self._get_all_system_directories()
         
-        # Список процессов читов для завершения
-        self.threat_processes = {}
+        # Правила исключения (glob/.gitignore) и фильтры файлов; компилируются в один матчер.
+        # Сканирование и наблюдение собирают свои матчеры с файлами .matrixignore в своих корнях
+        self.exclude_patterns = list(DEFAULT_EXCLUDES)
+        self.root_excludes: Dict[str, List[str]] = {}
+        self.min_file_size = None
+        self.max_file_size = None
+        self.max_file_age_days = None
+        self.exclusions = self._compile_exclusions()
+        # Матчер последнего сканирования (для отчёта)
+        self.scan_exclusions = self.exclusions
+        
+        # Количество потоков обхода (None - подобрать по числу ядер)
+        self.walker_workers = None
+        # Количество процессов анализа (None - по числу ядер, 0 - без пула)
+        self.analysis_workers = None
+        
+        # Бюджет чтения (байт/с и файлов/с, None - без лимита), адаптивное снижение скорости
+        # при занятом диске или CPU и низкий приоритет потоков обхода и процессов анализа
+        self.io_bytes_per_second = None
+        self.io_files_per_second = None
+        self.adaptive_throttle = False
+        self.low_priority = False
+        self.io_governor = None
+        
+        # Предварительный подсчёт файлов для реального прогресса и ETA
+        self.precount_files = True
+        self.progress = None
+        
+        # Наблюдение за появлением новых файлов (None - бэкенд выбирается автоматически)
+        self.watch_backend = None
+        self.watcher = None
+        
+        # База хешей известных сборок читов (ловит переименованные файлы)
+        self.hash_db_path = os.path.join(os.path.expanduser('~'), '.matrix_scanner', 'known_hashes.mxh')
+        self.hash_dbs: List[KnownHashDatabase] = []
+        # Базы отображены в память: наблюдение пользуется ими из своего потока, а установка
+        # пакета заменяет файл базы - замена и проверки файлов не должны пересекаться
+        self._hash_db_lock = threading.RLock()
+        
+        # Инкрементальное сканирование: неизменённые файлы берутся из кеша
+        self.use_scan_cache = True
+        self.scan_cache = None
+        self._stats_lock = threading.Lock()
+        
+        # Снимок таблицы процессов (процессы читов запоминаются в self.results)
+        self.process_index = ProcessIndex()
         self.updater = AutoUpdater(
         current_version='2.4.1',
         github_repo='nalmehelm/matrixchecker'  # ЗАМЕНИТЕ на ваш репозиторий
@@ -173,10 +169,7 @@ class ScannerAPI:
             self.log('info', f'Downloading update from {download_url}')
             
             def progress_callback(progress, downloaded, total):
-                if self.window:
-                    self.window.evaluate_js(
-                        f'updateDownloadProgress({progress:.1f}, {downloaded}, {total})'
-                    )
+                self._emit('download_progress', progress, downloaded, total)
             
             file_path = self.updater.download_update(download_url, progress_callback)
             
@@ -226,171 +219,179 @@ class ScannerAPI:
                 'error': str(e)
             }
     
-    def _get_all_system_directories(self) -> List[str]:
-        """Получить ВСЕ диски и основные директории для полного сканирования"""
-        directories = []
-        system = platform.system()
+    def update_signatures(self) -> Dict[str, Any]:
+        """Обновить сигнатуры: скачиваются только изменившиеся чанки пакета"""
+        if self.scanning:
+            return {'success': False, 'message': 'Cannot update signatures during a scan'}
         
-        if system == 'Windows':
-            # Получаем ВСЕ доступные диски
-            drives = [f"{d}:\\" for d in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' if os.path.exists(f"{d}:\\")]
+        try:
+            self.log('info', f'Checking signature updates ({self.updater.signature_source})...')
+            update_info = self.updater.check_signature_update(self.signature_pack.revision)
+            
+            if update_info.get('error'):
+                self.log('warning', f'Signature update check failed: {update_info["error"]}')
+                return {'success': False, 'error': update_info['error']}
+            
+            if not update_info.get('available'):
+                self.log('info', 'Signatures are up to date')
+                return {'success': True, 'updated': False, 'revision': self.signature_pack.revision}
+            
+            self.log('info', f'Downloading signature pack r{update_info["revision"]}: '
+                             f'{update_info["missing_chunks"]}/{update_info["chunks"]} chunk(s), '
+                             f'{update_info["download_size"] / 1024:.1f} KB')
             
-            self.log('info', f'Found {len(drives)} drive(s): {", ".join(drives)}')
+            def progress_callback(progress, downloaded, total):
+                self._emit('download_progress', progress, downloaded, total)
+            
+            file_path = self.updater.download_signature_update(update_info, progress_callback)
+            if not file_path:
+                self.log('error', 'Failed to download signature update')
+                return {'success': False, 'message': 'Signature download failed'}
             
-            # Добавляем корни всех дисков для полного сканирования
-            directories.extend(drives)
+            revision, signatures = load_source_pack(file_path)
+            # Открытый (отображённый) файл базы хешей на Windows нельзя заменить:
+            # закрываем базы на время установки, наблюдение в это время ждёт
+            with self._hash_db_lock:
+                self._release_hash_databases()
+                try:
+                    self.signature_loader.install(revision, signatures)
+                    self._refresh_signatures()
+                finally:
+                    self._load_hash_database()
             
-        elif system == 'Linux':
-            # Для Linux сканируем от корня
-            directories.append('/')
+            return {
+                'success': True,
+                'updated': True,
+                'revision': self.signature_pack.revision,
+                'signatures': len(self.signature_pack)
+            }
             
-        elif system == 'Darwin':  # macOS
-            # Для macOS сканируем основные директории
-            directories.extend(['/', '/Users', '/Applications'])
+        except Exception as e:
+            self.log('error', f'Failed to update signatures: {str(e)}')
+            return {'success': False, 'error': str(e)}
+    
+    def _apply_signature_pack(self, pack: SignaturePack):
+        """Переключиться на загруженный пакет сигнатур"""
+        self.signature_pack = pack
+        self.minecraft_cheats = pack.names
+        self.cheat_matcher = pack.name_matcher
+    
+    def _refresh_signatures(self) -> bool:
+        """Подхватить новый пакет сигнатур (изменён на диске или установлен updater'ом)"""
+        self.signature_loader.reload_if_changed()
+        pack = self.signature_loader.pack
+        if pack is self.signature_pack:
+            return False
+        
+        self._apply_signature_pack(pack)
+        self.log('info', f'Loaded signature pack r{pack.revision} ({len(pack)} signatures)')
+        return True
+    
+    def reload_signatures(self) -> Dict[str, Any]:
+        """Перечитать пакет сигнатур, если он изменился на диске"""
+        if self.scanning:
+            return {'success': False, 'message': 'Cannot reload signatures during a scan'}
+        
+        try:
+            changed = self._refresh_signatures()
+            if changed:
+                # База хешей пакета могла смениться вместе с ним (наблюдение держит старую)
+                with self._hash_db_lock:
+                    self._load_hash_database()
+        except Exception as e:
+            self.log('error', f'Failed to reload signatures: {str(e)}')
+            return {'success': False, 'error': str(e)}
+        
+        return {
+            'success': True,
+            'changed': changed,
+            'revision': self.signature_pack.revision,
+            'signatures': len(self.signature_pack)
+        }
+    
+    def _get_all_system_directories(self) -> List[str]:
+        """Получить ВСЕ диски и основные директории для полного сканирования"""
+        directories = get_all_system_directories()
+        
+        if platform.system() == 'Windows':
+            self.log('info', f'Found {len(directories)} drive(s): {", ".join(directories)}')
         
         return directories
     
     def set_window(self, window):
         """Сохранить ссылку на окно для обновления UI"""
         self.window = window
+        # События UI отправляются в окно пачками раз в кадр
+        self.add_sink(WebviewSink(window))
+    
+    def add_sink(self, sink: ScanSink):
+        """Подключить получателя событий сканирования"""
+        self.sinks.append(sink)
+    
+    def remove_sink(self, sink: ScanSink):
+        """Отключить получателя событий сканирования"""
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+    
+    def _emit(self, event: str, *args):
+        """Передать событие всем получателям"""
+        for sink in self.sinks:
+            try:
+                getattr(sink, event)(*args)
+            except Exception as e:
+                # Ошибка одного получателя не должна останавливать сканирование
+                self.telemetry.record_error('ui', None, e)
     
     def log(self, level: str, message: str):
         """Отправить лог в консоль UI"""
-        if self.window:
-            message = message.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-            self.window.evaluate_js(f'addLog("{level}", "{message}")')
+        self._emit('log', level, message)
     
     def update_stats(self):
         """Обновить статистику в UI"""
-        if self.window:
-            self.window.evaluate_js(
-                f'updateStats({self.stats["scanned"]}, {self.stats["threats"]}, {self.stats["clean"]})'
-            )
+        self._emit('stats', *self.results.counts())
     
-    def update_progress(self, current: int, total: int, file_name: str):
+    def update_progress(self, current: int, total: int, file_name: str, eta: Optional[float] = None):
         """Обновить прогресс-бар"""
-        if self.window:
-            percent = (current / total * 100) if total > 0 else 0
-            file_name = file_name.replace('\\', '\\\\').replace('"', '\\"')
-            self.window.evaluate_js(f'updateProgress({percent}, "{file_name}")')
+        percent = min(100, current / total * 100) if total > 0 else 0
+        self._emit('progress', percent, file_name, eta)
     
     def update_timer(self):
         """Обновить таймер сканирования"""
-        if self.window and self.stats['start_time']:
-            elapsed = time.time() - self.stats['start_time']
-            self.window.evaluate_js(f'updateTimer({elapsed})')
+        if self.results.start_time:
+            self._emit('timer', self.results.elapsed())
     
     def add_file_to_list(self, file_data: Dict[str, Any]):
         """Добавить файл в список UI"""
-        if self.window:
-            import json
-            file_json = json.dumps(file_data)
-            self.window.evaluate_js(f'addFileToList({file_json})')
+        self._emit('file_added', file_data)
     
     def update_file_status(self, file_id: str, status: str, result: Optional[Dict] = None):
         """Обновить статус файла в UI"""
-        if self.window:
-            import json
-            result_json = json.dumps(result) if result else 'null'
-            self.window.evaluate_js(f'updateFileStatus("{file_id}", "{status}", {result_json})')
+        self._emit('file_status', file_id, status, result)
     
     def is_minecraft_cheat(self, file_path: str, file_name: str) -> tuple:
         """Проверить, является ли файл читом Minecraft по названию"""
-        file_name_lower = file_name.lower()
-        
-        # Проверяем расширение
-        if not any(file_name_lower.endswith(ext) for ext in self.cheat_extensions):
-            return False, None
-        
-        # Убираем расширение для проверки
-        name_without_ext = os.path.splitext(file_name_lower)[0]
-        
-        # Проверяем точное совпадение с известными читами
-        for cheat_key, cheat_name in self.minecraft_cheats.items():
-            # Проверяем точное совпадение названия
-            if cheat_key == name_without_ext or cheat_key in name_without_ext:
-                return True, cheat_name
-            
-            # Проверяем вариации с версиями (например, liquidbounce-1.8.9)
-            if name_without_ext.startswith(cheat_key + '-') or \
-               name_without_ext.startswith(cheat_key + '_') or \
-               name_without_ext.startswith(cheat_key + ' '):
-                return True, cheat_name
-        
-        return False, None
+        return match_file_name(self.cheat_matcher, file_name, self.cheat_extensions)
     
     def check_jar_manifest(self, file_path: str) -> Optional[str]:
         """Проверить манифест JAR файла на наличие маркеров читов"""
-        try:
-            if not file_path.lower().endswith('.jar'):
-                return None
-            
-            with zipfile.ZipFile(file_path, 'r') as jar:
-                # Проверяем манифест
-                if 'META-INF/MANIFEST.MF' in jar.namelist():
-                    manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', errors='ignore')
-                    manifest_lower = manifest.lower()
-                    
-                    for cheat_key, cheat_name in self.minecraft_cheats.items():
-                        if cheat_key in manifest_lower:
-                            return cheat_name
-                
-                # Проверяем названия файлов внутри JAR
-                for file in jar.namelist():
-                    file_lower = file.lower()
-                    for cheat_key, cheat_name in self.minecraft_cheats.items():
-                        if cheat_key in file_lower:
-                            return cheat_name
-        except:
-            pass
-        
-        return None
-    
-    def scan_file(self, file_path: str) -> Dict[str, Any]:
+        pack = self.signature_pack
+        return inspect_jar(pack.entry_matcher, file_path, pack.metadata_matcher, class_matcher=pack.class_matcher)
+    
+    def scan_file(self, file_path: str, file_stats: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """Сканировать один файл"""
         try:
-            file_stats = os.stat(file_path)
-            file_size = file_stats.st_size
-            
-            # Вычисляем SHA256 хеш
-            sha256_hash = "calculating..."
-            try:
-                with open(file_path, 'rb') as f:
-                    content = f.read(min(file_size, 1024 * 1024))  # Первый 1MB
-                    sha256_hash = hashlib.sha256(content).hexdigest()
-            except:
-                pass
-            
-            file_name = os.path.basename(file_path)
-            
-            # Проверяем по названию
-            is_threat, threat_type = self.is_minecraft_cheat(file_path, file_name)
+            if file_stats is None:
+                file_stats = os.stat(file_path)
             
-            # Если не обнаружено по названию, проверяем содержимое JAR
-            if not is_threat and file_path.lower().endswith('.jar'):
-                jar_threat = self.check_jar_manifest(file_path)
-                if jar_threat:
-                    is_threat = True
-                    threat_type = jar_threat
+            result = analyze_file(
+                self.signature_pack, file_path, file_stats.st_size, self.cheat_extensions, self.hash_dbs
+            )
             
             # Проверяем, запущен ли процесс
-            is_running = False
-            if is_threat:
-                is_running = self.is_process_running(file_path)
-            
-            threat_level = random.randint(2, 3) if is_threat else 0
+            if result['isThreat']:
+                result['isRunning'] = self.is_process_running(file_path)
             
-            return {
-                'path': file_path,
-                'name': file_name,
-                'size': file_size,
-                'hash': sha256_hash,
-                'isThreat': is_threat,
-                'threatLevel': threat_level,
-                'threatType': threat_type if is_threat else None,
-                'scanDate': time.time(),
-                'isRunning': is_running
-            }
+            return result
             
         except Exception as e:
             self.log('error', f'Error scanning {file_path}: {str(e)}')
@@ -399,178 +400,560 @@ class ScannerAPI:
     def is_process_running(self, file_path: str) -> bool:
         """Проверить, запущен ли процесс из этого файла"""
         try:
-            file_name = os.path.basename(file_path)
-            
-            # Для .jar файлов проверяем процессы Java
-            if file_path.lower().endswith('.jar'):
-                for proc in psutil.process_iter(['name', 'cmdline']):
-                    try:
-                        cmdline = proc.info['cmdline']
-                        if cmdline and any(file_name in cmd for cmd in cmdline):
-                            if file_path not in self.threat_processes:
-                                self.threat_processes[file_path] = []
-                            self.threat_processes[file_path].append(proc.pid)
-                            return True
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-            
-            # Для .exe файлов проверяем по имени
-            elif file_path.lower().endswith('.exe'):
-                file_name_lower = file_name.lower()
-                for proc in psutil.process_iter(['name', 'exe']):
-                    try:
-                        proc_name = proc.info['name']
-                        if proc_name and proc_name.lower() == file_name_lower:
-                            if file_path not in self.threat_processes:
-                                self.threat_processes[file_path] = []
-                            self.threat_processes[file_path].append(proc.pid)
-                            return True
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
+            # Поиск по снимку таблицы процессов вместо process_iter на каждую угрозу
+            pids = self.process_index.find(file_path)
+            if pids:
+                self.results.add_processes(file_path, pids)
+                return True
         except Exception as e:
-            pass
+            self.telemetry.record_error('process', file_path, e)
         
         return False
     
-    def scan_directory_recursively(self, root_path: str, file_count_ref: list, last_update_time: list):
-        """Рекурсивное сканирование директории с обновлением прогресса"""
-        
-        # Папки которые нужно пропустить для ускорения
-        skip_dirs = {
-            'Windows', 'WinSxS', '$Recycle.Bin', 'System Volume Information',
-            'ProgramData', 'AppData\\Local\\Temp', 'node_modules', '.git',
-            'Program Files\\Windows', 'Program Files (x86)\\Windows'
+    def _should_skip_dir(self, dir_path: str) -> bool:
+        """Проверить, нужно ли пропустить директорию"""
+        return self.exclusions.excludes_dir(dir_path)
+    
+    def _accept_file(self, file_path: str, file_stats: os.stat_result) -> bool:
+        """Файл проходит правила исключения и фильтры по размеру и дате"""
+        return self.exclusions.accepts_file(file_path, file_stats)
+    
+    def _compile_exclusions(self, roots: List[str] = ()) -> ExclusionMatcher:
+        """Скомпилировать правила исключения (с файлами .matrixignore в roots)"""
+        return ExclusionMatcher.for_roots(
+            roots,
+            self.exclude_patterns,
+            self.root_excludes,
+            min_size=self.min_file_size,
+            max_size=self.max_file_size,
+            modified_after=max_age_filter(self.max_file_age_days)
+        )
+    
+    def get_exclusions(self) -> Dict[str, Any]:
+        """Текущие правила исключения и фильтры файлов"""
+        return {
+            'success': True,
+            'patterns': list(self.exclude_patterns),
+            'defaults': list(DEFAULT_EXCLUDES),
+            'root_patterns': {root: list(rules) for root, rules in self.root_excludes.items()},
+            'min_size': self.min_file_size,
+            'max_size': self.max_file_size,
+            'max_age_days': self.max_file_age_days
         }
+    
+    def set_exclusions(self, patterns: Optional[List[str]] = None, root_patterns: Optional[Dict[str, List[str]]] = None,
+                       min_size: Optional[int] = None, max_size: Optional[int] = None,
+                       max_age_days: Optional[float] = None) -> Dict[str, Any]:
+        """Задать правила исключения и фильтры (действуют со следующего сканирования)"""
+        if self.scanning:
+            return {'success': False, 'message': 'Scan in progress'}
+        
+        previous = (self.exclude_patterns, self.root_excludes, self.min_file_size,
+                    self.max_file_size, self.max_file_age_days)
+        if patterns is not None:
+            self.exclude_patterns = list(patterns)
+        if root_patterns is not None:
+            self.root_excludes = {root: list(rules) for root, rules in root_patterns.items()}
+        self.min_file_size = min_size
+        self.max_file_size = max_size
+        self.max_file_age_days = max_age_days
         
         try:
-            for root, dirs, files in os.walk(root_path):
-                # Фильтруем директории
-                dirs[:] = [d for d in dirs if not any(skip in os.path.join(root, d) for skip in skip_dirs)]
-                
-                for file in files:
-                    if not self.scanning:
-                        return
-                    
-                    # Проверяем только .jar и .exe файлы
-                    if any(file.lower().endswith(ext) for ext in self.cheat_extensions):
-                        file_path = os.path.join(root, file)
-                        
-                        try:
-                            # Проверяем файл
-                            result = self.scan_file(file_path)
-                            
-                            self.stats['scanned'] += 1
-                            file_count_ref[0] += 1
-                            
-                            if result['isThreat']:
-                                self.stats['threats'] += 1
-                                self.found_threats.append(result)
-                                
-                                # Добавляем в UI только угрозы
-                                file_id = hashlib.md5(file_path.encode()).hexdigest()
-                                file_data = {
-                                    'id': file_id,
-                                    'path': file_path,
-                                    'name': file,
-                                    'status': 'threat'
-                                }
-                                self.add_file_to_list(file_data)
-                                self.update_file_status(file_id, 'threat', result)
-                                
-                                status_msg = f'MINECRAFT CHEAT FOUND: {result["threatType"]} ({result["name"]})'
-                                if result.get('isRunning'):
-                                    status_msg += ' [RUNNING]'
-                                self.log('error', status_msg)
-                            else:
-                                self.stats['clean'] += 1
-                            
-                            # Обновляем UI каждые 100 файлов или каждую секунду
-                            current_time = time.time()
-                            if file_count_ref[0] % 100 == 0 or (current_time - last_update_time[0] >= 1.0):
-                                self.update_stats()
-                                self.update_timer()
-                                self.update_progress(
-                                    file_count_ref[0],
-                                    file_count_ref[0] + 1000,  # Примерное общее количество
-                                    f'Scanning: {file}'
-                                )
-                                last_update_time[0] = current_time
-                            
-                        except Exception as e:
-                            # Тихо пропускаем файлы с ошибками доступа
-                            pass
-                
-        except PermissionError:
-            # Пропускаем директории без доступа
-            pass
-        except Exception as e:
-            pass
+            self.exclusions = self._compile_exclusions()
+        except re.error as e:
+            (self.exclude_patterns, self.root_excludes, self.min_file_size,
+             self.max_file_size, self.max_file_age_days) = previous
+            return {'success': False, 'message': f'Invalid exclusion pattern: {str(e)}'}
+        
+        return self.get_exclusions()
+    
+    def get_io_limits(self) -> Dict[str, Any]:
+        """Текущий бюджет чтения, режим адаптивного снижения и приоритет"""
+        return {
+            'success': True,
+            'bytes_per_second': self.io_bytes_per_second,
+            'files_per_second': self.io_files_per_second,
+            'adaptive': self.adaptive_throttle,
+            'low_priority': self.low_priority,
+            'governor': self.io_governor.to_dict() if self.io_governor is not None else None
+        }
+    
+    def set_io_limits(self, bytes_per_second: Optional[float] = None, files_per_second: Optional[float] = None,
+                      adaptive: bool = False, low_priority: bool = False) -> Dict[str, Any]:
+        """Задать бюджет чтения и приоритет (действуют со следующего сканирования)"""
+        if self.scanning:
+            return {'success': False, 'message': 'Scan in progress'}
+        if (bytes_per_second is not None and bytes_per_second <= 0) or \
+                (files_per_second is not None and files_per_second <= 0):
+            return {'success': False, 'message': 'I/O limits must be positive'}
+        
+        self.io_bytes_per_second = bytes_per_second
+        self.io_files_per_second = files_per_second
+        self.adaptive_throttle = adaptive
+        self.low_priority = low_priority
+        return self.get_io_limits()
+    
+    def _is_candidate(self, file_name: str) -> bool:
+        """Проверяем только .jar и .exe файлы"""
+        return file_name.lower().endswith(tuple(self.cheat_extensions))
+    
+    def _hash_database_paths(self) -> List[str]:
+        """Базы хешей: собственная база и база из пакета сигнатур"""
+        paths = [self.hash_db_path]
+        if self.signature_pack and self.signature_pack.hash_db_path:
+            paths.append(self.signature_pack.hash_db_path)
+        return [path for path in paths if os.path.exists(path)]
+    
+    def _release_hash_databases(self):
+        """Закрыть базы хешей (освободить отображения файлов)"""
+        for hash_db in self.hash_dbs:
+            hash_db.close()
+        self.hash_dbs = []
+    
+    def _load_hash_database(self):
+        """Открыть базы хешей известных сборок, если они есть"""
+        self._release_hash_databases()
+        
+        for path in self._hash_database_paths():
+            try:
+                hash_db = KnownHashDatabase(path)
+                self.hash_dbs.append(hash_db)
+                self.log('info', f'Loaded {len(hash_db)} known cheat hash(es) from {os.path.basename(path)}')
+            except Exception as e:
+                self.log('warning', f'Failed to load hash database: {str(e)}')
+    
+    def _create_walker(self, telemetry: Optional[ScanTelemetry] = None,
+                       exclusions: Optional[ExclusionMatcher] = None) -> ParallelWalker:
+        """Создать обходчик директорий с текущими настройками (с профилированием, если передан telemetry)"""
+        return ParallelWalker(
+            workers=self.walker_workers,
+            skip_dir=(exclusions or self.exclusions).excludes_dir,
+            file_filter=self._is_candidate,
+            should_stop=lambda: not self.scanning,
+            on_error=(lambda path, e: telemetry.record_error('walk', path, e)) if telemetry else None,
+            on_dir=telemetry.observe_dir if telemetry else None,
+            on_thread_start=(lambda: lower_priority(thread=True)) if self.low_priority else None
+        )
+    
+    def scan_directory_recursively(self, root_paths: List[Union[str, ScanRoot]], file_count_ref: list, last_update_time: list,
+                                   files: List[str] = (), skip: Optional[set] = None,
+                                   exclusions: Optional[ExclusionMatcher] = None) -> ScanPipeline:
+        """Параллельное рекурсивное сканирование директорий с обновлением прогресса"""
+        should_stop = lambda: not self.scanning
+        exclusions = exclusions or self.exclusions
+        walker = self._create_walker(self.telemetry, exclusions)
+        self.io_governor = IOGovernor(self.io_bytes_per_second, self.io_files_per_second, self.adaptive_throttle)
+        
+        # Хеширование и разбор JAR выполняются в пуле процессов, обход не ждёт их
+        pipeline = ScanPipeline(
+            walker,
+            self.signature_pack,
+            self.cheat_extensions,
+            workers=self.analysis_workers,
+            should_stop=should_stop,
+            cache=self.scan_cache,
+            hash_db_paths=[hash_db.db_path for hash_db in self.hash_dbs],
+            cancel=self.cancel_token,
+            telemetry=self.telemetry,
+            accept_file=exclusions.accepts_file,
+            governor=self.io_governor,
+            low_priority=self.low_priority
+        )
+        
+        def on_batch(results: List[Dict[str, Any]]):
+            for result in results:
+                # Проверка процессов требует psutil и состояния API, поэтому выполняется здесь
+                if result['isThreat']:
+                    started = time.perf_counter()
+                    result['isRunning'] = self.is_process_running(result['path'])
+                    self.telemetry.add_stage('process', time.perf_counter() - started)
+                started = time.perf_counter()
+                self._handle_scan_result(result, file_count_ref, last_update_time)
+                self.telemetry.add_stage('ui', time.perf_counter() - started)
+        
+        pipeline.run(root_paths, on_batch, files=files, skip=skip or ())
+        return pipeline
+    
+    def _handle_scan_result(self, result: Dict[str, Any], file_count_ref: list, last_update_time: list):
+        """Учесть результат сканирования файла и обновить UI"""
+        file = result['name']
+        
+        self.results.add(ScanRecord.from_result(result))
+        
+        with self._stats_lock:
+            file_count_ref[0] += 1
+            
+            if self.progress:
+                self.progress.advance(1, result['size'])
+            
+            # Обновляем UI каждые 100 файлов или каждую секунду
+            current_time = time.time()
+            need_ui_update = file_count_ref[0] % 100 == 0 or (current_time - last_update_time[0] >= 1.0)
+            if need_ui_update:
+                last_update_time[0] = current_time
+        
+        self._emit('result', result)
+        
+        if result['isThreat']:
+            self._report_threat(result)
+        
+        if need_ui_update:
+            self.update_stats()
+            self.update_timer()
+            if self.progress and self.progress.total_files:
+                self.update_progress(
+                    self.progress.done_files,
+                    self.progress.total_files,
+                    f'Scanning: {file}',
+                    self.progress.eta()
+                )
+            else:
+                self.update_progress(
+                    file_count_ref[0],
+                    file_count_ref[0] + 1000,  # Примерное общее количество
+                    f'Scanning: {file}'
+                )
+    
+    @staticmethod
+    def _file_id(file_path: str) -> str:
+        """Идентификатор строки списка в UI"""
+        return hashlib.md5(file_path.encode()).hexdigest()
+    
+    def _report_threat(self, result: Dict[str, Any]):
+        """Добавить угрозу в список UI и в лог"""
+        # Добавляем в UI только угрозы
+        file_id = self._file_id(result['path'])
+        file_data = {
+            'id': file_id,
+            'path': result['path'],
+            'name': result['name'],
+            'status': 'threat'
+        }
+        self.add_file_to_list(file_data)
+        self.update_file_status(file_id, 'threat', result)
+        
+        status_msg = f'MINECRAFT CHEAT FOUND: {result["threatType"]} ({result["name"]})'
+        if result.get('isRunning'):
+            status_msg += ' [RUNNING]'
+        self.log('error', status_msg)
+    
+    def get_scan_modes(self) -> List[Dict[str, str]]:
+        """Доступные режимы сканирования"""
+        return [
+            {'mode': mode, 'description': strategy.description}
+            for mode, strategy in SCAN_STRATEGIES.items() if mode == strategy.name
+        ]
+    
+    def _begin_scan(self, scan_mode: str, roots: Optional[List[Union[str, ScanRoot]]] = None,
+                    checkpoint: Optional[ScanCheckpoint] = None) -> Optional[ScanStrategy]:
+        """Подготовить состояние к новому сканированию; None - сканирование невозможно"""
+        if self.scanning:
+            return None
+        
+        if checkpoint is not None:
+            # Обход продолжается с frontier; исходные корни нужны режиму custom и правилам .matrixignore
+            if checkpoint.mode == CustomScanStrategy.name:
+                strategy = CustomScanStrategy(checkpoint.roots)
+            else:
+                strategy = get_scan_strategy(checkpoint.mode) or CustomScanStrategy(checkpoint.roots)
+        else:
+            strategy = CustomScanStrategy(roots) if roots else get_scan_strategy(scan_mode)
+        if strategy is None:
+            return None
+        
+        if checkpoint is None:
+            # Новое сканирование отменяет приостановленное
+            ScanCheckpoint.discard(self.checkpoint_path)
+        
+        self.scanning = True
+        self.cancel_token = CancellationToken()
+        self._pause_requested = False
+        self.process_index.invalidate()
+        self.results.reset(time.time())
+        self.telemetry.reset()
+        
+        if checkpoint is not None:
+            self.results.reset(time.time() - checkpoint.elapsed)
+            self.results.restore(checkpoint.stats, [ScanRecord.from_result(threat) for threat in checkpoint.threats])
+            self.log('info', f'Resuming {strategy.name.upper()} scan: {checkpoint.stats.get("scanned", 0)} file(s) already scanned, '
+                             f'{len(checkpoint.frontier)} folder(s) left')
+            return strategy
+        
+        self.log('info', f'Starting {strategy.name.upper()} scan: {strategy.description}...')
+        self.log('info', f'This may take a while. Searching for: {", ".join(list(self.minecraft_cheats.values())[:10])}...')
+        
+        return strategy
     
     def start_scan(self, scan_mode: str = 'quick') -> Dict[str, Any]:
-        """Запустить сканирование всей системы"""
+        """Запустить сканирование в выбранном режиме"""
         if self.scanning:
             return {'success': False, 'message': 'Scan already in progress'}
         
-        self.scanning = True
-        self.found_threats = []
-        self.threat_processes = {}
-        self.stats = {
-            'scanned': 0,
-            'threats': 0,
-            'clean': 0,
-            'start_time': time.time()
-        }
+        strategy = self._begin_scan(scan_mode)
+        if strategy is None:
+            return {'success': False, 'message': f'Unknown scan mode: {scan_mode}'}
         
         # Запускаем сканирование в отдельном потоке
-        self.scan_thread = threading.Thread(target=self._scan_worker, args=(scan_mode,))
+        self.scan_thread = threading.Thread(target=self._scan_worker, args=(strategy,))
         self.scan_thread.daemon = True
         self.scan_thread.start()
         
-        self.log('info', f'Starting FULL SYSTEM scan in {scan_mode} mode...')
-        self.log('info', f'Scanning entire system for Minecraft cheats...')
-        self.log('info', f'This may take a while. Searching for: {", ".join(list(self.minecraft_cheats.values())[:10])}...')
-        
         return {'success': True, 'message': 'Scan started'}
     
-    def _scan_worker(self, scan_mode: str):
-        """Рабочий поток для сканирования всей системы"""
-        self.log('info', 'Starting deep system scan...')
+    def resume_scan(self) -> Dict[str, Any]:
+        """Продолжить приостановленное сканирование с точки продолжения"""
+        if self.scanning:
+            return {'success': False, 'message': 'Scan already in progress'}
         
+        checkpoint = ScanCheckpoint.load(self.checkpoint_path)
+        if checkpoint is None:
+            return {'success': False, 'message': 'No paused scan to resume'}
+        
+        strategy = self._begin_scan(checkpoint.mode, checkpoint=checkpoint)
+        self.scan_thread = threading.Thread(target=self._scan_worker, args=(strategy, checkpoint))
+        self.scan_thread.daemon = True
+        self.scan_thread.start()
+        
+        return {'success': True, 'message': 'Scan resumed'}
+    
+    def get_paused_scan(self) -> Dict[str, Any]:
+        """Сведения о приостановленном сканировании (если оно есть)"""
+        checkpoint = ScanCheckpoint.load(self.checkpoint_path)
+        if checkpoint is None:
+            return {'success': False, 'message': 'No paused scan'}
+        
+        return {
+            'success': True,
+            'mode': checkpoint.mode,
+            'scanned': checkpoint.stats.get('scanned', 0),
+            'threats': checkpoint.stats.get('threats', 0),
+            'folders_left': len(checkpoint.frontier),
+            'paused_at': checkpoint.created_at
+        }
+    
+    def run_scan(self, scan_mode: str = 'quick', roots: Optional[List[Union[str, ScanRoot]]] = None,
+                 resume: bool = False) -> Dict[str, Any]:
+        """Выполнить сканирование в текущем потоке (для CLI и библиотечного использования)"""
+        if self.scanning:
+            return {'success': False, 'message': 'Scan already in progress'}
+        
+        checkpoint = ScanCheckpoint.load(self.checkpoint_path) if resume else None
+        if resume and checkpoint is None:
+            return {'success': False, 'message': 'No paused scan to resume'}
+        
+        strategy = self._begin_scan(scan_mode, roots, checkpoint)
+        if strategy is None:
+            return {'success': False, 'message': f'Unknown scan mode: {scan_mode}'}
+        
+        self._scan_worker(strategy, checkpoint)
+        
+        return {'success': True, 'paused': self._pause_requested, **self.results.stats()}
+    
+    def _scan_worker(self, strategy: ScanStrategy, checkpoint: Optional[ScanCheckpoint] = None):
+        """Рабочий поток сканирования"""
         file_count_ref = [0]  # Счетчик файлов (используем список для передачи по ссылке)
         last_update_time = [time.time()]
         
-        # Сканируем каждую директорию/диск
-        for directory in self.scan_directories:
-            if not self.scanning:
-                break
+        if checkpoint is not None:
+            # Продолжаем с необойдённых директорий; уже проверенные файлы не трогаем
+            scan_roots = checkpoint.frontier
+            file_count_ref[0] = self.results.counts()[0]
+            self._resume_processed = checkpoint.processed
+            skip = set(checkpoint.processed)
+            skip.update(checkpoint.pending_files)
+            pending_files = checkpoint.pending_files
+            # Точка продолжения старого формата не хранит корни - берём их у стратегии
+            self._scan_roots = checkpoint.roots or strategy.roots()
+        else:
+            # Корни и ограничения глубины задаёт стратегия режима
+            scan_roots = strategy.roots()
+            self._scan_roots = scan_roots
+            self._resume_processed = []
+            skip = None
+            pending_files = []
             
-            dir_name = os.path.basename(directory) if os.path.basename(directory) else directory
-            self.log('info', f'Scanning: {directory}')
-            
-            # Рекурсивное сканирование
-            self.scan_directory_recursively(directory, file_count_ref, last_update_time)
+            # Все директории/диски сканируются одновременно
+            for root in scan_roots:
+                depth = f' (depth {root.max_depth})' if root.max_depth is not None else ''
+                self.log('info', f'Scanning: {root.path}{depth}')
+        self.scan_directories = [root.path for root in scan_roots]
+        
+        # Правила из .matrixignore в корнях; при продолжении корни берутся из исходного сканирования
+        # Свой матчер у каждого сканирования: наблюдение со своими корнями его не подменит
+        try:
+            exclusions = self._compile_exclusions([root.path for root in self._scan_roots])
+        except re.error as e:
+            self.log('warning', f'Invalid exclusion pattern in {IGNORE_FILE}: {str(e)}')
+            exclusions = self._compile_exclusions()
+        self.scan_exclusions = exclusions
+        
+        total_files, total_bytes = 0, 0
+        if checkpoint is not None:
+            total_files, total_bytes = checkpoint.total_files, checkpoint.total_bytes
+        elif self.precount_files:
+            self.log('info', 'Counting files...')
+            self.update_progress(0, 0, 'Counting files...')
+            started = time.perf_counter()
+            total_files, total_bytes = count_candidates(self._create_walker(exclusions=exclusions), scan_roots,
+                                                        exclusions.accepts_file)
+            self.telemetry.add_stage('precount', time.perf_counter() - started)
+            if self.cancel_token.cancelled:
+                # Подсчёт прерван - итог неполный
+                total_files, total_bytes = 0, 0
+            else:
+                self.log('info', f'Found {total_files} candidate file(s), {total_bytes / 1024 / 1024:.1f} MB')
+        self.progress = ProgressTracker(total_files, total_bytes)
+        if checkpoint is not None:
+            self.progress.done_files = self.results.counts()[0]
+            self.progress.done_bytes = checkpoint.done_bytes
+        
+        # Пакет сигнатур мог обновиться с прошлого сканирования
+        try:
+            self._refresh_signatures()
+        except Exception as e:
+            self.log('warning', f'Failed to reload signatures: {str(e)}')
+        
+        with self._hash_db_lock:
+            self._load_hash_database()
+        
+        if self.use_scan_cache:
+            try:
+                # Кеш сбрасывается при смене сигнатур, базы хешей или логики анализа
+                hash_db_version = '+'.join(hash_db.version for hash_db in self.hash_dbs) or 'none'
+                self.scan_cache = ScanCache(
+                    signature_version=f'{ANALYSIS_VERSION}:{self.signature_pack.version}:{hash_db_version}'
+                )
+            except Exception as e:
+                self.log('warning', f'Scan cache unavailable: {str(e)}')
+                self.scan_cache = None
+        
+        try:
+            # Параллельное рекурсивное сканирование
+            pipeline = self.scan_directory_recursively(
+                scan_roots, file_count_ref, last_update_time, files=pending_files, skip=skip,
+                exclusions=exclusions
+            )
+        finally:
+            if self.scan_cache:
+                self.log('info', f'Cache hits: {self.scan_cache.hits}, re-scanned: {self.scan_cache.misses}')
+                self.scan_cache.close()
+                self.scan_cache = None
+        
+        if self._pause_requested:
+            self._pause_checkpoint(strategy, pipeline)
+            return
+        
+        ScanCheckpoint.discard(self.checkpoint_path)
         
         # Завершение сканирования
         self._finish_scan()
     
+    def _pause_checkpoint(self, strategy: ScanStrategy, pipeline: ScanPipeline):
+        """Сохранить точку продолжения после паузы"""
+        self.results.finish()
+        frontier = pipeline.walker.frontier()
+        # Из проверенных файлов нужны только те, что лежат в директориях, которые будут прочитаны снова
+        frontier_dirs = {root.path for root in frontier}
+        processed = {
+            path for path in list(pipeline.processed) + list(self._resume_processed)
+            if os.path.dirname(path) in frontier_dirs
+        }
+        
+        checkpoint = ScanCheckpoint(
+            strategy.name,
+            frontier,
+            pipeline.pending_files(),
+            sorted(processed),
+            self.results.stats(),
+            [threat.to_dict() for threat in self.results.threats()],
+            self.progress.total_files if self.progress else 0,
+            self.progress.total_bytes if self.progress else 0,
+            self.progress.done_bytes if self.progress else 0,
+            self.results.elapsed(),
+            roots=self._scan_roots
+        )
+        
+        try:
+            checkpoint.save(self.checkpoint_path)
+            self.log('warning', f'Scan paused: {len(checkpoint.frontier)} folder(s) and '
+                                f'{len(checkpoint.pending_files)} file(s) left')
+        except OSError as e:
+            self.log('error', f'Failed to save scan checkpoint: {str(e)}')
+        
+        self.scanning = False
+        self.update_stats()
+        self.update_timer()
+        self._emit('scan_paused', {**checkpoint.stats, 'elapsed': checkpoint.elapsed})
+    
     def _finish_scan(self):
         """Завершить сканирование"""
         self.scanning = False
+        self.results.finish()
+        stats = self.results.stats()
         
-        if self.stats['start_time']:
-            elapsed_time = time.time() - self.stats['start_time']
+        if self.results.start_time:
+            elapsed_time = self.results.elapsed()
             self.log('info', f'=== SCAN COMPLETE ===')
             self.log('info', f'Time: {elapsed_time:.1f}s')
-            self.log('info', f'Total files scanned: {self.stats["scanned"]}')
-            self.log('info', f'Minecraft cheats found: {self.stats["threats"]}')
-            self.log('info', f'Clean files: {self.stats["clean"]}')
+            self.log('info', f'Total files scanned: {stats["scanned"]}')
+            self.log('info', f'Minecraft cheats found: {stats["threats"]}')
+            self.log('info', f'Clean files: {stats["clean"]}')
+            if self.progress and elapsed_time > 0:
+                self.log('info', f'Throughput: {stats["scanned"] / elapsed_time:.1f} files/s, '
+                                 f'{self.progress.done_bytes / elapsed_time / 1024 / 1024:.1f} MB/s')
+            self._log_telemetry()
         
         # Обновляем финальную статистику
         self.update_stats()
         self.update_timer()
         
-        if self.window:
-            self.window.evaluate_js('onScanComplete()')
+        self._emit('scan_complete', {**stats, 'elapsed': self.results.elapsed()})
+    
+    def _log_telemetry(self):
+        """Сводка профиля сканирования в лог: где ушло время и что сломалось"""
+        snapshot = self.telemetry.snapshot()
+        
+        stages = sorted(
+            ((stage, values['seconds']) for stage, values in snapshot['stages'].items() if values['seconds'] >= 0.001),
+            key=lambda item: -item[1]
+        )
+        if stages:
+            self.log('info', 'Stage time: ' + ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in stages))
+        
+        latency = snapshot['file_latency']
+        if latency['count']:
+            self.log('info', f'File latency: p50 <= {latency["p50"] * 1000:g} ms, p95 <= {latency["p95"] * 1000:g} ms')
+        if snapshot['slowest_files']:
+            slowest = snapshot['slowest_files'][0]
+            self.log('info', f'Slowest file: {slowest["path"]} ({slowest["seconds"]:.2f}s)')
+        if snapshot['slowest_dirs']:
+            slowest = snapshot['slowest_dirs'][0]
+            self.log('info', f'Slowest folder: {slowest["path"]} ({slowest["seconds"]:.2f}s, {slowest["entries"]} entries)')
+        
+        if self.io_governor is not None and self.io_governor.backoffs:
+            governor = self.io_governor.to_dict()
+            self.log('info', f'I/O throttle: backed off {governor["backoffs"]} time(s), '
+                             f'lowest speed {governor["min_factor"] * 100:g}%')
+        
+        if snapshot['errors']:
+            self.log('warning', 'Errors: ' + ', '.join(
+                f'{error["stage"]}/{error["type"]} x{error["count"]}' for error in snapshot['errors']
+            ))
+    
+    def get_scan_telemetry(self) -> Dict[str, Any]:
+        """Профиль последнего сканирования: время этапов, гистограммы задержек, медленные файлы и папки, ошибки"""
+        return {'success': True, 'scanning': self.scanning, **self.telemetry.snapshot()}
+    
+    def get_metrics(self) -> str:
+        """Профиль и итоги сканирования в текстовом формате Prometheus"""
+        return self.telemetry.to_prometheus({**self.results.stats(), 'elapsed': self.results.elapsed()})
+    
+    def get_scan_progress(self) -> Dict[str, Any]:
+        """Текущий прогресс сканирования: процент, скорость и ETA"""
+        if not self.progress:
+            return {'success': False, 'message': 'No scan has been started'}
+        
+        return {'success': True, 'scanning': self.scanning, **self.progress.snapshot()}
     
     def stop_scan(self) -> Dict[str, Any]:
         """Остановить сканирование"""
@@ -578,56 +961,170 @@ class ScannerAPI:
             return {'success': False, 'message': 'No scan in progress'}
         
         self.scanning = False
+        if self.cancel_token:
+            self.cancel_token.cancel()
         self.log('warning', 'Scan stopped by user')
         
         return {'success': True, 'message': 'Scan stopped'}
     
+    def pause_scan(self) -> Dict[str, Any]:
+        """Приостановить сканирование с сохранением точки продолжения"""
+        if not self.scanning:
+            return {'success': False, 'message': 'No scan in progress'}
+        
+        self._pause_requested = True
+        self.scanning = False
+        if self.cancel_token:
+            self.cancel_token.cancel()
+        self.log('info', 'Pausing scan...')
+        
+        return {'success': True, 'message': 'Scan pausing'}
+    
+    def start_watch(self, roots: Optional[List[str]] = None, backend: Optional[str] = None) -> Dict[str, Any]:
+        """Следить за новыми и изменёнными файлами и проверять их сразу
+
+        Без roots наблюдаются корни быстрого режима (папки Minecraft,
+        Загрузки, Рабочий стол) с теми же ограничениями глубины.
+        """
+        if self.watcher and self.watcher.running:
+            return {'success': False, 'message': 'Watch already running'}
+        
+        watch_roots = CustomScanStrategy(roots).roots() if roots else get_scan_strategy('quick').roots()
+        if not watch_roots:
+            return {'success': False, 'message': 'No folders to watch'}
+        
+        try:
+            self._refresh_signatures()
+        except Exception as e:
+            self.log('warning', f'Failed to reload signatures: {str(e)}')
+        with self._hash_db_lock:
+            if not self.hash_dbs:
+                self._load_hash_database()
+        
+        try:
+            exclusions = self._compile_exclusions([root.path for root in watch_roots])
+            watch_backend = create_watch_backend(backend or self.watch_backend)
+            self.watcher = FileWatcher(
+                watch_roots,
+                lambda paths: self._scan_watched_files(paths, exclusions),
+                file_filter=self._is_candidate,
+                skip_dir=exclusions.excludes_dir,
+                backend=watch_backend
+            )
+            self.watcher.start()
+        except (OSError, ValueError, re.error) as e:
+            self.watcher = None
+            return {'success': False, 'message': f'Failed to start watch: {str(e)}'}
+        
+        if self.results.start_time is None:
+            self.results.start_time = time.time()
+        
+        for root in watch_roots:
+            self.log('info', f'Watching: {root.path}')
+        self.log('info', f'Real-time protection enabled ({watch_backend.name})')
+        
+        return {
+            'success': True,
+            'backend': watch_backend.name,
+            'roots': [root.path for root in watch_roots]
+        }
+    
+    def stop_watch(self) -> Dict[str, Any]:
+        """Прекратить наблюдение за файлами"""
+        if not self.watcher or not self.watcher.running:
+            return {'success': False, 'message': 'Watch is not running'}
+        
+        self.watcher.stop()
+        self.watcher = None
+        self.log('info', 'Real-time protection disabled')
+        
+        return {'success': True, 'message': 'Watch stopped'}
+    
+    def get_watch_status(self) -> Dict[str, Any]:
+        """Состояние наблюдения за файлами"""
+        if not self.watcher or not self.watcher.running:
+            return {'success': True, 'watching': False}
+        
+        return {
+            'success': True,
+            'watching': True,
+            'backend': self.watcher.backend.name,
+            'roots': [root.path for root in self.watcher.roots]
+        }
+    
+    def _scan_watched_files(self, paths: List[str], exclusions: ExclusionMatcher):
+        """Проверить файлы, о которых сообщило наблюдение (из потока наблюдателя)"""
+        # Новый файл мог быть сразу запущен - снимок процессов нужен свежий
+        self.process_index.invalidate()
+        
+        for path in paths:
+            try:
+                file_stats = os.stat(path)
+            except OSError:
+                # Файл успели удалить или переместить
+                continue
+            if not exclusions.accepts_file(path, file_stats):
+                continue
+            
+            try:
+                with self._hash_db_lock:
+                    result = self.scan_file(path, file_stats)
+            except Exception:
+                continue
+            
+            self.results.add(ScanRecord.from_result(result))
+            self._emit('result', result)
+            if result['isThreat']:
+                self._report_threat(result)
+        
+        self.update_stats()
+    
     def clear_threats(self) -> Dict[str, Any]:
         """Удалить все обнаруженные угрозы и закрыть процессы"""
-        if not self.found_threats:
+        # Работаем со снимком: поток сканирования может добавлять угрозы параллельно
+        threats = self.results.threats()
+        if not threats:
             return {'success': False, 'message': 'No threats to clear'}
         
         deleted = 0
         failed = 0
         processes_killed = 0
         
-        self.log('info', f'Clearing {len(self.found_threats)} Minecraft cheat(s)...')
+        self.log('info', f'Clearing {len(threats)} Minecraft cheat(s)...')
         
-        for threat in self.found_threats[:]:
-            file_path = threat['path']
+        for threat in threats:
+            file_path = threat.path
             
             try:
                 # Завершаем процесс, если запущен
-                if file_path in self.threat_processes:
-                    for pid in self.threat_processes[file_path]:
-                        try:
-                            proc = psutil.Process(pid)
-                            proc_name = proc.name()
-                            proc.kill()
-                            proc.wait(timeout=5)
-                            processes_killed += 1
-                            self.log('warning', f'Killed process: {proc_name} (PID: {pid})')
-                        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired) as e:
-                            self.log('error', f'Failed to kill process {pid}: {str(e)}')
+                for pid in self.results.processes(file_path):
+                    try:
+                        proc = psutil.Process(pid)
+                        proc_name = proc.name()
+                        proc.kill()
+                        proc.wait(timeout=5)
+                        processes_killed += 1
+                        self.log('warning', f'Killed process: {proc_name} (PID: {pid})')
+                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired) as e:
+                        self.log('error', f'Failed to kill process {pid}: {str(e)}')
                 
                 time.sleep(0.5)
                 
                 # Удаляем файл
                 if os.path.exists(file_path):
                     os.remove(file_path)
-                    self.log('info', f'Deleted: {threat["threatType"]} - {threat["name"]}')
+                    self.log('info', f'Deleted: {threat.threat_type} - {threat.name}')
                     deleted += 1
-                    self.found_threats.remove(threat)
+                    self.results.remove_threat(file_path)
                     
             except PermissionError:
-                self.log('error', f'Permission denied: {threat["name"]} (File may be in use or protected)')
+                self.log('error', f'Permission denied: {threat.name} (File may be in use or protected)')
                 failed += 1
             except Exception as e:
-                self.log('error', f'Failed to delete {threat["name"]}: {str(e)}')
+                self.log('error', f'Failed to delete {threat.name}: {str(e)}')
                 failed += 1
         
         # Обновляем статистику
-        self.stats['threats'] = len(self.found_threats)
         self.update_stats()
         
         message = f'Cleared {deleted} cheat(s), killed {processes_killed} process(es)'
@@ -648,14 +1145,13 @@ class ScannerAPI:
         """Поместить файл в карантин"""
         try:
             # Завершаем процесс если запущен
-            if file_path in self.threat_processes:
-                for pid in self.threat_processes[file_path]:
-                    try:
-                        proc = psutil.Process(pid)
-                        proc.kill()
-                        proc.wait(timeout=5)
-                    except:
-                        pass
+            for pid in self.results.processes(file_path):
+                try:
+                    proc = psutil.Process(pid)
+                    proc.kill()
+                    proc.wait(timeout=5)
+                except:
+                    pass
             
             time.sleep(0.5)
             
@@ -670,6 +1166,7 @@ class ScannerAPI:
             
             import shutil
             shutil.move(file_path, quarantine_path)
+            self.results.remove_threat(file_path)
             
             self.log('info', f'Quarantined: {file_name}')
             
@@ -689,22 +1186,22 @@ class ScannerAPI:
         """Удалить файл и завершить процесс"""
         try:
             # Завершаем процесс если запущен
-            if file_path in self.threat_processes:
-                for pid in self.threat_processes[file_path]:
-                    try:
-                        proc = psutil.Process(pid)
-                        proc_name = proc.name()
-                        proc.kill()
-                        proc.wait(timeout=5)
-                        self.log('warning', f'Killed process: {proc_name}')
-                    except:
-                        pass
+            for pid in self.results.processes(file_path):
+                try:
+                    proc = psutil.Process(pid)
+                    proc_name = proc.name()
+                    proc.kill()
+                    proc.wait(timeout=5)
+                    self.log('warning', f'Killed process: {proc_name}')
+                except:
+                    pass
             
             time.sleep(0.5)
             
             # Удаляем файл
             if os.path.exists(file_path):
                 os.remove(file_path)
+                self.results.remove_threat(file_path)
                 self.log('info', f'Deleted: {os.path.basename(file_path)}')
                 
                 return {
@@ -728,33 +1225,75 @@ class ScannerAPI:
                 'message': f'Failed to delete: {str(e)}'
             }
     
-    def export_report(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Экспортировать отчёт"""
+    def _report_metadata(self) -> Dict[str, Any]:
+        """Сводка для заголовка отчёта (статистика берётся из ResultStore, не из UI)"""
+        scanned, threats, clean = self.results.counts()
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'version': self.updater.current_version,
+            'stats': {
+                'scanned': scanned,
+                'threats': threats,
+                'clean': clean,
+                'elapsed': round(self.results.elapsed(), 3)
+            },
+            'scan_directories': self.scan_directories,
+            'exclusions': self.scan_exclusions.to_dict(),
+            'telemetry': self.telemetry.snapshot(),
+            'known_cheats': list(self.minecraft_cheats.values())
+        }
+    
+    def export_results(self, file_path: str, format: Optional[str] = None,
+                       compression: Optional[str] = None, status: str = 'threats') -> Dict[str, Any]:
+        """Потоковый экспорт результатов в файл (NDJSON, CSV, SARIF или двоичный)
+
+        Записи пишутся прямо из хранилища результатов по одной; формат
+        и сжатие по умолчанию определяются по имени файла (report.csv.gz).
+        status: threats, clean или all.
+        """
+        try:
+            records = self.results.iter_records(status)
+            count = export_records(file_path, records, self._report_metadata(), format, compression)
+        except (ExportError, ValueError, OSError) as e:
+            return {
+                'success': False,
+                'message': f'Failed to export: {e}'
+            }
+        
+        self.log('info', f'Report exported to: {file_path} ({count} results)')
+        return {
+            'success': True,
+            'path': file_path,
+            'count': count
+        }
+    
+    def export_report(self, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Экспортировать отчёт через диалог сохранения
+
+        Данные не передаются из UI: options содержит только format,
+        compression и status (по умолчанию - по расширению файла и только угрозы).
+        """
+        options = options or {}
         try:
             if self.window:
+                import webview
+                
                 file_path = self.window.create_file_dialog(
                     webview.SAVE_DIALOG,
-                    save_filename=f'minecraft_cheat_scan_{int(time.time())}.json',
-                    file_types=('JSON Files (*.json)', 'Text Files (*.txt)')
+                    save_filename=f'minecraft_cheat_scan_{int(time.time())}.ndjson',
+                    file_types=EXPORT_FILE_TYPES
                 )
                 
                 if file_path:
-                    import json
-                    
-                    # Добавляем информацию о найденных угрозах
-                    report_data['threats'] = self.found_threats
-                    report_data['scan_directories'] = self.scan_directories
-                    report_data['known_cheats'] = list(self.minecraft_cheats.values())
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(report_data, f, indent=2, ensure_ascii=False)
-                    
-                    self.log('info', f'Report exported to: {file_path}')
-                    
-                    return {
-                        'success': True,
-                        'path': file_path
-                    }
+                    # В части версий pywebview диалог возвращает кортеж
+                    if isinstance(file_path, (tuple, list)):
+                        file_path = file_path[0]
+                    return self.export_results(
+                        file_path,
+                        options.get('format'),
+                        options.get('compression'),
+                        options.get('status', 'threats')
+                    )
             
             return {
                 'success': False,
@@ -767,16 +1306,38 @@ class ScannerAPI:
                 'message': f'Failed to export: {str(e)}'
             }
     
+    def get_results(self, offset: int = 0, limit: int = 100, filter: str = 'threats',
+                    sort: str = 'scanned', descending: bool = False,
+                    search: Optional[str] = None) -> Dict[str, Any]:
+        """Страница результатов для списка в UI (отрисовываются только видимые строки)
+
+        filter: threats, clean или all; sort: scanned (порядок проверки),
+        name, path, size, level, date; search - подстрока пути.
+        """
+        try:
+            total, records = self.results.query(offset, min(limit, 1000), filter, sort, descending, search)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}
+        
+        return {
+            'success': True,
+            'total': total,
+            'offset': offset,
+            'rows': [
+                {
+                    'id': self._file_id(record.path),
+                    'path': record.path,
+                    'name': record.name,
+                    'status': 'threat' if record.is_threat else 'clean',
+                    'result': record.to_dict()
+                }
+                for record in records
+            ]
+        }
+    
     def clear_list(self) -> Dict[str, Any]:
         """Очистить список файлов"""
-        self.found_threats.clear()
-        self.threat_processes.clear()
-        self.stats = {
-            'scanned': 0,
-            'threats': 0,
-            'clean': 0,
-            'start_time': None
-        }
+        self.results.reset()
         
         self.log('info', 'Results cleared')
         
@@ -0,0 +1,64 @@
+import json
+import time
+import threading
+from typing import Callable, Optional
+
+
+class UIEventBus:
+    """Буфер событий UI с пакетной отправкой в webview
+
+    События копятся в памяти и раз в кадр уходят в JS одним вызовом
+    applyBatch([...]). Часто обновляемые значения (прогресс, статистика,
+    таймер) объединяются: в пачку попадает только последнее значение.
+    """
+
+    def __init__(self, dispatch: Callable[[str], None], frame_interval: float = 1 / 30):
+        self.dispatch = dispatch
+        self.frame_interval = frame_interval
+
+        self._lock = threading.Lock()
+        self._events = []
+        self._slots = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def emit(self, handler: str, *args):
+        """Добавить событие в очередь"""
+        with self._lock:
+            self._events.append([handler, list(args)])
+        self._ensure_started()
+
+    def set(self, key: str, handler: str, *args):
+        """Добавить объединяемое событие - старое значение с тем же ключом заменяется"""
+        with self._lock:
+            index = self._slots.get(key)
+            if index is None:
+                self._slots[key] = len(self._events)
+                self._events.append([handler, list(args)])
+            else:
+                self._events[index][1] = list(args)
+        self._ensure_started()
+
+    def flush(self):
+        """Отправить накопленные события одним вызовом JS"""
+        with self._lock:
+            if not self._events:
+                return
+            events, self._events, self._slots = self._events, [], {}
+
+        try:
+            self.dispatch(f'applyBatch({json.dumps(events)})')
+        except Exception:
+            # Окно могло быть закрыто - события просто теряются
+            pass
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.frame_interval)
+            self.flush()
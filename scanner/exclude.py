@@ -0,0 +1,287 @@
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+# Файл правил в корне сканирования (синтаксис как у .gitignore)
+IGNORE_FILE = '.matrixignore'
+
+# Правила по умолчанию. Имя без "/" совпадает с файлом или папкой на любой глубине,
+# "/" в конце - только папки, "?:/..." - путь от корня любого диска.
+DEFAULT_EXCLUDES = (
+    '?:/Windows/',
+    '?:/ProgramData/',
+    '?:/Program Files/Windows*/',
+    '?:/Program Files (x86)/Windows*/',
+    'WinSxS/',
+    '$Recycle.Bin/',
+    'System Volume Information/',
+    '**/AppData/Local/Temp/',
+    'node_modules/',
+    '.git/',
+    '/proc/',
+    '/sys/',
+    '/dev/',
+)
+
+# Windows и macOS по умолчанию не различают регистр в путях
+_CASE_INSENSITIVE = os.name == 'nt' or sys.platform == 'darwin'
+_GLOB_CHARS = re.compile(r'[*?\[]')
+_DRIVE = re.compile(r'^[A-Za-z?*]:/')
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_size(text: str) -> int:
+    """Размер вида 512, 64K, 10M, 2G (в байтах)"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*', text.upper())
+    if not match:
+        raise ValueError(f'Invalid size: {text}')
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def _normalize(path: str) -> str:
+    """Путь с прямыми разделителями, без завершающего разделителя"""
+    if os.sep != '/':
+        path = path.replace(os.sep, '/')
+    if len(path) > 1 and path.endswith('/') and not _DRIVE.fullmatch(path):
+        path = path.rstrip('/')
+    return path
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Перевести glob в регулярное выражение: * и ? - в пределах имени, ** - через папки"""
+    parts = []
+    index = 0
+    length = len(pattern)
+    while index < length:
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+            continue
+        if pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', index + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body.replace(chr(92), chr(92) * 2)}]')
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return ''.join(parts)
+
+
+class ExclusionRule(NamedTuple):
+    """Разобранное правило исключения"""
+    pattern: str
+    negate: bool
+    dir_only: bool
+    # Имя без glob (совпадает с последним компонентом пути) - проверяется по множеству
+    name: Optional[str]
+    # Регулярное выражение для последнего компонента пути
+    name_regex: Optional[str]
+    # Регулярное выражение для всего пути
+    path_regex: Optional[str]
+
+
+def parse_rule(line: str, base: Optional[str] = None) -> Optional[ExclusionRule]:
+    """Разобрать строку правила в стиле .gitignore; None - пустая строка или комментарий
+
+    Правило с "/" в начале или середине привязано к base (корню, для которого
+    оно задано); у глобальных правил такой путь считается абсолютным ("/proc/",
+    "C:/Windows/"), а правило с "/" только в середине совпадает на любой
+    глубине. Обратная косая черта считается разделителем пути.
+    """
+    pattern = line.strip()
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    pattern = pattern.replace('\\', '/')
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    anchored = '/' in pattern and not pattern.startswith('**/')
+    if base is None and '/' not in pattern:
+        if _GLOB_CHARS.search(pattern):
+            return ExclusionRule(line, negate, dir_only, None, _glob_to_regex(pattern), None)
+        return ExclusionRule(line, negate, dir_only, pattern, None, None)
+
+    if pattern.startswith('**/'):
+        pattern = pattern[3:]
+    if base is not None:
+        # Правила корня действуют только внутри него
+        prefix = re.escape(_normalize(base).rstrip('/')) + '/'
+        regex = prefix + ('' if anchored else '(?:.*/)?') + _glob_to_regex(pattern.lstrip('/'))
+    elif pattern.startswith('/') or _DRIVE.match(pattern):
+        regex = _glob_to_regex(pattern)
+    else:
+        regex = '(?:.*/)?' + _glob_to_regex(pattern)
+    return ExclusionRule(line, negate, dir_only, None, None, regex)
+
+
+def read_ignore_file(path: str) -> List[str]:
+    """Строки файла правил (несуществующий файл - нет правил)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+class _CompiledRules:
+    """Подряд идущие правила одного вида (исключения или возвраты "!")"""
+
+    def __init__(self, rules: Sequence[ExclusionRule]):
+        flags = re.IGNORECASE if _CASE_INSENSITIVE else 0
+        fold = str.casefold if _CASE_INSENSITIVE else (lambda text: text)
+        self._fold = fold
+        self.names = {fold(rule.name) for rule in rules if rule.name}
+        name_patterns = [rule.name_regex for rule in rules if rule.name_regex]
+        path_patterns = [rule.path_regex for rule in rules if rule.path_regex]
+        # Все правила вида - в одном выражении: проверка за один проход
+        self.name_regex = re.compile('|'.join(f'(?:{p})' for p in name_patterns), flags) if name_patterns else None
+        self.path_regex = re.compile('|'.join(f'(?:{p})' for p in path_patterns), flags) if path_patterns else None
+        self.empty = not (self.names or self.name_regex or self.path_regex)
+
+    def matches(self, path: str, name: str) -> bool:
+        if self.empty:
+            return False
+        if self.names and self._fold(name) in self.names:
+            return True
+        if self.name_regex is not None and self.name_regex.fullmatch(name):
+            return True
+        return self.path_regex is not None and self.path_regex.fullmatch(path) is not None
+
+
+class _RuleSequence:
+    """Правила по порядку: решает последнее совпавшее (как в .gitignore)
+
+    Подряд идущие правила одного вида собраны в один _CompiledRules,
+    группы проверяются с конца до первого совпадения. Без правил "!"
+    группа одна - проверка за один проход, как раньше.
+    """
+
+    def __init__(self, rules: Sequence[ExclusionRule]):
+        self._groups = []
+        start = 0
+        for index in range(1, len(rules) + 1):
+            if index == len(rules) or rules[index].negate != rules[start].negate:
+                self._groups.append((rules[start].negate, _CompiledRules(rules[start:index])))
+                start = index
+        self._groups.reverse()
+
+    def excludes(self, path: str, name: str) -> bool:
+        for negate, compiled in self._groups:
+            if compiled.matches(path, name):
+                return not negate
+        return False
+
+
+class ExclusionMatcher:
+    """Скомпилированные правила исключения: пути (glob/.gitignore), размер и время изменения
+
+    Решение о папке принимается по пути из DirEntry, без stat и без
+    перебора правил: имена без glob проверяются по множеству, остальные
+    правила собраны в регулярные выражения. Как в .gitignore, решает
+    последнее совпавшее правило: "!" возвращает путь, исключённый
+    правилом выше, а правило ниже "!" снова его исключает. Правила
+    корней идут после общих. Содержимое исключённой папки вернуть
+    нельзя - обход в неё не заходит.
+    """
+
+    def __init__(self,
+                 patterns: Sequence[str] = DEFAULT_EXCLUDES,
+                 root_patterns: Optional[Dict[str, Sequence[str]]] = None,
+                 min_size: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 modified_after: Optional[float] = None,
+                 modified_before: Optional[float] = None):
+        self.patterns = list(patterns)
+        self.root_patterns = {root: list(rules) for root, rules in (root_patterns or {}).items()}
+        self.min_size = min_size
+        self.max_size = max_size
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+
+        rules = [parse_rule(line) for line in self.patterns]
+        for root, lines in self.root_patterns.items():
+            rules.extend(parse_rule(line, root) for line in lines)
+        rules = [rule for rule in rules if rule is not None]
+
+        # Правило для папки не действует на файлы, остальные - на оба вида
+        self._dir_rules = _RuleSequence(rules)
+        self._file_rules = _RuleSequence([rule for rule in rules if not rule.dir_only])
+        self._check_stat = any(value is not None for value in (min_size, max_size, modified_after, modified_before))
+
+    @classmethod
+    def for_roots(cls, roots: Sequence[str], patterns: Sequence[str] = DEFAULT_EXCLUDES,
+                  root_patterns: Optional[Dict[str, Sequence[str]]] = None, **filters) -> 'ExclusionMatcher':
+        """Правила с учётом файлов .matrixignore в корнях сканирования"""
+        merged = {root: list(rules) for root, rules in (root_patterns or {}).items()}
+        for root in roots:
+            lines = read_ignore_file(os.path.join(root, IGNORE_FILE))
+            if lines:
+                merged.setdefault(root, []).extend(lines)
+        return cls(patterns, merged, **filters)
+
+    def excludes_dir(self, path: str) -> bool:
+        """Не спускаться в папку (решение только по пути)"""
+        normalized = _normalize(path)
+        name = normalized.rsplit('/', 1)[-1]
+        return self._dir_rules.excludes(normalized, name)
+
+    def excludes_file(self, path: str) -> bool:
+        normalized = _normalize(path)
+        name = normalized.rsplit('/', 1)[-1]
+        return self._file_rules.excludes(normalized, name)
+
+    def accepts_stat(self, file_stats: os.stat_result) -> bool:
+        """Фильтры по размеру и времени изменения"""
+        if not self._check_stat:
+            return True
+        if self.min_size is not None and file_stats.st_size < self.min_size:
+            return False
+        if self.max_size is not None and file_stats.st_size > self.max_size:
+            return False
+        if self.modified_after is not None and file_stats.st_mtime < self.modified_after:
+            return False
+        if self.modified_before is not None and file_stats.st_mtime > self.modified_before:
+            return False
+        return True
+
+    def accepts_file(self, path: str, file_stats: os.stat_result) -> bool:
+        return self.accepts_stat(file_stats) and not self.excludes_file(path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'patterns': list(self.patterns),
+            'root_patterns': {root: list(rules) for root, rules in self.root_patterns.items()},
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'modified_after': self.modified_after,
+            'modified_before': self.modified_before,
+        }
+
+
+def max_age_filter(days: Optional[float]) -> Optional[float]:
+    """modified_after для файлов, изменённых не раньше days дней назад"""
+    return None if days is None else time.time() - days * 86400
@@ -0,0 +1,283 @@
+import io
+import os
+import csv
+import gzip
+import json
+import struct
+import contextlib
+from pathlib import PureWindowsPath, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+from scanner.results import ScanRecord
+
+# Формат отчёта -> расширение файла
+EXPORT_FORMATS = {
+    'ndjson': '.ndjson',
+    'csv': '.csv',
+    'sarif': '.sarif',
+    'binary': '.mxr',
+}
+# Сжатие -> расширение, добавляемое после расширения формата
+EXPORT_COMPRESSIONS = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+_FORMAT_ALIASES = {'.jsonl': 'ndjson', '.json': 'ndjson'}
+# Фильтры диалога сохранения pywebview
+EXPORT_FILE_TYPES = (
+    'NDJSON (*.ndjson;*.ndjson.gz;*.ndjson.zst)',
+    'CSV (*.csv;*.csv.gz;*.csv.zst)',
+    'SARIF (*.sarif;*.sarif.gz)',
+    'Binary report (*.mxr;*.mxr.gz;*.mxr.zst)',
+)
+
+CSV_COLUMNS = ('path', 'name', 'size', 'hash', 'quickHash', 'isThreat',
+               'threatLevel', 'threatType', 'scanDate', 'isRunning')
+
+# Двоичный отчёт: заголовок, метаданные JSON, затем записи до конца файла
+REPORT_MAGIC = b'MXREPORT'
+REPORT_FORMAT = 1
+REPORT_HEADER = struct.Struct('<8sII')
+# size, scan_date, threat_level, flags, длины path / threat_type / quick_hash, sha256
+REPORT_RECORD = struct.Struct('<qdBBIHH32s')
+FLAG_RUNNING = 1
+FLAG_SHA256 = 2
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+# Уровень угрозы -> level результата SARIF
+_SARIF_LEVELS = {3: 'error', 2: 'warning', 1: 'note'}
+
+# Размер буфера записи (перед сжатием)
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+class ExportError(Exception):
+    """Неизвестный формат, недоступное сжатие или повреждённый отчёт"""
+
+
+def guess_format(path: str) -> Tuple[str, Optional[str]]:
+    """Формат и сжатие по имени файла: report.csv.gz -> ('csv', 'gzip')"""
+    base, ext = os.path.splitext(path.lower())
+    compression = None
+    for name, suffix in EXPORT_COMPRESSIONS.items():
+        if ext == suffix:
+            compression = name
+            base, ext = os.path.splitext(base)
+            break
+
+    for name, suffix in EXPORT_FORMATS.items():
+        if ext == suffix:
+            return name, compression
+    return _FORMAT_ALIASES.get(ext, 'ndjson'), compression
+
+
+@contextlib.contextmanager
+def _open_output(path: str, compression: Optional[str]) -> Iterator[BinaryIO]:
+    """Временный файл рядом с path (со сжатием); заменяет path только при успехе
+
+    Недописанный отчёт не остаётся на месте прежнего.
+    """
+    if compression not in (None, *EXPORT_COMPRESSIONS):
+        raise ExportError(f'Unknown compression: {compression}')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ExportError('zstd compression requires the zstandard package')
+
+    temp_path = path + '.tmp'
+    try:
+        with contextlib.ExitStack() as stack:
+            raw = stack.enter_context(open(temp_path, 'wb', buffering=WRITE_BUFFER_SIZE))
+            if compression == 'gzip':
+                # Без имени файла и времени в заголовке - одинаковые данные дают одинаковый архив
+                yield stack.enter_context(gzip.GzipFile(filename='', mode='wb', fileobj=raw,
+                                                        compresslevel=6, mtime=0))
+            elif compression == 'zstd':
+                yield stack.enter_context(zstandard.ZstdCompressor(level=3).stream_writer(raw))
+            else:
+                yield raw
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+@contextlib.contextmanager
+def _text(stream: BinaryIO) -> Iterator[io.TextIOWrapper]:
+    """Текстовая обёртка, которая не закрывает поток под собой
+
+    Недекодируемые байты имён файлов (surrogateescape) записываются
+    как \\udcXX, чтобы текстовый отчёт оставался корректным UTF-8.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='backslashreplace', newline='')
+    try:
+        yield text
+        text.flush()
+    finally:
+        text.detach()
+
+
+def _write_ndjson(stream: BinaryIO, records: Iterable[ScanRecord], metadata: Dict[str, Any]) -> int:
+    count = 0
+    with _text(stream) as text:
+        text.write(json.dumps({'type': 'report', **metadata}, ensure_ascii=False) + '\n')
+        for record in records:
+            text.write(json.dumps({'type': 'result', **record.to_dict()}, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def _write_csv(stream: BinaryIO, records: Iterable[ScanRecord], metadata: Dict[str, Any]) -> int:
+    count = 0
+    with _text(stream) as text:
+        writer = csv.writer(text)
+        writer.writerow(CSV_COLUMNS)
+        for record in records:
+            row = record.to_dict()
+            writer.writerow([row[column] for column in CSV_COLUMNS])
+            count += 1
+    return count
+
+
+def _file_uri(path: str) -> str:
+    """URI файла для SARIF (путь Windows или POSIX, независимо от системы экспорта)"""
+    pure = PureWindowsPath(path) if PureWindowsPath(path).drive else PurePosixPath(path)
+    return pure.as_uri() if pure.is_absolute() else pure.as_posix()
+
+
+def _sarif_result(record: ScanRecord) -> Dict[str, Any]:
+    return {
+        'ruleId': record.threat_type,
+        'level': _SARIF_LEVELS.get(record.threat_level, 'warning'),
+        'message': {'text': f'{record.threat_type} detected: {record.name}'},
+        'locations': [{
+            'physicalLocation': {'artifactLocation': {'uri': _file_uri(record.path)}}
+        }],
+        'properties': {
+            'sha256': record.sha256,
+            'size': record.size,
+            'threatLevel': record.threat_level,
+            'scanDate': record.scan_date,
+            'isRunning': record.is_running,
+        },
+    }
+
+
+def _write_sarif(stream: BinaryIO, records: Iterable[ScanRecord], metadata: Dict[str, Any]) -> int:
+    """SARIF 2.1.0: документ пишется по частям, массив results - по одному результату
+
+    В SARIF попадают только угрозы (чистые файлы - не находки).
+    """
+    driver = {
+        'name': 'Matrix Scanner',
+        'version': metadata.get('version'),
+        'informationUri': 'https://github.com/nalmehelm/matrixchecker',
+    }
+    count = 0
+    with _text(stream) as text:
+        text.write(f'{{"$schema": {json.dumps(SARIF_SCHEMA)}, "version": "2.1.0", '
+                   f'"runs": [{{"tool": {json.dumps({"driver": driver})}, "results": [\n')
+        for record in records:
+            if not record.is_threat:
+                continue
+            if count:
+                text.write(',\n')
+            text.write(json.dumps(_sarif_result(record), ensure_ascii=False))
+            count += 1
+        text.write('\n], "properties": ' + json.dumps(metadata, ensure_ascii=False) + '}]}\n')
+    return count
+
+
+def _write_binary(stream: BinaryIO, records: Iterable[ScanRecord], metadata: Dict[str, Any]) -> int:
+    """Компактный двоичный отчёт: фиксированная часть записи + строки UTF-8
+
+    SHA256 хранится 32 байтами вместо 64 символов hex, имя файла не
+    хранится (берётся из пути) - как в ScanRecord.
+    """
+    header = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+    stream.write(REPORT_HEADER.pack(REPORT_MAGIC, REPORT_FORMAT, len(header)) + header)
+
+    count = 0
+    for record in records:
+        path = record.path.encode('utf-8', 'surrogateescape')
+        threat_type = (record.threat_type or '').encode('utf-8')
+        quick_hash = (record.quick_hash or '').encode('ascii')
+        flags = FLAG_RUNNING if record.is_running else 0
+        sha256 = b''
+        if record.sha256:
+            sha256 = bytes.fromhex(record.sha256)
+            flags |= FLAG_SHA256
+        stream.write(REPORT_RECORD.pack(
+            record.size, record.scan_date, record.threat_level, flags,
+            len(path), len(threat_type), len(quick_hash), sha256
+        ) + path + threat_type + quick_hash)
+        count += 1
+    return count
+
+
+_WRITERS = {
+    'ndjson': _write_ndjson,
+    'csv': _write_csv,
+    'sarif': _write_sarif,
+    'binary': _write_binary,
+}
+
+
+def export_records(path: str, records: Iterable[ScanRecord], metadata: Dict[str, Any],
+                   format: Optional[str] = None, compression: Optional[str] = None) -> int:
+    """Записать отчёт потоком: записи сериализуются по одной, сразу в файл
+
+    format и compression по умолчанию определяются по имени файла.
+    Память не зависит от размера отчёта. Возвращает число записанных
+    результатов.
+    """
+    if format is None:
+        format, guessed = guess_format(path)
+        compression = compression or guessed
+    writer = _WRITERS.get(format)
+    if writer is None:
+        raise ExportError(f'Unknown export format: {format}')
+
+    with _open_output(path, compression) as stream:
+        return writer(stream, records, metadata)
+
+
+def read_binary_report(stream: BinaryIO) -> Tuple[Dict[str, Any], Iterator[ScanRecord]]:
+    """Прочитать двоичный отчёт: (метаданные, итератор записей)
+
+    Записи читаются по мере обхода итератора, поток должен оставаться
+    открытым до конца обхода.
+    """
+    header = stream.read(REPORT_HEADER.size)
+    if len(header) < REPORT_HEADER.size:
+        raise ExportError('Truncated report header')
+    magic, format_version, metadata_size = REPORT_HEADER.unpack(header)
+    if magic != REPORT_MAGIC or format_version != REPORT_FORMAT:
+        raise ExportError('Not a binary scan report or unsupported format version')
+    metadata = json.loads(stream.read(metadata_size).decode('utf-8'))
+
+    def records() -> Iterator[ScanRecord]:
+        while True:
+            fixed = stream.read(REPORT_RECORD.size)
+            if not fixed:
+                return
+            if len(fixed) < REPORT_RECORD.size:
+                raise ExportError('Truncated report record')
+            size, scan_date, level, flags, path_size, type_size, quick_size, sha256 = \
+                REPORT_RECORD.unpack(fixed)
+            strings = stream.read(path_size + type_size + quick_size)
+            if len(strings) < path_size + type_size + quick_size:
+                raise ExportError('Truncated report record')
+            yield ScanRecord(
+                strings[:path_size].decode('utf-8', 'surrogateescape'),
+                size,
+                sha256.hex() if flags & FLAG_SHA256 else None,
+                strings[path_size + type_size:].decode('ascii') or None,
+                strings[path_size:path_size + type_size].decode('utf-8') or None,
+                level,
+                scan_date,
+                bool(flags & FLAG_RUNNING)
+            )
+
+    return metadata, records()
@@ -0,0 +1,171 @@
+import os
+import math
+import mmap
+import struct
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+from scanner.hashing import quick_hash, full_sha256
+from scanner.cancel import CancellationToken
+
+MAGIC = b'MXHASHDB'
+FORMAT_VERSION = 1
+
+# magic, format, bloom_k, count, bloom_bytes, names_size, db_version
+HEADER = struct.Struct('<8sIIQQQ8s')
+# sha256 (32 байта) + индекс названия
+RECORD = struct.Struct('<32sI')
+SHA256_SIZE = 32
+
+
+def _bloom_positions(key: bytes, bits: int, k: int) -> List[int]:
+    """Позиции битов фильтра Блума (двойное хеширование по двум половинам ключа)
+
+    Ключ - быстрый хеш файла (BLAKE2b), он уже равномерно распределён,
+    поэтому повторно хешировать его не нужно.
+    """
+    h1 = int.from_bytes(key[:8], 'little')
+    h2 = int.from_bytes(key[8:16], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(k)]
+
+
+class KnownHashDatabase:
+    """База хешей известных сборок читов, отображённая в память
+
+    Формат файла: заголовок, фильтр Блума по быстрому хешу, отсортированный
+    массив SHA-256 с индексами названий и таблица названий. Фильтр отсекает
+    почти все чистые файлы без чтения файла целиком; полный SHA-256 и
+    бинарный поиск нужны только при срабатывании фильтра.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._file = open(db_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, format_version, self.bloom_k, self.count,
+         bloom_bytes, names_size, db_version) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f'Unsupported hash database: {db_path}')
+
+        self.version = db_version.hex()
+        self.bloom_bits = bloom_bytes * 8
+        self._bloom_offset = HEADER.size
+        self._records_offset = self._bloom_offset + bloom_bytes
+        names_offset = self._records_offset + self.count * RECORD.size
+        self._names = self._map[names_offset:names_offset + names_size].decode('utf-8').split('\n')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def might_contain(self, quick_digest: str) -> bool:
+        """Проверка фильтра Блума: False - файла точно нет в базе"""
+        if not self.bloom_bits:
+            return False
+
+        key = bytes.fromhex(quick_digest)
+        bloom = self._map
+        offset = self._bloom_offset
+        for position in _bloom_positions(key, self.bloom_bits, self.bloom_k):
+            if not bloom[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def lookup_sha256(self, sha256_digest: str) -> Optional[str]:
+        """Найти название сборки по SHA-256 (бинарный поиск по mmap)"""
+        target = bytes.fromhex(sha256_digest)
+        low, high = 0, self.count
+
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._records_offset + middle * RECORD.size
+            value = self._map[offset:offset + SHA256_SIZE]
+            if value < target:
+                low = middle + 1
+            elif value > target:
+                high = middle
+            else:
+                name_index = RECORD.unpack_from(self._map, offset)[1]
+                return self._names[name_index]
+
+        return None
+
+    def check_file(self, file_path: str, quick_digest: Optional[str],
+                   cancel: Optional[CancellationToken] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Проверить файл по базе: (название сборки, SHA-256) или (None, None)
+
+        SHA-256 считается только если быстрый хеш прошёл фильтр Блума.
+        """
+        if quick_digest is None or not self.might_contain(quick_digest):
+            return None, None
+
+        sha256_digest = full_sha256(file_path, cancel)
+        return self.lookup_sha256(sha256_digest), sha256_digest
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class HashDatabaseBuilder:
+    """Сборка файла базы хешей из известных сборок читов"""
+
+    def __init__(self, false_positive_rate: float = 0.001):
+        self.false_positive_rate = false_positive_rate
+        self._entries = {}
+
+    def add(self, sha256_digest: str, quick_digest: str, name: str):
+        """Добавить сборку по готовым хешам"""
+        self._entries[bytes.fromhex(sha256_digest)] = (bytes.fromhex(quick_digest), name)
+
+    def add_file(self, file_path: str, name: str):
+        """Добавить сборку по самому файлу"""
+        self.add(full_sha256(file_path), quick_hash(file_path), name)
+
+    def add_many(self, entries: Iterable[Tuple[str, str, str]]):
+        for sha256_digest, quick_digest, name in entries:
+            self.add(sha256_digest, quick_digest, name)
+
+    def _bloom_size(self) -> Tuple[int, int]:
+        """Размер фильтра в байтах и число хеш-функций для заданной доли ложных срабатываний"""
+        count = max(1, len(self._entries))
+        bits = int(-count * math.log(self.false_positive_rate) / (math.log(2) ** 2))
+        bloom_bytes = max(8, (bits + 7) // 8)
+        k = max(1, round(bloom_bytes * 8 / count * math.log(2)))
+        return bloom_bytes, k
+
+    def write(self, db_path: str):
+        """Записать базу (атомарно, через временный файл)"""
+        bloom_bytes, k = self._bloom_size()
+        bloom = bytearray(bloom_bytes)
+        bits = bloom_bytes * 8
+
+        names = []
+        name_indexes = {}
+        records = bytearray()
+        for sha256_digest in sorted(self._entries):
+            quick_digest, name = self._entries[sha256_digest]
+            for position in _bloom_positions(quick_digest, bits, k):
+                bloom[position >> 3] |= 1 << (position & 7)
+            if name not in name_indexes:
+                name_indexes[name] = len(names)
+                names.append(name.replace('\n', ' '))
+            records += RECORD.pack(sha256_digest, name_indexes[name])
+
+        names_blob = '\n'.join(names).encode('utf-8')
+        db_version = hashlib.sha256(bytes(records) + names_blob).digest()[:8]
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, k, len(self._entries), bloom_bytes, len(names_blob), db_version)
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = db_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(bloom)
+            f.write(records)
+            f.write(names_blob)
+        os.replace(temp_path, db_path)
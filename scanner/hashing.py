@@ -0,0 +1,62 @@
+import os
+import hashlib
+from typing import Optional
+from scanner.cancel import CancellationToken
+
+# Размер блока, который быстрый хеш читает с начала и с конца файла
+QUICK_HASH_BLOCK = 64 * 1024
+# Буфер потокового SHA-256
+FULL_HASH_BUFFER = 1024 * 1024
+
+
+def quick_hash(file_path: str, file_size: Optional[int] = None,
+               cancel: Optional[CancellationToken] = None) -> str:
+    """Быстрый хеш: BLAKE2b(размер + первый блок + последний блок)
+
+    Читает не больше 2 * QUICK_HASH_BLOCK байт независимо от размера файла.
+    Используется как ключ кеша/дедупликации и как префильтр базы хешей,
+    но не как криптографический отпечаток всего файла.
+    """
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(file_path, 'rb') as f:
+        if file_size is None:
+            file_size = os.fstat(f.fileno()).st_size
+        digest.update(file_size.to_bytes(8, 'little'))
+
+        if file_size <= 2 * QUICK_HASH_BLOCK:
+            digest.update(f.read(file_size))
+        else:
+            digest.update(f.read(QUICK_HASH_BLOCK))
+            f.seek(file_size - QUICK_HASH_BLOCK)
+            digest.update(f.read(QUICK_HASH_BLOCK))
+
+    return digest.hexdigest()
+
+
+def full_sha256(file_path: str, cancel: Optional[CancellationToken] = None) -> str:
+    """Потоковый SHA-256 всего файла
+
+    С токеном отмены файл читается блоками с проверкой между ними,
+    чтобы остановка не ждала хеширования многогигабайтного файла.
+    """
+    with open(file_path, 'rb') as f:
+        if cancel is None and hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: чтение в C без промежуточных bytes-объектов
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+        digest = hashlib.sha256()
+        buffer = bytearray(FULL_HASH_BUFFER)
+        view = memoryview(buffer)
+        while True:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+
+    return digest.hexdigest()
@@ -0,0 +1,575 @@
+import io
+import os
+import re
+import zlib
+import struct
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+from scanner.matcher import SignatureMatcher
+from scanner.cancel import CancellationToken
+from scanner.bytecode import ClassFormatError, DEFAULT_MAX_POOL_SIZE, read_constant_strings
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+EOCD_SIZE = 22
+CENTRAL_HEADER_SIZE = 46
+LOCAL_HEADER_SIZE = 30
+MAX_COMMENT_SIZE = 0xFFFF
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+
+
+class ZipFormatError(Exception):
+    """Файл не является корректным ZIP/JAR архивом"""
+
+
+class ArchiveLimitError(Exception):
+    """Вложенные архивы превысили лимит объёма или числа записей (похоже на zip-бомбу)"""
+
+
+# Вердикт для архива, вложенные уровни которого превысили лимиты: раздувание
+# архива не должно превращать чит в "чистый" файл
+ARCHIVE_LIMIT_VERDICT = 'Suspicious Archive (nested limits exceeded)'
+
+
+class ZipEntry(NamedTuple):
+    """Запись центрального каталога (создаётся только для нужных записей)"""
+    name: str
+    method: int
+    compressed_size: int
+    uncompressed_size: int
+    local_offset: int
+
+
+class ZipCentralDirectory:
+    """Центральный каталог ZIP, прочитанный одним чтением
+
+    Каталог хранится как сырые байты; записи разбираются struct.unpack_from
+    по смещениям, без построения ZipInfo на каждую запись.
+    """
+
+    def __init__(self, fileobj: BinaryIO, size: Optional[int] = None,
+                 cancel: Optional[CancellationToken] = None):
+        self.fileobj = fileobj
+        self.cancel = cancel
+        if size is None:
+            size = fileobj.seek(0, os.SEEK_END)
+        self.size = size
+
+        cd_offset, cd_size, self.entry_count, eocd_pos = self._read_eocd()
+
+        # Архив может быть дописан к другому файлу (например, к .exe) - учитываем сдвиг
+        self.base_offset = eocd_pos - cd_size - cd_offset
+        if self.base_offset < 0 or cd_offset + self.base_offset + cd_size > size:
+            raise ZipFormatError('Central directory is out of bounds')
+
+        fileobj.seek(cd_offset + self.base_offset)
+        self.data = fileobj.read(cd_size)
+        if len(self.data) != cd_size:
+            raise ZipFormatError('Truncated central directory')
+        self._lowered = None
+
+    @property
+    def lowered(self) -> bytes:
+        """Данные каталога в нижнем регистре (для поиска без учёта регистра; смещения те же)"""
+        if self._lowered is None:
+            self._lowered = self.data.lower()
+        return self._lowered
+
+    def _read_eocd(self) -> tuple:
+        """Найти End-of-Central-Directory (с учётом ZIP64)"""
+        tail_size = min(self.size, EOCD_SIZE + MAX_COMMENT_SIZE)
+        self.fileobj.seek(self.size - tail_size)
+        tail = self.fileobj.read(tail_size)
+
+        index = tail.rfind(EOCD_SIGNATURE)
+        if index < 0 or index + EOCD_SIZE > len(tail):
+            raise ZipFormatError('End of central directory not found')
+
+        eocd_pos = self.size - tail_size + index
+        (_, _, _, _, entry_count, cd_size, cd_offset, _) = struct.unpack_from('<4sHHHHIIH', tail, index)
+
+        if 0xFFFFFFFF in (cd_size, cd_offset) or entry_count == 0xFFFF:
+            locator_index = index - 20
+            if locator_index >= 0 and tail[locator_index:locator_index + 4] == ZIP64_LOCATOR_SIGNATURE:
+                zip64_eocd_offset = struct.unpack_from('<Q', tail, locator_index + 8)[0]
+                self.fileobj.seek(zip64_eocd_offset)
+                record = self.fileobj.read(56)
+                if record[:4] != ZIP64_EOCD_SIGNATURE:
+                    raise ZipFormatError('Bad ZIP64 end of central directory')
+                entry_count, cd_size, cd_offset = struct.unpack_from('<QQQ', record, 32)
+                # Сдвиг считается от начала записи ZIP64 EOCD
+                eocd_pos = zip64_eocd_offset
+
+        return cd_offset, cd_size, entry_count, eocd_pos
+
+    def _parse_entry(self, pos: int) -> tuple:
+        """Разобрать заголовок записи по смещению; вернуть (ZipEntry, смещение следующей)"""
+        data = self.data
+        if data[pos:pos + 4] != CENTRAL_HEADER_SIGNATURE:
+            raise ZipFormatError('Bad central directory header')
+
+        (flags, method, compressed_size, uncompressed_size,
+         name_len, extra_len, comment_len, local_offset) = struct.unpack_from('<8xHH8xIIHHH8xI', data, pos)
+
+        name_start = pos + CENTRAL_HEADER_SIZE
+        raw_name = data[name_start:name_start + name_len]
+        # Бит 11 - имя в UTF-8, иначе cp437
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437', errors='replace')
+
+        if 0xFFFFFFFF in (compressed_size, uncompressed_size, local_offset):
+            extra = data[name_start + name_len:name_start + name_len + extra_len]
+            uncompressed_size, compressed_size, local_offset = self._zip64_extra(
+                extra, uncompressed_size, compressed_size, local_offset
+            )
+
+        entry = ZipEntry(name, method, compressed_size, uncompressed_size, local_offset)
+        return entry, name_start + name_len + extra_len + comment_len
+
+    @staticmethod
+    def _zip64_extra(extra: bytes, uncompressed_size: int, compressed_size: int, local_offset: int) -> tuple:
+        """Достать 64-битные размеры и смещение из extra-поля ZIP64"""
+        pos = 0
+        while pos + 4 <= len(extra):
+            header_id, data_size = struct.unpack_from('<HH', extra, pos)
+            if header_id == 0x0001:
+                values = iter(struct.unpack_from(f'<{data_size // 8}Q', extra, pos + 4))
+                if uncompressed_size == 0xFFFFFFFF:
+                    uncompressed_size = next(values, uncompressed_size)
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = next(values, compressed_size)
+                if local_offset == 0xFFFFFFFF:
+                    local_offset = next(values, local_offset)
+                break
+            pos += 4 + data_size
+        return uncompressed_size, compressed_size, local_offset
+
+    def iter_entries(self) -> Iterator[ZipEntry]:
+        """Лениво перебрать записи каталога"""
+        pos = 0
+        end = len(self.data)
+        while pos < end:
+            entry, pos = self._parse_entry(pos)
+            yield entry
+
+    def entries_ending_with(self, suffixes: Tuple[bytes, ...], lowered: bool = False) -> List[ZipEntry]:
+        """Записи, имя которых заканчивается одним из suffixes (lowered - без учёта регистра)
+
+        Сначала суффиксы считаются по байтам каталога: нет ни одного - ни
+        одна запись не разбирается. Если совпадений мало, разбираются только
+        записи с совпадением в конце имени (совпадения в extra-полях и
+        комментариях отбрасываются проверкой границ имени); если они
+        составляют заметную часть каталога (классы), дешевле один
+        последовательный проход.
+        """
+        data = self.lowered if lowered else self.data
+        hits = sum(data.count(suffix) for suffix in suffixes)
+        if not hits:
+            return []
+
+        if hits * 2 >= self.entry_count:
+            names = tuple(suffix.decode('ascii') for suffix in suffixes)
+            return [
+                entry for entry in self.iter_entries()
+                if (entry.name.lower() if lowered else entry.name).endswith(names)
+            ]
+
+        entries = []
+        for match in re.finditer(b'|'.join(re.escape(suffix) for suffix in suffixes), data):
+            # Заголовок записи - ближайшая сигнатура, после которой имя заканчивается на match.end()
+            end = match.start() - CENTRAL_HEADER_SIZE + 4
+            while end >= 4:
+                header = self.data.rfind(CENTRAL_HEADER_SIGNATURE, 0, end)
+                if header < 0 or match.end() - header - CENTRAL_HEADER_SIZE > 0xFFFF:
+                    break
+                name_len = struct.unpack_from('<H', self.data, header + 28)[0]
+                if header + CENTRAL_HEADER_SIZE + name_len == match.end():
+                    entries.append(self._parse_entry(header)[0])
+                    break
+                # Сигнатура внутри чужого имени - ищем заголовок раньше
+                end = header + 3
+        return entries
+
+    def find_entry(self, name: str) -> Optional[ZipEntry]:
+        """Найти запись по точному имени без разбора остальных"""
+        encoded = name.encode('utf-8')
+        start = 0
+        while True:
+            index = self.data.find(encoded, start)
+            if index < 0:
+                return None
+            header = index - CENTRAL_HEADER_SIZE
+            if header >= 0 and self.data[header:header + 4] == CENTRAL_HEADER_SIGNATURE:
+                name_len = struct.unpack_from('<H', self.data, header + 28)[0]
+                if name_len == len(encoded):
+                    return self._parse_entry(header)[0]
+            start = index + 1
+
+    def entry_at(self, offset: int) -> Optional[tuple]:
+        """Запись, имя которой содержит смещение offset в данных каталога
+
+        Возвращает (ZipEntry, начало имени) или None, если offset попал
+        в extra-поле или комментарий.
+        """
+        pos = 0
+        while pos < len(self.data):
+            name_start = pos + CENTRAL_HEADER_SIZE
+            entry, next_pos = self._parse_entry(pos)
+            if offset < next_pos:
+                name_len = struct.unpack_from('<H', self.data, pos + 28)[0]
+                if name_start <= offset < name_start + name_len:
+                    return entry, name_start
+                return None
+            pos = next_pos
+        return None
+
+    def data_offset(self, entry: ZipEntry) -> int:
+        """Смещение данных записи в файле (после локального заголовка)"""
+        self.fileobj.seek(entry.local_offset + self.base_offset)
+        header = self.fileobj.read(LOCAL_HEADER_SIZE)
+        if header[:4] != LOCAL_HEADER_SIGNATURE:
+            raise ZipFormatError('Bad local file header')
+
+        name_len, extra_len = struct.unpack_from('<HH', header, 26)
+        return entry.local_offset + self.base_offset + LOCAL_HEADER_SIZE + name_len + extra_len
+
+    def open_entry(self, entry: ZipEntry, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Потоково распаковать запись по частям"""
+        self.fileobj.seek(self.data_offset(entry))
+
+        if entry.method == METHOD_STORED:
+            decompressor = None
+        elif entry.method == METHOD_DEFLATED:
+            decompressor = zlib.decompressobj(-15)
+        else:
+            raise ZipFormatError(f'Unsupported compression method {entry.method}')
+
+        remaining = entry.compressed_size
+        while remaining > 0:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+            chunk = self.fileobj.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if decompressor is None:
+                yield chunk
+            else:
+                data = decompressor.decompress(chunk, chunk_size)
+                while data:
+                    yield data
+                    # Ограничиваем размер выдаваемых кусков - защита от zip-бомб
+                    data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+
+
+class ArchiveSlice:
+    """Окно в seekable-потоке: несжатая вложенная запись читается на месте, без копии"""
+
+    def __init__(self, fileobj: BinaryIO, offset: int, size: int):
+        self.fileobj = fileobj
+        self.offset = offset
+        self.size = size
+        self.position = 0
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = max(0, self.size - self.position)
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        self.fileobj.seek(self.offset + self.position)
+        data = self.fileobj.read(size)
+        self.position += len(data)
+        return data
+
+
+class JarInspector:
+    """Лёгкая проверка JAR по центральному каталогу
+
+    Имена записей проверяются одним проходом регулярного выражения прямо
+    по байтам каталога; Python-разбор записей нужен только для найденного
+    совпадения. Распаковываются лишь файлы метаданных (MANIFEST.MF,
+    fabric.mod.json, mods.toml) и только если имена ничего не дали.
+
+    Затем - пул констант классов (если задан class_matcher): ловит
+    сборки с переименованными пакетами по строкам и ссылкам, которые
+    обфускация не меняет. Классы читаются потоково, до конца пула
+    констант, в порядке расположения в архиве; память и объём чтения
+    ограничены лимитами, проверка останавливается на первом совпадении.
+
+    Вложенные .jar/.zip (jar-in-jar Fabric в META-INF/jars/ и т.п.)
+    проверяются теми же этапами после всех проверок верхнего уровня:
+    несжатые - окном в родительском потоке, сжатые - распаковкой в память.
+    Глубже max_depth обход не идёт. Лимиты действуют только на вложенные
+    уровни: все прочитанные там байты (тела архивов, метаданные, пулы
+    констант) идут в один счётчик max_nested_bytes, записи каталогов -
+    в max_entries. Вложенный архив, на котором лимит исчерпан, пропускается;
+    если чит не найден, результат - ARCHIVE_LIMIT_VERDICT, а не "чисто".
+    """
+
+    METADATA_FILES = (
+        'META-INF/MANIFEST.MF',
+        'fabric.mod.json',
+        'quilt.mod.json',
+        'META-INF/mods.toml',
+    )
+
+    # Строки нескольких классов проверяются одним поиском
+    CLASS_BATCH_SIZE = 64 * 1024
+    CLASS_CHUNK_SIZE = 16 * 1024
+    # Окончания имён классов и вложенных архивов (вложенные - без учёта регистра)
+    CLASS_SUFFIXES = (b'.class',)
+    NESTED_SUFFIXES = (b'.jar', b'.zip')
+
+    def __init__(self, matcher: SignatureMatcher, max_metadata_size: int = 1024 * 1024,
+                 metadata_matcher: Optional[SignatureMatcher] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 class_matcher: Optional[SignatureMatcher] = None,
+                 max_classes: int = 20000,
+                 max_class_bytes: int = 64 * 1024 * 1024,
+                 max_pool_size: int = DEFAULT_MAX_POOL_SIZE,
+                 max_depth: int = 3,
+                 max_nested_bytes: int = 128 * 1024 * 1024,
+                 max_entries: int = 200000):
+        self.matcher = matcher
+        self.max_metadata_size = max_metadata_size
+        # Маркеры манифеста могут отличаться от шаблонов имён записей
+        self.metadata_matcher = metadata_matcher or matcher
+        self.cancel = cancel
+        # Маркеры байткода: строки и ссылки на классы из пула констант
+        self.class_matcher = class_matcher
+        self.max_classes = max_classes
+        self.max_class_bytes = max_class_bytes
+        self.max_pool_size = max_pool_size
+        # Лимиты вложенных архивов (на один проверяемый файл, по всем уровням)
+        self.max_depth = max_depth
+        self.max_nested_bytes = max_nested_bytes
+        self.max_entries = max_entries
+        self._nested_bytes = 0
+        self._entries = 0
+        self.limit_exceeded = False
+
+    def inspect(self, file_path: str) -> Optional[str]:
+        """Проверить JAR файл; вернуть название чита или None"""
+        with open(file_path, 'rb') as f:
+            return self.inspect_stream(f)
+
+    def inspect_stream(self, fileobj: BinaryIO, size: Optional[int] = None, depth: int = 0) -> Optional[str]:
+        """Проверить архив из любого seekable-потока (depth - уровень вложенности)"""
+        if depth == 0:
+            self._nested_bytes = 0
+            self._entries = 0
+            self.limit_exceeded = False
+
+        directory = ZipCentralDirectory(fileobj, size, self.cancel)
+        if depth > 0:
+            self._entries += directory.entry_count
+            if self._entries > self.max_entries:
+                raise ArchiveLimitError(f'More than {self.max_entries} entries in nested archives')
+            self._charge(len(directory.data))
+
+        cheat_name = self.match_entry_names(directory)
+        if cheat_name:
+            return cheat_name
+
+        cheat_name = self.match_metadata(directory, depth)
+        if cheat_name:
+            return cheat_name
+
+        cheat_name = self.match_classes(directory, depth)
+        if cheat_name:
+            return cheat_name
+
+        cheat_name = self.match_nested(directory, depth)
+        if cheat_name is None and depth == 0 and self.limit_exceeded:
+            return ARCHIVE_LIMIT_VERDICT
+        return cheat_name
+
+    def _charge(self, size: int):
+        """Учесть байты, прочитанные на вложенном уровне, в общем лимите"""
+        self._nested_bytes += size
+        if self._nested_bytes > self.max_nested_bytes:
+            raise ArchiveLimitError(f'Nested archives exceed {self.max_nested_bytes} bytes')
+
+    def _open_entry(self, directory: ZipCentralDirectory, entry: ZipEntry, depth: int,
+                    chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Распаковать запись; на вложенных уровнях - с учётом общего лимита"""
+        stream = directory.open_entry(entry, chunk_size)
+        if depth == 0:
+            return stream
+        return self._charged(stream)
+
+    def _read_entry(self, directory: ZipCentralDirectory, entry: ZipEntry, depth: int, max_size: int) -> bytes:
+        """Прочитать запись целиком, но не больше max_size байт"""
+        parts = []
+        total = 0
+        stream = self._open_entry(directory, entry, depth)
+        try:
+            for chunk in stream:
+                parts.append(chunk)
+                total += len(chunk)
+                if total >= max_size:
+                    break
+        finally:
+            stream.close()
+        return b''.join(parts)[:max_size]
+
+    def _charged(self, stream: Iterator[bytes]) -> Iterator[bytes]:
+        try:
+            for chunk in stream:
+                self._charge(len(chunk))
+                yield chunk
+        finally:
+            stream.close()
+
+    def match_entry_names(self, directory: ZipCentralDirectory) -> Optional[str]:
+        """Первое совпадение сигнатуры в именах записей"""
+        data = directory.lowered
+        pos = 0
+        while True:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+            match = self.matcher.search_bytes(data, pos)
+            if match is None:
+                return None
+
+            found = directory.entry_at(match.start())
+            if found is not None:
+                cheat_name = self.matcher.first(found[0].name)
+                if cheat_name:
+                    return cheat_name
+
+            # Совпадение в extra-поле или комментарии - ищем дальше
+            pos = match.start() + 1
+
+    def match_metadata(self, directory: ZipCentralDirectory, depth: int = 0) -> Optional[str]:
+        """Проверить содержимое файлов метаданных мода"""
+        for name in self.METADATA_FILES:
+            entry = directory.find_entry(name)
+            if entry is None:
+                continue
+
+            content = self._read_entry(directory, entry, depth, self.max_metadata_size)
+            cheat_name = self.metadata_matcher.first(content.decode('utf-8', errors='ignore'))
+            if cheat_name:
+                return cheat_name
+
+        return None
+
+    def match_classes(self, directory: ZipCentralDirectory, depth: int = 0) -> Optional[str]:
+        """Первое совпадение маркеров байткода в пулах констант классов"""
+        if not self.class_matcher:
+            return None
+
+        # Порядок расположения в архиве - чтение файла идёт вперёд, без скачков
+        entries = sorted(directory.entries_ending_with(self.CLASS_SUFFIXES), key=lambda entry: entry.local_offset)
+
+        buffer = bytearray()
+        total = 0
+        for entry in entries[:self.max_classes]:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+
+            stream = self._open_entry(directory, entry, depth, self.CLASS_CHUNK_SIZE)
+            try:
+                strings, size = read_constant_strings(stream, self.max_pool_size)
+            except (ClassFormatError, ZipFormatError, zlib.error):
+                # Не класс или повреждённая запись - остальные классы проверяем
+                continue
+            finally:
+                stream.close()
+
+            for value in strings:
+                buffer += value
+                buffer += b'\n'
+            total += size
+            if len(buffer) >= self.CLASS_BATCH_SIZE:
+                cheat_name = self._match_class_strings(buffer)
+                if cheat_name:
+                    return cheat_name
+                buffer.clear()
+            if total >= self.max_class_bytes:
+                break
+
+        return self._match_class_strings(buffer) if buffer else None
+
+    def _match_class_strings(self, buffer: bytearray) -> Optional[str]:
+        """Проверить строки пула констант (по одной на строку буфера)"""
+        data = buffer.lower()
+        pos = 0
+        while True:
+            match = self.class_matcher.search_bytes(data, pos)
+            if match is None:
+                return None
+
+            # Маркеры не содержат перевода строки - совпадение не выходит за пределы константы
+            start = buffer.rfind(b'\n', 0, match.start()) + 1
+            end = buffer.find(b'\n', match.end())
+            cheat_name = self.class_matcher.first(bytes(buffer[start:end]).decode('utf-8', errors='replace'))
+            if cheat_name:
+                return cheat_name
+            pos = match.start() + 1
+
+    def match_nested(self, directory: ZipCentralDirectory, depth: int) -> Optional[str]:
+        """Проверить вложенные архивы тем же набором этапов"""
+        # Обычно вложенных архивов нет - тогда ни одна запись не разбирается
+        entries = sorted(
+            directory.entries_ending_with(self.NESTED_SUFFIXES, lowered=True),
+            key=lambda entry: entry.local_offset
+        )
+        # Глубже лимита не спускаемся (цепочка архивов, вложенных сами в себя)
+        if not entries or depth >= self.max_depth:
+            return None
+
+        for entry in entries:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+
+            try:
+                if entry.method == METHOD_STORED:
+                    # Несжатый архив читаем прямо из родителя, но в лимит он идёт как распакованный
+                    self._charge(entry.compressed_size)
+                    nested = ArchiveSlice(directory.fileobj, directory.data_offset(entry), entry.compressed_size)
+                else:
+                    nested = self._read_nested(directory, entry)
+                cheat_name = self.inspect_stream(nested, nested.seek(0, os.SEEK_END), depth + 1)
+            except (ZipFormatError, zlib.error, struct.error):
+                # Повреждённый вложенный архив (или просто файл с таким расширением)
+                continue
+            except ArchiveLimitError:
+                # Остальные вложенные архивы всё равно проверяем: маленькие могут влезть в лимит
+                self.limit_exceeded = True
+                continue
+            if cheat_name:
+                return cheat_name
+
+        return None
+
+    def _read_nested(self, directory: ZipCentralDirectory, entry: ZipEntry) -> io.BytesIO:
+        """Распаковать вложенный архив в память с учётом общего лимита"""
+        # Размер из каталога может быть занижен - лимит проверяется и по факту распаковки
+        if self._nested_bytes + entry.uncompressed_size > self.max_nested_bytes:
+            raise ArchiveLimitError(f'Nested archives exceed {self.max_nested_bytes} bytes')
+
+        buffer = io.BytesIO()
+        stream = directory.open_entry(entry)
+        try:
+            for chunk in stream:
+                self._charge(len(chunk))
+                buffer.write(chunk)
+        finally:
+            stream.close()
+        return buffer
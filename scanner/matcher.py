@@ -0,0 +1,128 @@
+import re
+import json
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+
+def _trie_regex(keys: Iterable[str]) -> str:
+    """Регулярное выражение из префиксного дерева ключей
+
+    Общие префиксы не повторяются: (?:kill(?:aura)?|...) вместо
+    списка ключей через "|". Выражение начинается с набора первых
+    символов, поэтому движок пропускает неподходящие позиции без
+    перебора альтернатив; на каждой позиции совпадает самый длинный ключ.
+    """
+    trie: Dict[str, dict] = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+
+    return build(trie)
+
+
+class SignatureMatcher:
+    """Скомпилированный мульти-паттерн матчер названий читов.
+
+    Все ключи сигнатур собираются в одно регулярное выражение по
+    префиксному дереву (_trie_regex), поэтому строка просматривается
+    за один проход вместо цикла по словарю. Поиск продолжается со
+    следующей позиции после каждого совпадения, так что пересекающиеся
+    ключи тоже находятся.
+    """
+
+    def __init__(self, signatures: Dict[str, str]):
+        self.signatures = dict(signatures)
+
+        # Версия набора сигнатур: меняется при любом изменении ключей, названий или порядка
+        self.version = hashlib.sha256(
+            json.dumps(list(self.signatures.items()), ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:16]
+
+        # Приоритет ключа = его позиция в исходном словаре (как в старом цикле)
+        self._priority = {key: index for index, key in enumerate(self.signatures)}
+
+        # Для каждого ключа заранее находим ключи, которые являются его подстроками:
+        # если совпал длинный ключ, совпали и все вложенные в него
+        self._contained = {
+            key: [other for other in self.signatures if other in key]
+            for key in self.signatures
+        }
+
+        self._pattern = None
+        self._bytes_pattern = None
+        if self.signatures:
+            self._pattern = re.compile(_trie_regex(self.signatures))
+            # Вариант для сырых байтов (например, центрального каталога ZIP): без IGNORECASE,
+            # данные приводятся к нижнему регистру один раз - так поиск в разы быстрее.
+            # Дерево строится по байтам UTF-8 (latin-1 переводит байт в символ один к одному)
+            self._bytes_pattern = re.compile(_trie_regex(
+                key.lower().encode('utf-8').decode('latin-1') for key in self.signatures
+            ).encode('latin-1'))
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _matched_keys(self, text: str) -> List[str]:
+        """Все ключи, встречающиеся в строке (в порядке приоритета)"""
+        if self._pattern is None:
+            return []
+
+        text = text.lower()
+        found = set()
+        match = self._pattern.search(text)
+        while match is not None:
+            key = match.group()
+            if key not in found:
+                found.update(self._contained[key])
+            # Со следующей позиции, а не с конца совпадения: ключ может начинаться внутри него
+            match = self._pattern.search(text, match.start() + 1)
+
+        return sorted(found, key=self._priority.__getitem__)
+
+    def find_all(self, text: str) -> List[str]:
+        """Все названия читов, найденные в строке"""
+        return [self.signatures[key] for key in self._matched_keys(text)]
+
+    def first(self, text: str) -> Optional[str]:
+        """Название чита с наивысшим приоритетом или None"""
+        keys = self._matched_keys(text)
+        return self.signatures[keys[0]] if keys else None
+
+    def first_in_lines(self, lines: Iterable[str]) -> Optional[str]:
+        """Первое совпадение среди строк (например, имён записей JAR)
+
+        Строки склеиваются в один буфер, и поиск идёт одним проходом;
+        ключи сигнатур не содержат перевода строки, поэтому совпадение
+        не может пересечь границу записей.
+        """
+        if self._pattern is None:
+            return None
+
+        buffer = '\n'.join(lines).lower()
+        match = self._pattern.search(buffer)
+        if not match:
+            return None
+
+        start = buffer.rfind('\n', 0, match.start()) + 1
+        end = buffer.find('\n', match.start())
+        return self.first(buffer[start:end if end != -1 else len(buffer)])
+
+    def search_bytes(self, data: bytes, pos: int = 0) -> Optional[re.Match]:
+        """Найти первое вхождение любой сигнатуры в байтах
+
+        data должны быть уже в нижнем регистре (bytes.lower()): смещения
+        совпадают с исходными данными, регистр ASCII не учитывается.
+        """
+        if self._bytes_pattern is None:
+            return None
+        return self._bytes_pattern.search(data, pos)
@@ -0,0 +1,184 @@
+import os
+import platform
+from typing import Dict, List, Optional, Union
+from scanner.walker import ScanRoot
+
+
+def get_all_system_directories() -> List[str]:
+    """Получить ВСЕ диски и основные директории для полного сканирования"""
+    directories = []
+    system = platform.system()
+
+    if system == 'Windows':
+        # Получаем ВСЕ доступные диски
+        directories.extend(f"{d}:\\" for d in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' if os.path.exists(f"{d}:\\"))
+
+    elif system == 'Linux':
+        # Для Linux сканируем от корня
+        directories.append('/')
+
+    elif system == 'Darwin':  # macOS
+        # Для macOS сканируем основные директории
+        directories.extend(['/', '/Users', '/Applications'])
+
+    return directories
+
+
+def _existing_roots(candidates: List[ScanRoot]) -> List[ScanRoot]:
+    """Оставить существующие корни без дублей и без вложенных в полные корни"""
+    roots = []
+    seen = set()
+    unlimited = []
+    for root in candidates:
+        path = os.path.normcase(os.path.abspath(root.path))
+        if path in seen or not os.path.isdir(root.path):
+            continue
+        if any(path.startswith(os.path.join(parent, '')) for parent in unlimited):
+            continue
+        seen.add(path)
+        if root.max_depth is None:
+            unlimited.append(path)
+        roots.append(root)
+    return roots
+
+
+class ScanStrategy:
+    """Стратегия сканирования: набор корней и ограничения глубины"""
+
+    name = ''
+    description = ''
+
+    def roots(self) -> List[ScanRoot]:
+        raise NotImplementedError
+
+
+class QuickScanStrategy(ScanStrategy):
+    """Только известные места Minecraft, Загрузки и Рабочий стол"""
+
+    name = 'quick'
+    description = 'Minecraft folders, Downloads and Desktop'
+
+    # Глубина: mods/<подпапка>/file.jar, versions/<версия>/<версия>.jar
+    MINECRAFT_DEPTH = 4
+    # Глубина: instances/<сборка>/.minecraft/mods/<подпапка>/file.jar
+    INSTANCES_DEPTH = 5
+    USER_FOLDER_DEPTH = 2
+
+    def roots(self) -> List[ScanRoot]:
+        home = os.path.expanduser('~')
+        system = platform.system()
+
+        if system == 'Windows':
+            appdata = os.environ.get('APPDATA', os.path.join(home, 'AppData', 'Roaming'))
+            minecraft_dirs = [
+                os.path.join(appdata, '.minecraft'),
+                os.path.join(appdata, '.tlauncher'),
+                os.path.join(home, '.lunarclient'),
+                os.path.join(home, '.feather'),
+            ]
+            instance_dirs = [
+                os.path.join(appdata, 'PrismLauncher', 'instances'),
+                os.path.join(appdata, 'MultiMC', 'instances'),
+                os.path.join(appdata, 'ATLauncher', 'instances'),
+                os.path.join(appdata, 'gdlauncher_next', 'instances'),
+                os.path.join(appdata, 'com.modrinth.theseus', 'profiles'),
+                os.path.join(home, 'curseforge', 'minecraft', 'Instances'),
+            ]
+        elif system == 'Darwin':
+            support = os.path.join(home, 'Library', 'Application Support')
+            minecraft_dirs = [
+                os.path.join(support, 'minecraft'),
+                os.path.join(home, '.lunarclient'),
+            ]
+            instance_dirs = [
+                os.path.join(support, 'PrismLauncher', 'instances'),
+                os.path.join(support, 'MultiMC', 'instances'),
+                os.path.join(support, 'com.modrinth.theseus', 'profiles'),
+            ]
+        else:
+            data_home = os.environ.get('XDG_DATA_HOME', os.path.join(home, '.local', 'share'))
+            minecraft_dirs = [
+                os.path.join(home, '.minecraft'),
+                os.path.join(home, '.tlauncher'),
+                os.path.join(home, '.lunarclient'),
+            ]
+            instance_dirs = [
+                os.path.join(data_home, 'PrismLauncher', 'instances'),
+                os.path.join(data_home, 'multimc', 'instances'),
+                os.path.join(data_home, 'com.modrinth.theseus', 'profiles'),
+                os.path.join(home, '.var', 'app', 'org.prismlauncher.PrismLauncher',
+                             'data', 'PrismLauncher', 'instances'),
+            ]
+
+        user_dirs = [os.path.join(home, 'Downloads'), os.path.join(home, 'Desktop')]
+
+        return _existing_roots(
+            [ScanRoot(path, self.MINECRAFT_DEPTH) for path in minecraft_dirs] +
+            [ScanRoot(path, self.INSTANCES_DEPTH) for path in instance_dirs] +
+            [ScanRoot(path, self.USER_FOLDER_DEPTH) for path in user_dirs]
+        )
+
+
+class StandardScanStrategy(ScanStrategy):
+    """Профили всех пользователей"""
+
+    name = 'standard'
+    description = 'All user profiles'
+
+    def roots(self) -> List[ScanRoot]:
+        home = os.path.expanduser('~')
+        # Родитель домашней директории: C:\Users, /home, /Users
+        profiles_dir = os.path.dirname(home)
+
+        candidates = []
+        if os.path.dirname(profiles_dir) != profiles_dir:
+            candidates.append(ScanRoot(profiles_dir))
+        if platform.system() == 'Linux':
+            candidates.append(ScanRoot('/home'))
+        # Домашняя директория может лежать вне общей папки профилей (например, /root)
+        candidates.append(ScanRoot(home))
+
+        return _existing_roots(candidates)
+
+
+class FullScanStrategy(ScanStrategy):
+    """Вся система: все диски"""
+
+    name = 'full'
+    description = 'Entire system'
+
+    def roots(self) -> List[ScanRoot]:
+        # На macOS корни вложены друг в друга ('/', '/Users') - не обходим их дважды
+        return _existing_roots([ScanRoot(path) for path in get_all_system_directories()])
+
+
+class CustomScanStrategy(ScanStrategy):
+    """Заданные пользователем корни (пути или ScanRoot со своей глубиной)"""
+
+    name = 'custom'
+    description = 'Custom directories'
+
+    def __init__(self, paths: List[Union[str, ScanRoot]], max_depth: Optional[int] = None):
+        self.paths = list(paths)
+        self.max_depth = max_depth
+
+    def roots(self) -> List[ScanRoot]:
+        return _existing_roots([
+            path if isinstance(path, ScanRoot) else ScanRoot(path, self.max_depth)
+            for path in self.paths
+        ])
+
+
+SCAN_STRATEGIES: Dict[str, ScanStrategy] = {
+    'quick': QuickScanStrategy(),
+    'standard': StandardScanStrategy(),
+    'full': FullScanStrategy(),
+}
+
+# Старое название режима полного сканирования в UI
+SCAN_STRATEGIES['deep'] = SCAN_STRATEGIES['full']
+
+
+def get_scan_strategy(scan_mode: str) -> Optional[ScanStrategy]:
+    """Найти стратегию по названию режима"""
+    return SCAN_STRATEGIES.get(scan_mode)
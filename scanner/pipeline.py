@@ -0,0 +1,344 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Collection, Iterable, List, Optional, Sequence
+from scanner.analysis import analyze_file
+from scanner.cancel import CancellationToken, ScanCancelled
+from scanner.cache import ScanCache
+from scanner.hashdb import KnownHashDatabase
+from scanner.sigpack import SignaturePack
+from scanner.telemetry import FileProfile, ScanTelemetry
+from scanner.throttle import IOGovernor, lower_priority, estimated_read_bytes
+from scanner.walker import ParallelWalker, stat_candidate
+
+# Состояние процесса-воркера, заполняется в _init_worker
+_worker_pack = None
+_worker_extensions = ()
+_worker_hash_dbs = []
+_worker_cancel = None
+
+# Маркер окончания обхода в очереди
+_DONE = object()
+
+
+def _init_worker(pack: SignaturePack, extensions: Sequence[str], hash_db_paths: Sequence[str] = (),
+                 cancel: Optional[CancellationToken] = None, low_priority: bool = False):
+    """Инициализация процесса анализа: матчеры компилируются один раз на процесс
+
+    Пакет сигнатур приходит в воркер как путь к скомпилированному файлу
+    (см. SignaturePack.__reduce__) и загружается из него.
+    """
+    global _worker_pack, _worker_extensions, _worker_hash_dbs, _worker_cancel
+    if low_priority:
+        lower_priority()
+    _worker_pack = pack
+    _worker_extensions = tuple(extensions)
+    _worker_cancel = cancel
+
+    # Базы хешей отображаются в память - страницы общие для всех процессов
+    _worker_hash_dbs = []
+    for hash_db_path in hash_db_paths:
+        if not os.path.exists(hash_db_path):
+            continue
+        try:
+            _worker_hash_dbs.append(KnownHashDatabase(hash_db_path))
+        except (OSError, ValueError):
+            continue
+
+
+def _analyze_batch(items: List[tuple]) -> tuple:
+    """Проанализировать пачку файлов (path, size) в процессе-воркере
+
+    Возвращает результаты, профили файлов (путь, время, время по этапам)
+    и ошибки (этап, путь, тип, сообщение) для ScanTelemetry.
+    """
+    results = []
+    profiles = []
+    errors = []
+    for file_path, file_size in items:
+        profile = FileProfile()
+        started = time.perf_counter()
+        try:
+            results.append(analyze_file(
+                _worker_pack, file_path, file_size, _worker_extensions, _worker_hash_dbs, _worker_cancel, profile
+            ))
+        except ScanCancelled:
+            # Необработанные файлы пачки попадут в точку продолжения
+            break
+        except Exception as e:
+            # Файл пропускаем, ошибку учитываем
+            errors.append(('analyze', file_path, type(e).__name__, str(e)))
+            continue
+        finally:
+            errors.extend((stage, file_path, error_type, message) for stage, error_type, message in profile.errors)
+        profiles.append((file_path, time.perf_counter() - started, profile.stages))
+    return results, profiles, errors
+
+
+class ScanPipeline:
+    """Конвейер сканирования: обход -> ограниченная очередь -> пул процессов
+
+    Поток-производитель перечисляет файлы-кандидаты через ParallelWalker
+    и кладёт их в ограниченную очередь (при переполнении обход ждёт).
+    Хеширование и разбор JAR выполняются пачками в ProcessPoolExecutor,
+    результаты возвращаются пачками в вызывающий поток через on_batch.
+    """
+
+    def __init__(self,
+                 walker: ParallelWalker,
+                 pack: SignaturePack,
+                 extensions: Sequence[str],
+                 workers: Optional[int] = None,
+                 batch_size: int = 64,
+                 queue_size: int = 4096,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 cache: Optional[ScanCache] = None,
+                 hash_db_paths: Sequence[str] = (),
+                 cancel: Optional[CancellationToken] = None,
+                 telemetry: Optional[ScanTelemetry] = None,
+                 accept_file: Optional[Callable[[str, os.stat_result], bool]] = None,
+                 governor: Optional[IOGovernor] = None,
+                 low_priority: bool = False):
+        self.walker = walker
+        self.pack = pack
+        self.extensions = tuple(extensions)
+        # 0 - анализ в текущем процессе (без пула)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = max(1, batch_size)
+        self.should_stop = should_stop
+        self.cache = cache
+        self.hash_db_paths = tuple(hash_db_paths)
+        self.cancel = cancel
+        self.telemetry = telemetry or ScanTelemetry()
+        # Фильтр файлов по пути и stat (правила исключения, размер, дата изменения)
+        self.accept_file = accept_file
+        # Бюджет чтения и адаптивное снижение скорости; низкий приоритет CPU/I/O воркеров
+        self.governor = governor if governor is not None and governor.enabled else None
+        self.low_priority = low_priority
+
+        # Файлы, результаты которых переданы в on_batch, и файлы, найденные,
+        # но ещё не обработанные, - из них строится точка продолжения
+        self.processed = set()
+        self._undelivered = set()
+        self._files_lock = threading.Lock()
+
+        # stat файлов, отправленных на анализ, - нужен для записи в кеш
+        self._pending_stats = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def _stopped(self) -> bool:
+        if self.cancel is not None and self.cancel.cancelled:
+            return True
+        return bool(self.should_stop and self.should_stop())
+
+    def _put(self, item):
+        """Положить элемент в очередь, не зависая при остановке"""
+        while not self._stopped():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _enqueue(self, file_path: str, file_stats: os.stat_result):
+        with self._files_lock:
+            self._undelivered.add(file_path)
+        # Время ожидания места в очереди - признак того, что анализ не успевает за обходом
+        started = time.perf_counter()
+        self._put((file_path, file_stats))
+        self.telemetry.add_stage('queue', time.perf_counter() - started)
+
+    def _stat(self, file_path: str, entry: Optional[os.DirEntry] = None) -> Optional[os.stat_result]:
+        """stat файла; None - ошибка или файл отсеян фильтром"""
+        started = time.perf_counter()
+        try:
+            return stat_candidate(file_path, entry, self.accept_file)
+        except OSError as e:
+            self.telemetry.record_error('stat', file_path, e)
+            return None
+        finally:
+            self.telemetry.add_stage('stat', time.perf_counter() - started)
+
+    def _produce(self, roots: List[str], files: Sequence[str], skip: Collection[str]):
+        if self.low_priority:
+            lower_priority(thread=True)
+        try:
+            # Файлы из точки продолжения - до обхода директорий
+            for file_path in files:
+                if self._stopped():
+                    with self._files_lock:
+                        self._undelivered.add(file_path)
+                    continue
+                file_stats = self._stat(file_path)
+                if file_stats is not None:
+                    self._enqueue(file_path, file_stats)
+
+            def on_file(entry: os.DirEntry):
+                if entry.path not in skip:
+                    file_stats = self._stat(entry.path, entry)
+                    if file_stats is not None:
+                        self._enqueue(entry.path, file_stats)
+
+            self.walker.walk(roots, on_file)
+        finally:
+            self._put(_DONE)
+
+    def pending_files(self) -> List[str]:
+        """Найденные, но не обработанные файлы (после остановки)"""
+        with self._files_lock:
+            return sorted(self._undelivered)
+
+    def _mark_delivered(self, results: List[dict]):
+        with self._files_lock:
+            for result in results:
+                self._undelivered.discard(result['path'])
+                self.processed.add(result['path'])
+
+    def _mark_failed(self, paths: Iterable[str]):
+        """Снять с учёта файлы, анализ которых завершился ошибкой
+
+        Они считаются обработанными (продолжение их не повторяет), а их
+        stat не копится до конца сканирования.
+        """
+        with self._files_lock:
+            for file_path in paths:
+                self._undelivered.discard(file_path)
+                self.processed.add(file_path)
+                self._pending_stats.pop(file_path, None)
+
+    def run(self, roots: List[str], on_batch: Callable[[List[dict]], None],
+            files: Sequence[str] = (), skip: Collection[str] = ()):
+        """Просканировать корни; on_batch вызывается в текущем потоке
+
+        files - отдельные файлы для анализа (например, из точки продолжения),
+        skip - пути, которые не нужно анализировать повторно при обходе.
+        """
+        producer = threading.Thread(target=self._produce, args=(roots, files, skip), daemon=True)
+        producer.start()
+
+        if self.workers > 0:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.pack, self.extensions, self.hash_db_paths, self.cancel, self.low_priority)
+            )
+            submit = lambda batch: executor.submit(_analyze_batch, batch)
+        else:
+            executor = None
+            # Анализ идёт в этом потоке - понижаем только его, а не весь процесс с UI
+            if self.low_priority:
+                lower_priority(thread=True)
+            _init_worker(self.pack, self.extensions, self.hash_db_paths, self.cancel)
+            submit = None
+
+        # Пачки в полёте: future -> файлы пачки (для учёта потерянных пачек)
+        in_flight = {}
+        batch = []
+        cached = []
+        done = False
+
+        try:
+            while not done and not self._stopped():
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    item = None
+
+                if item is _DONE:
+                    done = True
+                elif item is not None:
+                    file_path, file_stats = item
+                    # Неизменённые файлы берём из кеша без чтения содержимого
+                    result = self.cache.get(file_path, file_stats) if self.cache else None
+                    if result is not None:
+                        cached.append(result)
+                    else:
+                        self._pending_stats[file_path] = file_stats
+                        batch.append((file_path, file_stats.st_size))
+
+                flush = item is None or done
+                if cached and (len(cached) >= self.batch_size or flush):
+                    self._mark_delivered(cached)
+                    on_batch(cached)
+                    cached = []
+
+                # Неполную пачку отправляем, когда очередь опустела, чтобы не задерживать угрозы
+                if batch and (len(batch) >= self.batch_size or flush):
+                    if self.governor:
+                        self._throttle(batch, in_flight, on_batch)
+                    if submit:
+                        in_flight[submit(batch)] = batch
+                    else:
+                        self._deliver(*_analyze_batch(batch), on_batch)
+                    batch = []
+
+                # Не держим в полёте больше двух пачек на процесс
+                self._drain(in_flight, on_batch, block=len(in_flight) >= self.workers * 2)
+
+            while in_flight and not self._stopped():
+                self._drain(in_flight, on_batch, block=True)
+        finally:
+            if executor:
+                # При остановке не ждём уже запущенные пачки
+                executor.shutdown(wait=not self._stopped(), cancel_futures=True)
+            producer.join()
+            self._pending_stats.clear()
+
+    def _throttle(self, batch: List[tuple], in_flight: dict, on_batch: Callable[[List[dict]], None]):
+        """Подождать бюджет чтения для пачки; готовые результаты тем временем забираются"""
+        size = sum(estimated_read_bytes(file_path, file_size) for file_path, file_size in batch)
+        wait_seconds = self.governor.delay(len(batch), size)
+        if not wait_seconds:
+            return
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + wait_seconds
+        while not self._stopped():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if in_flight:
+                self._drain(in_flight, on_batch, block=True)
+            else:
+                time.sleep(min(0.1, remaining))
+        self.telemetry.add_stage('throttle', time.perf_counter() - started)
+
+    def _deliver(self, results: List[dict], profiles: List[tuple], errors: List[tuple],
+                 on_batch: Callable[[List[dict]], None]):
+        """Сохранить свежие результаты в кеш, учесть профили и передать дальше"""
+        self.telemetry.observe_files(profiles)
+        if self.governor:
+            self.governor.observe(profiles)
+        if errors:
+            self.telemetry.record_errors(errors)
+            self._mark_failed(file_path for stage, file_path, _, _ in errors
+                              if stage == 'analyze' and file_path is not None)
+        self._mark_delivered(results)
+        entries = []
+        for result in results:
+            file_stats = self._pending_stats.pop(result['path'], None)
+            if file_stats is not None:
+                entries.append((result, file_stats))
+        if self.cache:
+            self.cache.put_many(entries)
+
+        on_batch(results)
+
+    def _drain(self, in_flight: dict, on_batch: Callable[[List[dict]], None], block: bool):
+        """Забрать готовые пачки результатов"""
+        if not in_flight:
+            return
+
+        done, _ = wait(in_flight, timeout=0.1 if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            batch = in_flight.pop(future)
+            try:
+                results, profiles, errors = future.result()
+            except Exception as e:
+                # Пачка потеряна (например, процесс-воркер упал)
+                self.telemetry.record_error('analyze', None, e)
+                self._mark_failed(file_path for file_path, _ in batch)
+                continue
+            self._deliver(results, profiles, errors, on_batch)
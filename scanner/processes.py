@@ -0,0 +1,112 @@
+import os
+import time
+import threading
+import psutil
+from typing import Dict, List, Optional
+
+
+def _normalize_path(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+class ProcessIndex:
+    """Снимок таблицы процессов с индексами для поиска за O(1)
+
+    Таблица процессов читается один раз и перечитывается не чаще, чем раз в ttl
+    секунд. Процессы индексируются по пути exe, по имени (если exe недоступен)
+    и по путям JAR из командной строки, поэтому поиск идёт по точному пути,
+    а не по подстроке в аргументах.
+    """
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot_time = 0.0
+        self._by_exe = {}
+        self._by_name = {}
+        self._by_jar = {}
+
+    def invalidate(self):
+        """Сбросить снимок - следующий поиск перечитает таблицу процессов"""
+        self._snapshot_time = 0.0
+
+    def refresh(self):
+        """Перечитать таблицу процессов"""
+        by_exe: Dict[str, List[int]] = {}
+        by_name: Dict[str, List[int]] = {}
+        by_jar: Dict[str, List[int]] = {}
+
+        for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
+            try:
+                info = proc.info
+                exe = info.get('exe')
+                name = info.get('name')
+
+                if exe:
+                    by_exe.setdefault(_normalize_path(exe), []).append(proc.pid)
+                elif name:
+                    # Без доступа к exe остаётся только сравнение по имени
+                    by_name.setdefault(name.lower(), []).append(proc.pid)
+
+                for jar_path in self._jar_paths(proc, info.get('cmdline')):
+                    pids = by_jar.setdefault(jar_path, [])
+                    if proc.pid not in pids:
+                        pids.append(proc.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        with self._lock:
+            self._by_exe, self._by_name, self._by_jar = by_exe, by_name, by_jar
+            self._snapshot_time = time.monotonic()
+
+    @staticmethod
+    def _jar_paths(proc, cmdline: Optional[List[str]]) -> List[str]:
+        """Пути JAR из командной строки (-jar, -cp, -javaagent)"""
+        if not cmdline:
+            return []
+
+        candidates = []
+        for arg in cmdline[1:]:
+            if arg.startswith('-javaagent:'):
+                arg = arg[len('-javaagent:'):].split('=', 1)[0]
+            # Classpath может содержать несколько JAR через разделитель
+            for part in arg.split(os.pathsep):
+                if part.lower().endswith('.jar'):
+                    candidates.append(part)
+
+        if not candidates:
+            return []
+
+        cwd = None
+        paths = []
+        for candidate in candidates:
+            if not os.path.isabs(candidate):
+                # Относительный путь разрешаем от рабочей директории процесса
+                if cwd is None:
+                    try:
+                        cwd = proc.cwd()
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        cwd = ''
+                if not cwd:
+                    continue
+                candidate = os.path.join(cwd, candidate)
+            paths.append(_normalize_path(candidate))
+
+        return paths
+
+    def _ensure_fresh(self):
+        if time.monotonic() - self._snapshot_time > self.ttl:
+            self.refresh()
+
+    def find(self, file_path: str) -> List[int]:
+        """PID процессов, запущенных из этого файла"""
+        self._ensure_fresh()
+        normalized = _normalize_path(os.path.abspath(file_path))
+
+        with self._lock:
+            if normalized.lower().endswith('.jar'):
+                return list(self._by_jar.get(normalized, []))
+
+            pids = list(self._by_exe.get(normalized, []))
+            pids.extend(self._by_name.get(os.path.basename(normalized).lower(), []))
+            return pids
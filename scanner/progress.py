@@ -0,0 +1,101 @@
+import time
+import threading
+import os
+from typing import Callable, Dict, Any, List, Optional
+from scanner.walker import ParallelWalker, stat_candidate
+
+
+def count_candidates(walker: ParallelWalker, roots: List[str],
+                     accept_file: Optional[Callable[[str, os.stat_result], bool]] = None) -> tuple:
+    """Быстрый предварительный подсчёт файлов-кандидатов и их размера
+
+    Читаются только метаданные каталогов (тот же параллельный scandir),
+    содержимое файлов не открывается. Файлы отбираются тем же правилом,
+    что и в ScanPipeline (stat_candidate с тем же accept_file): файлы,
+    которые не удалось stat, анализ тоже пропускает, поэтому они не считаются.
+    """
+    lock = threading.Lock()
+    totals = [0, 0]
+
+    def on_file(entry):
+        try:
+            file_stats = stat_candidate(entry.path, entry, accept_file)
+        except OSError:
+            return
+        if file_stats is None:
+            return
+        with lock:
+            totals[0] += 1
+            totals[1] += file_stats.st_size
+
+    walker.walk(roots, on_file)
+    return totals[0], totals[1]
+
+
+class ProgressTracker:
+    """Прогресс сканирования с оценкой оставшегося времени (ETA)
+
+    Скорость считается по окнам не короче window секунд и сглаживается
+    экспоненциально, чтобы всплески (например, файлы из кеша) не прыгали в ETA.
+    """
+
+    def __init__(self, total_files: int = 0, total_bytes: int = 0,
+                 window: float = 0.5, smoothing: float = 0.3):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.done_files = 0
+        self.done_bytes = 0
+        self.start_time = time.time()
+
+        self.window = window
+        self.smoothing = smoothing
+        self._rate = None
+        self._window_start = self.start_time
+        self._window_files = 0
+        self._lock = threading.Lock()
+
+    def advance(self, files: int = 1, size: int = 0):
+        """Учесть обработанные файлы"""
+        with self._lock:
+            self.done_files += files
+            self.done_bytes += size
+            self._window_files += files
+
+            now = time.time()
+            elapsed = now - self._window_start
+            if elapsed >= self.window:
+                rate = self._window_files / elapsed
+                if self._rate is None:
+                    self._rate = rate
+                else:
+                    self._rate = self.smoothing * rate + (1 - self.smoothing) * self._rate
+                self._window_start = now
+                self._window_files = 0
+
+    @property
+    def percent(self) -> float:
+        if self.total_files <= 0:
+            return 0.0
+        # Во время сканирования могут появиться новые файлы - не выходим за 100%
+        return min(100.0, self.done_files / self.total_files * 100)
+
+    def eta(self) -> Optional[float]:
+        """Оставшееся время в секундах или None, если оценить нельзя"""
+        if self.total_files <= 0 or not self._rate:
+            return None
+        remaining = max(0, self.total_files - self.done_files)
+        return remaining / self._rate
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.start_time
+        return {
+            'total_files': self.total_files,
+            'total_bytes': self.total_bytes,
+            'done_files': self.done_files,
+            'done_bytes': self.done_bytes,
+            'percent': self.percent,
+            'files_per_second': self._rate or 0.0,
+            'bytes_per_second': self.done_bytes / elapsed if elapsed > 0 else 0.0,
+            'elapsed': elapsed,
+            'eta': self.eta()
+        }
@@ -0,0 +1,282 @@
+import os
+import time
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Фильтры и ключи сортировки для постраничных запросов (get_results в API)
+RESULT_FILTERS: Dict[str, Optional[Callable[['ScanRecord'], bool]]] = {
+    'all': None,
+    'threats': lambda record: record.is_threat,
+    'clean': lambda record: not record.is_threat,
+}
+RESULT_SORTS: Dict[str, Optional[Callable[['ScanRecord'], Any]]] = {
+    'scanned': None,
+    'name': lambda record: record.name.lower(),
+    'path': lambda record: record.path.lower(),
+    'size': lambda record: record.size,
+    'level': lambda record: record.threat_level,
+    'date': lambda record: record.scan_date,
+}
+
+# Сколько секунд отсортированная выборка считается свежей, пока результаты меняются
+VIEW_MAX_AGE = 1.0
+
+
+class ScanRecord:
+    """Результат проверки одного файла
+
+    Компактная запись со __slots__ вместо словаря на каждый файл: имя
+    и признак угрозы не хранятся, а вычисляются из пути и типа угрозы.
+    Словарь в прежнем формате (для UI, sinks и отчёта) строит to_dict().
+    """
+
+    __slots__ = ('path', 'size', 'sha256', 'quick_hash', 'threat_type',
+                 'threat_level', 'scan_date', 'is_running')
+
+    def __init__(self, path: str, size: int = 0, sha256: Optional[str] = None,
+                 quick_hash: Optional[str] = None, threat_type: Optional[str] = None,
+                 threat_level: int = 0, scan_date: Optional[float] = None, is_running: bool = False):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.quick_hash = quick_hash
+        self.threat_type = threat_type
+        self.threat_level = threat_level
+        self.scan_date = scan_date if scan_date is not None else time.time()
+        self.is_running = is_running
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def is_threat(self) -> bool:
+        return self.threat_type is not None
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> 'ScanRecord':
+        """Запись из словаря результата анализа (analyze_file, кеш, точка продолжения)"""
+        return cls(
+            result['path'],
+            result.get('size', 0),
+            result.get('hash'),
+            result.get('quickHash'),
+            result.get('threatType') if result.get('isThreat') else None,
+            result.get('threatLevel', 0),
+            result.get('scanDate'),
+            result.get('isRunning', False)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'name': self.name,
+            'size': self.size,
+            'hash': self.sha256,
+            'quickHash': self.quick_hash,
+            'isThreat': self.is_threat,
+            'threatLevel': self.threat_level,
+            'threatType': self.threat_type,
+            'scanDate': self.scan_date,
+            'isRunning': self.is_running
+        }
+
+
+class ResultStore:
+    """Потокобезопасное хранилище результатов и счётчиков сканирования
+
+    Поток сканирования добавляет записи, а вызовы API из UI (очистка,
+    удаление, экспорт) читают и меняют их одновременно - все операции
+    выполняются под одной блокировкой, наружу отдаются только снимки.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, ScanRecord] = {}
+        self._threats: Dict[str, ScanRecord] = {}
+        self._processes: Dict[str, List[int]] = {}
+        self._scanned = 0
+        self._clean = 0
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        # Номер изменения (для кеша выборок) и последняя выборка: (ключ, номер, время, записи)
+        self._version = 0
+        self._view = None
+
+    def reset(self, start_time: Optional[float] = None):
+        """Очистить результаты перед новым сканированием"""
+        with self._lock:
+            self._records = {}
+            self._threats = {}
+            self._processes = {}
+            self._scanned = 0
+            self._clean = 0
+            self.start_time = start_time
+            self.end_time = None
+            self._version += 1
+            self._view = None
+
+    def finish(self):
+        """Отметить окончание сканирования (время перестаёт идти)"""
+        self.end_time = time.time()
+
+    def add(self, record: ScanRecord) -> Tuple[int, int, int]:
+        """Добавить результат; вернуть счётчики (проверено, угроз, чистых) после добавления
+
+        Повторная проверка того же файла заменяет прежнюю запись.
+        """
+        with self._lock:
+            previous = self._records.pop(record.path, None)
+            if previous is not None:
+                if previous.is_threat:
+                    self._threats.pop(previous.path, None)
+                else:
+                    self._clean -= 1
+
+            self._records[record.path] = record
+            if record.is_threat:
+                self._threats[record.path] = record
+            else:
+                self._clean += 1
+            if previous is None:
+                self._scanned += 1
+            self._version += 1
+
+            return self._scanned, len(self._threats), self._clean
+
+    def restore(self, counts: Dict[str, int], threats: Iterable[ScanRecord]):
+        """Восстановить счётчики и угрозы (продолжение приостановленного сканирования)"""
+        with self._lock:
+            for record in threats:
+                self._records[record.path] = record
+                self._threats[record.path] = record
+            self._scanned = counts.get('scanned', 0)
+            self._clean = counts.get('clean', 0)
+            self._version += 1
+
+    def remove_threat(self, path: str) -> bool:
+        """Убрать угрозу из результатов (файл удалён или перемещён в карантин)"""
+        with self._lock:
+            record = self._threats.pop(path, None)
+            if record is None:
+                return False
+            self._records.pop(path, None)
+            self._processes.pop(path, None)
+            self._version += 1
+            # Удалённая угроза не должна оставаться в списке даже на время VIEW_MAX_AGE
+            self._view = None
+            return True
+
+    def counts(self) -> Tuple[int, int, int]:
+        """Счётчики (проверено, угроз, чистых)"""
+        with self._lock:
+            return self._scanned, len(self._threats), self._clean
+
+    def stats(self) -> Dict[str, Any]:
+        scanned, threats, clean = self.counts()
+        return {'scanned': scanned, 'threats': threats, 'clean': clean}
+
+    def elapsed(self) -> float:
+        if not self.start_time:
+            return 0.0
+        return (self.end_time or time.time()) - self.start_time
+
+    def threats(self) -> List[ScanRecord]:
+        """Снимок списка угроз (в порядке обнаружения)"""
+        with self._lock:
+            return list(self._threats.values())
+
+    def records(self) -> List[ScanRecord]:
+        """Снимок всех результатов (в порядке проверки)"""
+        with self._lock:
+            return list(self._records.values())
+
+    def iter_records(self, status: str = 'all') -> Iterator[ScanRecord]:
+        """Обход результатов для потокового экспорта (в порядке проверки)
+
+        Под блокировкой копируются только ссылки на записи, сами записи
+        не дублируются и не превращаются в словари целиком.
+        """
+        if status not in RESULT_FILTERS:
+            raise ValueError(f'Unknown result filter: {status}')
+        with self._lock:
+            source = list(self._threats.values()) if status == 'threats' else list(self._records.values())
+        predicate = RESULT_FILTERS[status] if status != 'threats' else None
+        if predicate is None:
+            return iter(source)
+        return (record for record in source if predicate(record))
+
+    def query(self, offset: int = 0, limit: int = 100, status: str = 'all', sort: str = 'scanned',
+              descending: bool = False, search: Optional[str] = None) -> Tuple[int, List[ScanRecord]]:
+        """Страница результатов: (всего в выборке, записи с offset по offset + limit)
+
+        Отфильтрованная и отсортированная выборка запоминается: прокрутка
+        списка в UI только нарезает её. Пока сканирование добавляет
+        записи, выборка пересчитывается не чаще раза в VIEW_MAX_AGE секунд.
+        Без фильтра и сортировки страница берётся прямо из словаря.
+        """
+        if status not in RESULT_FILTERS:
+            raise ValueError(f'Unknown result filter: {status}')
+        if sort not in RESULT_SORTS:
+            raise ValueError(f'Unknown result sort: {sort}')
+        offset = max(0, offset)
+        limit = max(0, limit)
+        search = search.lower() if search else None
+
+        if status == 'all' and sort == 'scanned' and not search:
+            with self._lock:
+                total = len(self._records)
+                if descending:
+                    # Последние проверенные - первыми
+                    start = max(0, total - offset - limit)
+                    page = list(islice(self._records.values(), start, total - offset))[::-1]
+                else:
+                    page = list(islice(self._records.values(), offset, offset + limit))
+            return total, page
+
+        key = (status, sort, descending, search)
+        with self._lock:
+            view = self._view
+            version = self._version
+            if view is not None and view[0] == key and (
+                    view[1] == version or time.monotonic() - view[2] < VIEW_MAX_AGE):
+                return len(view[3]), view[3][offset:offset + limit]
+            # Угрозы берутся из отдельного словаря - выборка по ним не проходит все записи
+            source = list(self._threats.values()) if status == 'threats' else list(self._records.values())
+
+        # Фильтрация и сортировка - вне блокировки, сканирование не ждёт
+        predicate = RESULT_FILTERS[status] if status != 'threats' else None
+        if predicate is not None:
+            source = [record for record in source if predicate(record)]
+        if search:
+            source = [record for record in source if search in record.path.lower()]
+        sort_key = RESULT_SORTS[sort]
+        if sort_key is not None:
+            source.sort(key=sort_key, reverse=descending)
+        elif descending:
+            source.reverse()
+
+        with self._lock:
+            self._view = (key, version, time.monotonic(), source)
+        return len(source), source[offset:offset + limit]
+
+    def get(self, path: str) -> Optional[ScanRecord]:
+        with self._lock:
+            return self._records.get(path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def add_processes(self, path: str, pids: Iterable[int]):
+        """Запомнить процессы, запущенные из файла угрозы"""
+        with self._lock:
+            known = self._processes.setdefault(path, [])
+            for pid in pids:
+                if pid not in known:
+                    known.append(pid)
+
+    def processes(self, path: str) -> List[int]:
+        with self._lock:
+            return list(self._processes.get(path, ()))
@@ -0,0 +1,377 @@
+import os
+import json
+import struct
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from scanner.matcher import SignatureMatcher
+from scanner.hashdb import HashDatabaseBuilder
+
+PACK_MAGIC = b'MXSIGPAK'
+PACK_FORMAT = 2
+
+# magic, format, revision, count, digest
+PACK_HEADER = struct.Struct('<8sIII4x16s')
+# Смещение записи в блоке данных
+PACK_OFFSET = struct.Struct('<I')
+
+# Разделители полей записи и элементов списков (не встречаются в сигнатурах)
+FIELD_SEPARATOR = '\x1e'
+ITEM_SEPARATOR = '\x1f'
+
+MIN_SEVERITY = 1
+MAX_SEVERITY = 3
+
+# Пакет, поставляемый вместе с программой
+BUNDLED_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'signatures', 'default.json')
+# Скомпилированный пакет пользователя (его же обновляет updater)
+DEFAULT_COMPILED_PACK = os.path.join(os.path.expanduser('~'), '.matrix_scanner', 'signatures', 'signatures.mxsig')
+
+
+class SignaturePackError(Exception):
+    """Пакет сигнатур повреждён или имеет неверный формат"""
+
+
+class Signature(NamedTuple):
+    """Сигнатура одного чита"""
+    key: str
+    name: str
+    severity: int = 2
+    # Строки, которые ищутся в MANIFEST.MF / fabric.mod.json / mods.toml
+    manifest_markers: Tuple[str, ...] = ()
+    # Подстроки путей записей внутри JAR (например, пакет классов)
+    entry_patterns: Tuple[str, ...] = ()
+    # Известные сборки: (sha256, быстрый хеш)
+    hashes: Tuple[Tuple[str, str], ...] = ()
+    # Строки пула констант классов: литералы, имена классов и методов, цели миксинов
+    class_markers: Tuple[str, ...] = ()
+
+
+def parse_signature(item: Dict[str, Any]) -> Signature:
+    """Разобрать сигнатуру из исходного (JSON) описания"""
+    try:
+        key = str(item['key']).lower()
+        name = str(item['name'])
+    except (KeyError, TypeError):
+        raise SignaturePackError(f'Signature must have "key" and "name": {item!r}')
+
+    if not key or any(sep in key + name for sep in (FIELD_SEPARATOR, ITEM_SEPARATOR, '\n')):
+        raise SignaturePackError(f'Invalid signature key or name: {item!r}')
+
+    severity = int(item.get('severity', 2))
+    if not MIN_SEVERITY <= severity <= MAX_SEVERITY:
+        raise SignaturePackError(f'Severity of {key} must be {MIN_SEVERITY}..{MAX_SEVERITY}')
+
+    hashes = []
+    for entry in item.get('hashes', ()):
+        sha256_digest, quick_digest = entry['sha256'].lower(), entry['quick'].lower()
+        bytes.fromhex(sha256_digest), bytes.fromhex(quick_digest)
+        hashes.append((sha256_digest, quick_digest))
+
+    return Signature(
+        key,
+        name,
+        severity,
+        tuple(marker.lower() for marker in item.get('manifest_markers', ()) if marker),
+        tuple(pattern.lower() for pattern in item.get('entry_patterns', ()) if pattern),
+        tuple(hashes),
+        tuple(marker.lower() for marker in item.get('class_markers', ()) if marker)
+    )
+
+
+def load_source_pack(source_path: str) -> Tuple[int, List[Signature]]:
+    """Прочитать исходный пакет (JSON): ревизия и список сигнатур"""
+    with open(source_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    try:
+        revision = int(data['revision'])
+        signatures = [parse_signature(item) for item in data['signatures']]
+    except (KeyError, TypeError, ValueError) as e:
+        raise SignaturePackError(f'Invalid signature pack {source_path}: {e}')
+
+    return revision, signatures
+
+
+def _encode_record(signature: Signature) -> bytes:
+    hashes = ITEM_SEPARATOR.join(f'{sha}:{quick}' for sha, quick in signature.hashes)
+    return FIELD_SEPARATOR.join((
+        signature.key,
+        signature.name,
+        str(signature.severity),
+        ITEM_SEPARATOR.join(signature.manifest_markers),
+        ITEM_SEPARATOR.join(signature.entry_patterns),
+        hashes,
+        ITEM_SEPARATOR.join(signature.class_markers),
+    )).encode('utf-8')
+
+
+def _decode_record(data: bytes) -> Signature:
+    key, name, severity, markers, patterns, hashes, class_markers = data.decode('utf-8').split(FIELD_SEPARATOR)
+    split = lambda value: tuple(value.split(ITEM_SEPARATOR)) if value else ()
+    return Signature(
+        key,
+        name,
+        int(severity),
+        split(markers),
+        split(patterns),
+        tuple(tuple(item.split(':', 1)) for item in split(hashes)),
+        split(class_markers)
+    )
+
+
+def hash_db_path_for(pack_path: str) -> str:
+    """Путь базы хешей, которая собирается рядом со скомпилированным пакетом"""
+    return os.path.splitext(pack_path)[0] + '.mxh'
+
+
+def source_stamp_path_for(pack_path: str) -> str:
+    """Путь файла с отметкой (mtime, размер, ревизия) последнего разобранного исходного пакета"""
+    return os.path.splitext(pack_path)[0] + '.src'
+
+
+def compile_pack(revision: int, signatures: Iterable[Signature], pack_path: str) -> str:
+    """Скомпилировать пакет в бинарный формат (атомарно, через временный файл)
+
+    Хеши известных сборок дополнительно собираются в базу KnownHashDatabase
+    рядом с пакетом. Возвращает версию (дайджест) пакета.
+    """
+    signatures = list(signatures)
+    records = [_encode_record(signature) for signature in signatures]
+
+    offsets = bytearray()
+    position = 0
+    for record in records:
+        offsets += PACK_OFFSET.pack(position)
+        position += len(record)
+    offsets += PACK_OFFSET.pack(position)
+
+    blob = b''.join(records)
+    digest = hashlib.sha256(revision.to_bytes(4, 'little') + blob).digest()[:16]
+    header = PACK_HEADER.pack(PACK_MAGIC, PACK_FORMAT, revision, len(records), digest)
+
+    os.makedirs(os.path.dirname(os.path.abspath(pack_path)), exist_ok=True)
+
+    # База хешей пишется первой: новый пакет не должен ссылаться на старую базу
+    hash_db_path = hash_db_path_for(pack_path)
+    known = [(sha, quick, s.name) for s in signatures for sha, quick in s.hashes]
+    if known:
+        builder = HashDatabaseBuilder()
+        builder.add_many(known)
+        builder.write(hash_db_path)
+    elif os.path.exists(hash_db_path):
+        os.remove(hash_db_path)
+
+    temp_path = pack_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(offsets)
+        f.write(blob)
+    os.replace(temp_path, pack_path)
+
+    return digest.hex()
+
+
+def read_pack_revision(pack_path: str) -> Optional[int]:
+    """Ревизия скомпилированного пакета по заголовку; None - файла нет или он повреждён"""
+    try:
+        with open(pack_path, 'rb') as f:
+            magic, format_version, revision, _, _ = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != PACK_MAGIC or format_version != PACK_FORMAT:
+        return None
+    return revision
+
+
+class SignaturePack:
+    """Загруженный пакет сигнатур и матчеры для каждого вида проверки
+
+    Ключи ищутся везде; маркеры манифеста - только в файлах метаданных
+    мода, шаблоны путей - только в именах записей JAR, маркеры байткода -
+    только в пулах констант классов (ключи там не ищутся: короткие
+    названия слишком часто встречаются в строках обычных модов).
+    """
+
+    def __init__(self, revision: int, signatures: List[Signature],
+                 version: Optional[str] = None, path: Optional[str] = None):
+        self.revision = revision
+        self.signatures = list(signatures)
+        self.path = path
+
+        # Ключ -> название (в порядке приоритета, как прежний словарь сигнатур)
+        self.names: Dict[str, str] = {s.key: s.name for s in self.signatures}
+        self._severity = {}
+        for signature in self.signatures:
+            self._severity.setdefault(signature.name, signature.severity)
+
+        entry_patterns = dict(self.names)
+        metadata_markers = dict(self.names)
+        class_markers = {}
+        for signature in self.signatures:
+            for pattern in signature.entry_patterns:
+                entry_patterns.setdefault(pattern, signature.name)
+            for marker in signature.manifest_markers:
+                metadata_markers.setdefault(marker, signature.name)
+            for marker in signature.class_markers:
+                class_markers.setdefault(marker, signature.name)
+
+        self.name_matcher = SignatureMatcher(self.names)
+        self.entry_matcher = SignatureMatcher(entry_patterns)
+        self.metadata_matcher = SignatureMatcher(metadata_markers)
+        self.class_matcher = SignatureMatcher(class_markers)
+
+        if version is None:
+            version = hashlib.sha256('|'.join((
+                str(revision), self.name_matcher.version,
+                self.entry_matcher.version, self.metadata_matcher.version,
+                self.class_matcher.version
+            )).encode('utf-8')).hexdigest()[:32]
+        self.version = version
+
+    @classmethod
+    def open(cls, pack_path: str) -> 'SignaturePack':
+        """Загрузить скомпилированный пакет: одно чтение файла, без разбора JSON"""
+        with open(pack_path, 'rb') as f:
+            data = f.read()
+
+        try:
+            if len(data) < PACK_HEADER.size:
+                raise SignaturePackError(f'Truncated signature pack: {pack_path}')
+
+            magic, format_version, revision, count, digest = PACK_HEADER.unpack_from(data, 0)
+            if magic != PACK_MAGIC or format_version != PACK_FORMAT:
+                raise SignaturePackError(f'Unsupported signature pack: {pack_path}')
+
+            blob_offset = PACK_HEADER.size + (count + 1) * PACK_OFFSET.size
+            if blob_offset > len(data):
+                raise SignaturePackError(f'Truncated signature pack: {pack_path}')
+
+            offsets = struct.unpack_from(f'<{count + 1}I', data, PACK_HEADER.size)
+            if blob_offset + offsets[count] != len(data):
+                raise SignaturePackError(f'Truncated signature pack: {pack_path}')
+
+            signatures = [
+                _decode_record(data[blob_offset + offsets[i]:blob_offset + offsets[i + 1]])
+                for i in range(count)
+            ]
+        except (ValueError, TypeError) as e:
+            raise SignaturePackError(f'Corrupted signature pack {pack_path}: {e}')
+
+        return cls(revision, signatures, version=digest.hex(), path=pack_path)
+
+    def __reduce__(self):
+        # В процессы анализа передаётся только путь: воркер сам читает скомпилированный пакет
+        if self.path:
+            return SignaturePack.open, (self.path,)
+        return SignaturePack, (self.revision, self.signatures, self.version)
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @property
+    def hash_db_path(self) -> Optional[str]:
+        """База хешей, собранная из пакета (если в пакете есть хеши)"""
+        if not self.path:
+            return None
+        path = hash_db_path_for(self.path)
+        return path if os.path.exists(path) else None
+
+    def severity(self, cheat_name: Optional[str]) -> int:
+        """Уровень угрозы по названию чита (совпадение по хешу неизвестной сборки - максимум)"""
+        return self._severity.get(cheat_name, MAX_SEVERITY)
+
+
+class SignaturePackLoader:
+    """Загрузка и горячая перезагрузка пакета сигнатур
+
+    Исходный пакет (JSON) компилируется один раз; при следующих запусках
+    загружается бинарный файл. JSON разбирается заново, только если
+    изменились его mtime или размер: ревизия поставляемого пакета
+    запоминается рядом со скомпилированным (source_stamp_path_for).
+    Пакет перечитывается, если файл на диске изменился (например,
+    его заменил updater).
+    """
+
+    def __init__(self, pack_path: str = DEFAULT_COMPILED_PACK, source_path: str = BUNDLED_PACK):
+        self.pack_path = pack_path
+        self.source_path = source_path
+        self.pack: Optional[SignaturePack] = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_stamp(path: str) -> Optional[tuple]:
+        try:
+            stats = os.stat(path)
+        except OSError:
+            return None
+        return stats.st_mtime_ns, stats.st_size, stats.st_ino
+
+    def load(self) -> SignaturePack:
+        """Загрузить пакет (при необходимости скомпилировав поставляемый)"""
+        with self._lock:
+            try:
+                self._compile_bundled_if_newer()
+                pack = SignaturePack.open(self.pack_path)
+                self._stamp = self._file_stamp(self.pack_path)
+            except (OSError, SignaturePackError):
+                # Каталог пользователя недоступен или пакет повреждён - работаем с поставляемым
+                revision, signatures = load_source_pack(self.source_path)
+                pack = SignaturePack(revision, signatures)
+                self._stamp = None
+
+            self.pack = pack
+            return pack
+
+    def _compile_bundled_if_newer(self):
+        """Скомпилировать поставляемый пакет, если он новее установленного"""
+        installed = read_pack_revision(self.pack_path)
+        source_stamp = self._file_stamp(self.source_path)
+        bundled = self._read_source_stamp(source_stamp)
+        if installed is not None and bundled is not None and installed >= bundled:
+            return
+
+        revision, signatures = load_source_pack(self.source_path)
+        if installed is None or installed < revision:
+            compile_pack(revision, signatures, self.pack_path)
+        self._write_source_stamp(source_stamp, revision)
+
+    def _read_source_stamp(self, source_stamp: Optional[tuple]) -> Optional[int]:
+        """Ревизия поставляемого пакета, если JSON не менялся с последнего разбора"""
+        if source_stamp is None:
+            return None
+        try:
+            with open(source_stamp_path_for(self.pack_path), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if (saved['mtime_ns'], saved['size']) == source_stamp[:2]:
+                return int(saved['revision'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _write_source_stamp(self, source_stamp: Optional[tuple], revision: int):
+        if source_stamp is None:
+            return
+        stamp_path = source_stamp_path_for(self.pack_path)
+        try:
+            with open(stamp_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'mtime_ns': source_stamp[0], 'size': source_stamp[1], 'revision': revision}, f)
+            os.replace(stamp_path + '.tmp', stamp_path)
+        except OSError:
+            # Без отметки JSON просто разберётся при следующей загрузке
+            pass
+
+    def reload_if_changed(self) -> bool:
+        """Перечитать пакет, если файл изменился; True - загружен новый пакет"""
+        if self.pack is not None and self._stamp == self._file_stamp(self.pack_path):
+            return False
+
+        previous = self.pack.version if self.pack else None
+        return self.load().version != previous
+
+    def install(self, revision: int, signatures: Iterable[Signature]) -> SignaturePack:
+        """Установить новую ревизию пакета и сразу загрузить её"""
+        with self._lock:
+            compile_pack(revision, signatures, self.pack_path)
+        return self.load()
@@ -0,0 +1,136 @@
+import sys
+import json
+import threading
+from typing import Dict, Any, Optional, TextIO
+from scanner.events import UIEventBus
+
+
+class ScanSink:
+    """Получатель событий сканирования (UI, консоль, файл)
+
+    Все методы необязательные: базовая реализация ничего не делает.
+    """
+
+    def log(self, level: str, message: str):
+        pass
+
+    def stats(self, scanned: int, threats: int, clean: int):
+        pass
+
+    def progress(self, percent: float, label: str, eta: Optional[float]):
+        pass
+
+    def timer(self, elapsed: float):
+        pass
+
+    def result(self, result: Dict[str, Any]):
+        """Результат проверки одного файла (вызывается для каждого файла)"""
+        pass
+
+    def file_added(self, file_data: Dict[str, Any]):
+        pass
+
+    def file_status(self, file_id: str, status: str, result: Optional[Dict[str, Any]]):
+        pass
+
+    def download_progress(self, progress: float, downloaded: int, total: int):
+        pass
+
+    def scan_complete(self, stats: Dict[str, Any]):
+        pass
+
+    def scan_paused(self, stats: Dict[str, Any]):
+        """Сканирование приостановлено, точка продолжения сохранена"""
+        pass
+
+
+class WebviewSink(ScanSink):
+    """События в окно pywebview пачками через UIEventBus"""
+
+    def __init__(self, window):
+        self.window = window
+        self.events = UIEventBus(window.evaluate_js)
+
+    def log(self, level: str, message: str):
+        self.events.emit('addLog', level, message)
+
+    def stats(self, scanned: int, threats: int, clean: int):
+        self.events.set('stats', 'updateStats', scanned, threats, clean)
+
+    def progress(self, percent: float, label: str, eta: Optional[float]):
+        self.events.set('progress', 'updateProgress', percent, label, eta)
+
+    def timer(self, elapsed: float):
+        self.events.set('timer', 'updateTimer', elapsed)
+
+    def file_added(self, file_data: Dict[str, Any]):
+        self.events.emit('addFileToList', file_data)
+
+    def file_status(self, file_id: str, status: str, result: Optional[Dict[str, Any]]):
+        self.events.emit('updateFileStatus', file_id, status, result)
+
+    def download_progress(self, progress: float, downloaded: int, total: int):
+        self.events.set('download', 'updateDownloadProgress', round(progress, 1), downloaded, total)
+
+    def scan_complete(self, stats: Dict[str, Any]):
+        self.events.emit('onScanComplete')
+
+    def scan_paused(self, stats: Dict[str, Any]):
+        self.events.emit('onScanPaused')
+
+
+class NDJSONSink(ScanSink):
+    """Результаты в NDJSON (по объекту JSON на строку), логи - в отдельный поток"""
+
+    def __init__(self, stream: TextIO = None, log_stream: TextIO = None,
+                 include_clean: bool = False, verbose: bool = True):
+        self.stream = stream or sys.stdout
+        self.log_stream = log_stream or sys.stderr
+        self.include_clean = include_clean
+        self.verbose = verbose
+        self._lock = threading.Lock()
+
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def log(self, level: str, message: str):
+        if self.verbose or level in ('warning', 'error'):
+            with self._lock:
+                self.log_stream.write(f'[{level}] {message}\n')
+
+    def result(self, result: Dict[str, Any]):
+        if result['isThreat'] or self.include_clean:
+            self._write({'type': 'result', **result})
+
+    def scan_complete(self, stats: Dict[str, Any]):
+        self._write({'type': 'summary', **stats})
+
+    def scan_paused(self, stats: Dict[str, Any]):
+        self._write({'type': 'paused', **stats})
+
+
+class TextSink(ScanSink):
+    """Человекочитаемый вывод в консоль"""
+
+    def __init__(self, stream: TextIO = None, include_clean: bool = False, verbose: bool = True):
+        self.stream = stream or sys.stdout
+        self.include_clean = include_clean
+        self.verbose = verbose
+        self._lock = threading.Lock()
+
+    def _write(self, line: str):
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def log(self, level: str, message: str):
+        if self.verbose or level in ('warning', 'error'):
+            self._write(f'[{level.upper()}] {message}')
+
+    def result(self, result: Dict[str, Any]):
+        # Угрозы уже попадают в вывод через лог с уровнем error
+        if not result['isThreat'] and self.include_clean:
+            self._write(f'[CLEAN] {result["path"]}')
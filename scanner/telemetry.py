@@ -0,0 +1,228 @@
+import heapq
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Этапы сканирования в порядке прохождения файла
+STAGES = ('precount', 'walk', 'stat', 'queue', 'throttle', 'hash', 'match', 'jar', 'process', 'ui')
+
+# Границы корзин гистограмм задержек (секунды)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_SLOWEST = 10
+# Примеров сообщений на один тип ошибки
+_ERROR_EXAMPLES = 3
+
+
+class FileProfile:
+    """Время этапов и ошибки анализа одного файла
+
+    Заполняется в analyze_file (в том числе в процессе-воркере) и
+    передаётся в ScanTelemetry вместе с результатом пачки.
+    """
+
+    __slots__ = ('stages', 'errors')
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.errors: List[Tuple[str, str, str]] = []
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def error(self, stage: str, error: BaseException):
+        self.errors.append((stage, type(error).__name__, str(error)))
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с фиксированными корзинами (как histogram в Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # Последняя корзина - всё, что больше верхней границы (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Оценка перцентиля по верхней границе корзины"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': {
+                ('+Inf' if index == len(self.buckets) else str(self.buckets[index])): count
+                for index, count in enumerate(self.counts)
+            },
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class _Slowest:
+    """N самых медленных элементов (куча с минимумом на вершине)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._heap: List[Tuple[float, str, int]] = []
+
+    def add(self, seconds: float, path: str, extra: int = 0):
+        item = (seconds, path, extra)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        elif seconds > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def items(self) -> List[Tuple[float, str, int]]:
+        return sorted(self._heap, reverse=True)
+
+
+class ScanTelemetry:
+    """Профиль сканирования: время этапов, задержки, самые медленные файлы и папки, ошибки
+
+    Время этапов суммируется по всем потокам и процессам анализа, поэтому
+    сумма может превышать время сканирования. Методы потокобезопасны.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stage_seconds = {stage: 0.0 for stage in STAGES}
+            self._stage_calls = {stage: 0 for stage in STAGES}
+            self._file_latency = LatencyHistogram()
+            self._dir_latency = LatencyHistogram()
+            self._slowest_files = _Slowest(self.slowest)
+            self._slowest_dirs = _Slowest(self.slowest)
+            self._errors: Dict[Tuple[str, str], int] = {}
+            self._error_examples: Dict[Tuple[str, str], List[str]] = {}
+
+    def add_stage(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+            self._stage_calls[stage] = self._stage_calls.get(stage, 0) + calls
+
+    def observe_dir(self, path: str, seconds: float, entries: int):
+        """Листинг одной директории (без времени обработки найденных файлов)"""
+        with self._lock:
+            self._stage_seconds['walk'] += seconds
+            self._stage_calls['walk'] += 1
+            self._dir_latency.observe(seconds)
+            self._slowest_dirs.add(seconds, path, entries)
+
+    def observe_files(self, profiles: Iterable[Tuple[str, float, Dict[str, float]]]):
+        """Время анализа файлов: (путь, полное время, время по этапам)"""
+        with self._lock:
+            for path, seconds, stages in profiles:
+                self._file_latency.observe(seconds)
+                self._slowest_files.add(seconds, path)
+                for stage, stage_seconds in stages.items():
+                    self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + stage_seconds
+                    self._stage_calls[stage] = self._stage_calls.get(stage, 0) + 1
+
+    def record_error(self, stage: str, path: Optional[str], error: BaseException):
+        self.record_errors([(stage, path, type(error).__name__, str(error))])
+
+    def record_errors(self, errors: Iterable[Tuple[str, Optional[str], str, str]]):
+        """Ошибки: (этап, путь, тип, сообщение)"""
+        with self._lock:
+            for stage, path, error_type, message in errors:
+                key = (stage, error_type)
+                self._errors[key] = self._errors.get(key, 0) + 1
+                examples = self._error_examples.setdefault(key, [])
+                if len(examples) < _ERROR_EXAMPLES:
+                    examples.append(f'{path}: {message}' if path else message)
+
+    def error_count(self) -> int:
+        with self._lock:
+            return sum(self._errors.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'stages': {
+                    stage: {'seconds': round(seconds, 6), 'calls': self._stage_calls.get(stage, 0)}
+                    for stage, seconds in self._stage_seconds.items()
+                },
+                'file_latency': self._file_latency.to_dict(),
+                'dir_latency': self._dir_latency.to_dict(),
+                'slowest_files': [
+                    {'path': path, 'seconds': round(seconds, 6)}
+                    for seconds, path, _ in self._slowest_files.items()
+                ],
+                'slowest_dirs': [
+                    {'path': path, 'seconds': round(seconds, 6), 'entries': entries}
+                    for seconds, path, entries in self._slowest_dirs.items()
+                ],
+                'errors': [
+                    {'stage': stage, 'type': error_type, 'count': count,
+                     'examples': list(self._error_examples.get((stage, error_type), ()))}
+                    for (stage, error_type), count in sorted(self._errors.items(), key=lambda item: -item[1])
+                ],
+            }
+
+    def to_prometheus(self, stats: Optional[Dict[str, Any]] = None, prefix: str = 'matrix_scan') -> str:
+        """Текстовый формат Prometheus (например, для textfile collector node_exporter)"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name: str, metric_type: str, help_text: str):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+
+        if stats:
+            for key in ('scanned', 'threats', 'clean'):
+                if key in stats:
+                    metric(f'{key}_files', 'gauge', f'Files counted as {key} in the last scan')
+                    lines.append(f'{prefix}_{key}_files {stats[key]}')
+            if 'elapsed' in stats:
+                metric('elapsed_seconds', 'gauge', 'Wall time of the last scan')
+                lines.append(f'{prefix}_elapsed_seconds {stats["elapsed"]:.6f}')
+
+        metric('stage_seconds_total', 'counter', 'Time spent per stage, summed over threads and processes')
+        for stage, values in snapshot['stages'].items():
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {values["seconds"]:.6f}')
+        metric('stage_calls_total', 'counter', 'Operations per stage')
+        for stage, values in snapshot['stages'].items():
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {values["calls"]}')
+
+        for name, key, help_text in (('file_latency_seconds', 'file_latency', 'Per-file analysis time'),
+                                     ('dir_latency_seconds', 'dir_latency', 'Per-directory listing time')):
+            histogram = snapshot[key]
+            metric(name, 'histogram', help_text)
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_{name}_sum {histogram["sum"]:.6f}')
+            lines.append(f'{prefix}_{name}_count {histogram["count"]}')
+
+        metric('errors_total', 'counter', 'Errors by stage and exception type')
+        for error in snapshot['errors']:
+            lines.append(f'{prefix}_errors_total{{stage="{_escape(error["stage"])}",'
+                         f'type="{_escape(error["type"])}"}} {error["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,244 @@
+import os
+import sys
+import time
+import threading
+import psutil
+from typing import Any, Dict, Iterable, Optional
+from scanner.hashing import QUICK_HASH_BLOCK
+
+# Границы множителя скорости при адаптивном снижении
+MIN_FACTOR = 0.05
+# Шаги AIMD: при перегрузке скорость делится, без перегрузки - растёт понемногу
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+# Как часто пересматривается множитель (секунды)
+ADJUST_INTERVAL = 1.0
+# Перегрузка диска: задержка чтения выше базовой во столько раз
+LATENCY_RATIO = 3.0
+# Перегрузка CPU: доля всех ядер, занятая чужими (не сканера) процессами
+CPU_THRESHOLD = 0.75
+# Сглаживание задержки чтения (EWMA)
+LATENCY_ALPHA = 0.2
+# Сколько файлов нужно, чтобы базовая задержка считалась измеренной
+LATENCY_WARMUP = 20
+# Базовая задержка медленно подтягивается к текущей, чтобы не залипнуть на случайном минимуме
+BASELINE_DRIFT = 1.01
+
+# Низкий приоритет: nice на POSIX, класс приоритета на Windows
+LOW_NICE = 19
+
+
+def lower_priority(thread: bool = False) -> bool:
+    """Понизить приоритет CPU и I/O текущего процесса
+
+    С thread=True - только текущего потока: на Linux nice и ionice
+    задаются для отдельного потока (по native id), на других системах
+    потоки не трогаются. Ошибки (нет прав, нет поддержки) не фатальны:
+    возвращается False.
+    """
+    try:
+        if thread:
+            if not sys.platform.startswith('linux'):
+                return False
+            process = psutil.Process(threading.get_native_id())
+        else:
+            process = psutil.Process()
+
+        if os.name == 'nt':
+            process.nice(psutil.IDLE_PRIORITY_CLASS)
+            process.ionice(psutil.IOPRIO_VERYLOW)
+        else:
+            process.nice(LOW_NICE)
+            if hasattr(process, 'ionice'):
+                # Низший уровень best-effort, а не idle: idle-класс под постоянной
+                # нагрузкой игры может не получить диск совсем
+                process.ionice(psutil.IOPRIO_CLASS_BE, 7)
+        return True
+    except (psutil.Error, OSError, ValueError, AttributeError):
+        return False
+
+
+def estimated_read_bytes(file_path: str, file_size: int) -> int:
+    """Сколько байт анализ прочитает из файла (для бюджета до чтения)
+
+    Быстрый хеш читает начало и конец файла, JAR разбирается почти
+    целиком (центральный каталог, манифест, классы) - считается по размеру.
+    """
+    if file_path.lower().endswith('.jar'):
+        return file_size
+    return min(file_size, 2 * QUICK_HASH_BLOCK)
+
+
+class _TokenBucket:
+    """Ведро токенов; расход сверх остатка превращается в долг (время ожидания)"""
+
+    def __init__(self):
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def take(self, amount: float, rate: float, now: float) -> float:
+        """Списать amount при скорости rate; вернуть, сколько секунд подождать"""
+        # Запас - не больше секунды бюджета, иначе после простоя будет всплеск
+        self.tokens = min(rate, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= amount
+        return -self.tokens / rate if self.tokens < 0 else 0.0
+
+
+class IOGovernor:
+    """Бюджет чтения (байт/с, файлов/с) с адаптивным снижением скорости
+
+    Пайплайн перед отправкой пачки на анализ спрашивает delay() и ждёт
+    возвращённое время. Фактическая скорость - лимит, умноженный на
+    factor: при росте задержки чтения (диск занят игрой) или высокой
+    загрузке CPU чужими процессами factor уменьшается вдвое, без
+    перегрузки - растёт на RECOVERY_STEP за ADJUST_INTERVAL (AIMD).
+
+    Без заданных лимитов адаптивный режим берёт за основу скорость,
+    измеренную перед первым снижением, и снимает ограничение, когда
+    factor возвращается к 1.
+    """
+
+    def __init__(self, bytes_per_second: Optional[float] = None,
+                 files_per_second: Optional[float] = None, adaptive: bool = False,
+                 cpu_threshold: float = CPU_THRESHOLD, latency_ratio: float = LATENCY_RATIO):
+        self.bytes_per_second = bytes_per_second or None
+        self.files_per_second = files_per_second or None
+        self.adaptive = adaptive
+        self.cpu_threshold = cpu_threshold
+        self.latency_ratio = latency_ratio
+
+        self.factor = 1.0
+        self.min_factor_seen = 1.0
+        self.backoffs = 0
+        self._lock = threading.Lock()
+        self._bytes = _TokenBucket()
+        self._files = _TokenBucket()
+
+        # Измеренная скорость отправки (для адаптивного режима без лимитов)
+        self._window_started = time.monotonic()
+        self._window_bytes = 0
+        self._window_files = 0
+        self._observed = (None, None)
+        self._reference = (None, None)
+
+        # Задержка чтения: сглаженная и базовая
+        self._latency = None
+        self._baseline = None
+        self._samples = 0
+
+        # CPU: процессы сканера (свой и воркеры) и их время на прошлой проверке
+        self._own_processes: Dict[int, psutil.Process] = {}
+        self._own_cpu: Dict[int, float] = {}
+        self._adjusted = time.monotonic()
+        if adaptive:
+            psutil.cpu_percent(interval=None)
+            self._own_cpu_seconds()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.adaptive or self.bytes_per_second or self.files_per_second)
+
+    def delay(self, files: int, size: int) -> float:
+        """Учесть отправку files файлов (size байт чтения); вернуть время ожидания"""
+        now = time.monotonic()
+        with self._lock:
+            self._window_files += files
+            self._window_bytes += size
+            if self.adaptive and now - self._adjusted >= ADJUST_INTERVAL:
+                self._adjust(now)
+
+            bytes_rate = self.bytes_per_second or self._reference[0]
+            files_rate = self.files_per_second or self._reference[1]
+            wait = 0.0
+            if bytes_rate:
+                wait = max(wait, self._bytes.take(size, bytes_rate * self.factor, now))
+            if files_rate:
+                wait = max(wait, self._files.take(files, files_rate * self.factor, now))
+            return wait
+
+    def observe(self, profiles: Iterable[tuple]):
+        """Задержки чтения из профилей файлов (путь, время, время по этапам)
+
+        Мерой служит этап hash: быстрый хеш читает не больше двух блоков,
+        поэтому его время почти не зависит от размера файла.
+        """
+        if not self.adaptive:
+            return
+        with self._lock:
+            for _, _, stages in profiles:
+                seconds = stages.get('hash')
+                if seconds is None:
+                    continue
+                self._samples += 1
+                if self._latency is None:
+                    self._latency = seconds
+                else:
+                    self._latency += LATENCY_ALPHA * (seconds - self._latency)
+                if self._samples >= LATENCY_WARMUP:
+                    if self._baseline is None or self._latency < self._baseline:
+                        self._baseline = self._latency
+                    else:
+                        self._baseline = min(self._latency, self._baseline * BASELINE_DRIFT)
+
+    def _own_cpu_seconds(self) -> float:
+        """Прирост процессорного времени сканера (процесс и воркеры) с прошлой проверки"""
+        current = psutil.Process()
+        processes = {current.pid: self._own_processes.get(current.pid, current)}
+        try:
+            for child in current.children(recursive=True):
+                processes[child.pid] = self._own_processes.get(child.pid, child)
+        except psutil.Error:
+            pass
+
+        delta = 0.0
+        totals = {}
+        for pid, process in processes.items():
+            try:
+                times = process.cpu_times()
+            except psutil.Error:
+                continue
+            totals[pid] = times.user + times.system
+            delta += totals[pid] - self._own_cpu.get(pid, totals[pid])
+        self._own_processes = processes
+        self._own_cpu = totals
+        return delta
+
+    def _foreground_cpu(self, elapsed: float) -> float:
+        """Доля всех ядер, занятая не сканером, за прошедший интервал"""
+        system = psutil.cpu_percent(interval=None) / 100
+        own = self._own_cpu_seconds() / (elapsed * (psutil.cpu_count() or 1))
+        return max(0.0, system - own)
+
+    def _adjust(self, now: float):
+        elapsed = now - self._adjusted
+        self._observed = (self._window_bytes / elapsed, self._window_files / elapsed)
+        self._window_bytes = self._window_files = 0
+        self._adjusted = now
+
+        congested = (self._baseline is not None and self._latency is not None
+                     and self._latency > self._baseline * self.latency_ratio)
+        busy = self._foreground_cpu(elapsed) > self.cpu_threshold
+
+        if congested or busy:
+            if self._reference == (None, None):
+                # Точка отсчёта для снижения - скорость до перегрузки
+                self._reference = self._observed
+            self.factor = max(MIN_FACTOR, self.factor * BACKOFF_FACTOR)
+            self.backoffs += 1
+            self.min_factor_seen = min(self.min_factor_seen, self.factor)
+        elif self.factor < 1.0:
+            self.factor = min(1.0, self.factor + RECOVERY_STEP)
+            if self.factor >= 1.0:
+                self._reference = (None, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'bytes_per_second': self.bytes_per_second,
+                'files_per_second': self.files_per_second,
+                'adaptive': self.adaptive,
+                'factor': round(self.factor, 3),
+                'min_factor': round(self.min_factor_seen, 3),
+                'backoffs': self.backoffs,
+            }
@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Union
+
+
+class ScanRoot(NamedTuple):
+    """Корень обхода с ограничением глубины (None - без ограничения)"""
+    path: str
+    max_depth: Optional[int] = None
+
+
+def stat_candidate(file_path: str, entry: Optional[os.DirEntry] = None,
+                   accept_file: Optional[Callable[[str, os.stat_result], bool]] = None) -> Optional[os.stat_result]:
+    """stat файла-кандидата; None - файл отсеян фильтром, ошибка stat - OSError
+
+    Общее правило для анализа и предварительного подсчёта, чтобы итог
+    подсчёта совпадал с числом проверяемых файлов.
+    """
+    file_stats = entry.stat() if entry is not None else os.stat(file_path)
+    if accept_file is not None and not accept_file(file_path, file_stats):
+        return None
+    return file_stats
+
+
+class ParallelWalker:
+    """Параллельный обход директорий на os.scandir с work stealing
+
+    У каждого потока своя очередь директорий: свои поддиректории поток
+    берёт с конца (обход в глубину), а простаивающий поток ворует
+    с начала чужой очереди - там лежат крупные, ещё не начатые поддеревья.
+    Корни (диски) раскладываются по разным очередям и сканируются одновременно.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 skip_dir: Optional[Callable[[str], bool]] = None,
+                 file_filter: Optional[Callable[[str], bool]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 on_dir: Optional[Callable[[str, float, int], None]] = None,
+                 on_thread_start: Optional[Callable[[], None]] = None):
+        # Обход упирается в задержки I/O, а не в CPU, поэтому потоков больше, чем ядер
+        self.workers = max(1, workers or min(32, (os.cpu_count() or 1) * 4))
+        self.skip_dir = skip_dir
+        self.file_filter = file_filter
+        self.should_stop = should_stop
+        self.on_error = on_error
+        # Профилирование: (путь, время листинга без обработки файлов, число записей)
+        self.on_dir = on_dir
+        # Вызывается в начале каждого рабочего потока (например, понижение приоритета)
+        self.on_thread_start = on_thread_start
+
+        self._queues = []
+        self._pending = 0
+        self._cond = threading.Condition()
+        # Директории, листинг которых прервала остановка (при продолжении читаются заново)
+        self._interrupted = []
+
+    def walk(self, roots: List[Union[str, ScanRoot]], on_file: Callable[[os.DirEntry], None]):
+        """Обойти все корни, вызывая on_file для каждого подходящего файла
+
+        on_file вызывается из рабочих потоков; DirEntry хранит данные stat,
+        которые на Windows приходят бесплатно вместе с листингом.
+        """
+        self._queues = [deque() for _ in range(self.workers)]
+        self._pending = len(roots)
+        self._interrupted = []
+
+        # В очереди лежат пары (путь, оставшаяся глубина)
+        for index, root in enumerate(roots):
+            if not isinstance(root, ScanRoot):
+                root = ScanRoot(root)
+            self._queues[index % self.workers].append((root.path, root.max_depth))
+
+        threads = [
+            threading.Thread(target=self._worker, args=(index, on_file), daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def frontier(self) -> List[ScanRoot]:
+        """Необойдённые директории после остановки: с них можно продолжить обход"""
+        pending = list(self._interrupted)
+        for queue in self._queues:
+            pending.extend(queue)
+        return [ScanRoot(path, depth) for path, depth in pending]
+
+    def _stopped(self) -> bool:
+        return bool(self.should_stop and self.should_stop())
+
+    def _next_dir(self, index: int) -> Optional[tuple]:
+        """Взять директорию из своей очереди или украсть у соседа"""
+        try:
+            return self._queues[index].pop()
+        except IndexError:
+            pass
+
+        for offset in range(1, self.workers):
+            try:
+                return self._queues[(index + offset) % self.workers].popleft()
+            except IndexError:
+                continue
+
+        return None
+
+    def _worker(self, index: int, on_file: Callable[[os.DirEntry], None]):
+        if self.on_thread_start is not None:
+            self.on_thread_start()
+        while not self._stopped():
+            item = self._next_dir(index)
+
+            if item is None:
+                with self._cond:
+                    if self._pending == 0:
+                        return
+                    self._cond.wait(0.05)
+                continue
+
+            try:
+                self._scan_dir(index, *item, on_file)
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._cond.notify_all()
+
+    def _scan_dir(self, index: int, path: str, depth: Optional[int],
+                  on_file: Callable[[os.DirEntry], None]):
+        subdirs = []
+        interrupted = False
+        # При исчерпании глубины файлы ещё проверяются, но внутрь не спускаемся
+        descend = depth is None or depth > 0
+        child_depth = None if depth is None else depth - 1
+        started = time.perf_counter()
+        callback_time = 0.0
+        count = 0
+
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if self._stopped():
+                        interrupted = True
+                        break
+
+                    count += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if descend and not (self.skip_dir and self.skip_dir(entry.path)):
+                                subdirs.append((entry.path, child_depth))
+                        elif self.file_filter is None or self.file_filter(entry.name):
+                            if self.on_dir:
+                                callback_started = time.perf_counter()
+                                on_file(entry)
+                                callback_time += time.perf_counter() - callback_started
+                            else:
+                                on_file(entry)
+                    except OSError as e:
+                        self._report_error(entry.path, e)
+        except OSError as e:
+            # Директории без доступа пропускаем
+            self._report_error(path, e)
+
+        if self.on_dir:
+            self.on_dir(path, time.perf_counter() - started - callback_time, count)
+
+        if interrupted:
+            # Директория будет прочитана заново целиком - найденные поддиректории не публикуем
+            with self._cond:
+                self._interrupted.append((path, depth))
+            return
+
+        if subdirs:
+            # Счётчик увеличиваем до публикации, иначе соседи могут решить, что работа кончилась
+            with self._cond:
+                self._pending += len(subdirs)
+                self._cond.notify(len(subdirs))
+            self._queues[index].extend(subdirs)
+
+    def _report_error(self, path: str, error: Exception):
+        if self.on_error:
+            self.on_error(path, error)
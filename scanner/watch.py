@@ -0,0 +1,495 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from scanner.walker import ScanRoot
+
+# Пауза после последнего события, прежде чем файл пойдёт на проверку (распаковка сборки модов)
+DEFAULT_DEBOUNCE = 0.25
+# Предельная задержка: файл, который продолжают менять, всё равно проверяется не позже
+DEFAULT_MAX_DELAY = 1.0
+
+
+class WatchBackend:
+    """Источник событий файловой системы
+
+    start() подписывается на изменения в корнях и вызывает on_file(path)
+    для созданного/изменённого файла и on_directory(root) для появившейся
+    директории, содержимое которой нужно проверить целиком (новая папка,
+    переполнение очереди событий). Вызовы приходят из потока бэкенда.
+    """
+
+    name = ''
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def start(self, roots: List[ScanRoot],
+              on_file: Callable[[str], None],
+              on_directory: Callable[[ScanRoot], None],
+              skip_dir: Optional[Callable[[str], bool]] = None):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+def _child_depth(depth: Optional[int]) -> Optional[int]:
+    return None if depth is None else depth - 1
+
+
+class InotifyBackend(WatchBackend):
+    """inotify (Linux) через ctypes, без сторонних зависимостей
+
+    inotify не рекурсивен: на каждую директорию в пределах глубины корня
+    ставится отдельное наблюдение, новые директории добавляются на лету.
+    Файлы сообщаются по IN_CLOSE_WRITE/IN_MOVED_TO - к этому моменту
+    запись уже завершена.
+    """
+
+    name = 'inotify'
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+    EVENT_HEADER = struct.Struct('iIII')
+    READ_SIZE = 64 * 1024
+
+    def __init__(self):
+        self._libc = None
+        self._fd = -1
+        self._wake_r, self._wake_w = -1, -1
+        self._watches: Dict[int, Tuple[str, Optional[int]]] = {}
+        self._roots: List[ScanRoot] = []
+        self._thread = None
+        self._running = False
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith('linux') and cls._load_libc() is not None
+
+    @staticmethod
+    def _load_libc():
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        except OSError:
+            return None
+        if not hasattr(libc, 'inotify_init1') or not hasattr(libc, 'inotify_add_watch'):
+            return None
+        return libc
+
+    def start(self, roots, on_file, on_directory, skip_dir=None):
+        self._libc = self._load_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = self._get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._on_file = on_file
+        self._on_directory = on_directory
+        self._skip_dir = skip_dir or (lambda path: False)
+        self._roots = list(roots)
+        self._running = True
+
+        for root in self._roots:
+            self._watch_tree(root.path, root.max_depth)
+
+        self._thread = threading.Thread(target=self._loop, name='inotify-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._wake_w >= 0:
+            try:
+                os.write(self._wake_w, b'\0')
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._wake_r = self._wake_w = -1
+        self._watches = {}
+
+    def watch_count(self) -> int:
+        return len(self._watches)
+
+    def _get_errno(self) -> int:
+        import ctypes
+        return ctypes.get_errno()
+
+    def _add_watch(self, path: str, depth: Optional[int]) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            # Директория исчезла или нет прав; при исчерпании лимита наблюдений - тоже пропускаем
+            return False
+        self._watches[wd] = (path, depth)
+        return True
+
+    def _watch_tree(self, path: str, depth: Optional[int]):
+        """Поставить наблюдение на директорию и её поддиректории в пределах глубины"""
+        stack = [(path, depth)]
+        while stack:
+            current, current_depth = stack.pop()
+            if not self._add_watch(current, current_depth):
+                continue
+            if current_depth is not None and current_depth <= 0:
+                continue
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and not self._skip_dir(entry.path):
+                                stack.append((entry.path, _child_depth(current_depth)))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _loop(self):
+        while self._running:
+            try:
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._wake_r in ready or not self._running:
+                return
+
+            try:
+                data = os.read(self._fd, self.READ_SIZE)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes):
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + name_len].rstrip(b'\0')
+            offset += header_size + name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                # События потеряны - проверяем корни целиком
+                for root in self._roots:
+                    self._on_directory(root)
+                continue
+
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            watched = self._watches.get(wd)
+            if watched is None or not name:
+                continue
+
+            directory, depth = watched
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and (depth is None or depth > 0) \
+                        and not self._skip_dir(path):
+                    # Файлы могли появиться в папке раньше, чем на неё встало наблюдение
+                    self._watch_tree(path, _child_depth(depth))
+                    self._on_directory(ScanRoot(path, _child_depth(depth)))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                self._on_file(path)
+
+
+class WatchdogBackend(WatchBackend):
+    """Библиотека watchdog (Windows, macOS), если она установлена"""
+
+    name = 'watchdog'
+
+    def __init__(self):
+        self._observer = None
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import watchdog.observers
+            return True
+        except ImportError:
+            return False
+
+    def start(self, roots, on_file, on_directory, skip_dir=None):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        skip_dir = skip_dir or (lambda path: False)
+
+        class Handler(FileSystemEventHandler):
+            def __init__(self, root: ScanRoot):
+                self.root = root
+
+            def _remaining_depth(self, path: str) -> Optional[int]:
+                """Глубина, оставшаяся до предела корня (< 0 - файл глубже предела)"""
+                if self.root.max_depth is None:
+                    return None
+                relative = os.path.relpath(os.path.dirname(path), self.root.path)
+                level = 0 if relative == os.curdir else relative.count(os.sep) + 1
+                return self.root.max_depth - level
+
+            def _changed(self, path: str, is_directory: bool):
+                remaining = self._remaining_depth(path)
+                if remaining is not None and remaining < 0:
+                    return
+                if skip_dir(os.path.dirname(path)):
+                    return
+                if is_directory:
+                    if remaining is None or remaining > 0:
+                        if not skip_dir(path):
+                            on_directory(ScanRoot(path, _child_depth(remaining)))
+                else:
+                    on_file(path)
+
+            def on_created(self, event):
+                self._changed(event.src_path, event.is_directory)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    self._changed(event.src_path, False)
+
+            def on_moved(self, event):
+                self._changed(event.dest_path, event.is_directory)
+
+        self._observer = Observer()
+        for root in roots:
+            self._observer.schedule(Handler(root), root.path, recursive=root.max_depth != 0)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+
+class PollingBackend(WatchBackend):
+    """Периодический опрос директорий (работает везде, но медленнее и дороже)
+
+    Сравнивает размер и время изменения файлов с прошлым проходом;
+    новые директории обнаруживаются тем же проходом.
+    """
+
+    name = 'polling'
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, roots, on_file, on_directory, skip_dir=None):
+        self._roots = list(roots)
+        self._on_file = on_file
+        self._skip_dir = skip_dir or (lambda path: False)
+        self._stop.clear()
+        # Первый проход только запоминает состояние - существующие файлы проверяет обычное сканирование
+        self._snapshot = self._poll()
+        self._thread = threading.Thread(target=self._loop, name='polling-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _poll(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = [(root.path, root.max_depth) for root in self._roots]
+        while stack and not self._stop.is_set():
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if (depth is None or depth > 0) and not self._skip_dir(entry.path):
+                                    stack.append((entry.path, _child_depth(depth)))
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self._poll()
+            if self._stop.is_set():
+                return
+            for path, state in snapshot.items():
+                if self._snapshot.get(path) != state:
+                    self._on_file(path)
+            self._snapshot = snapshot
+
+
+# Бэкенды в порядке предпочтения
+WATCH_BACKENDS = {
+    InotifyBackend.name: InotifyBackend,
+    WatchdogBackend.name: WatchdogBackend,
+    PollingBackend.name: PollingBackend,
+}
+
+
+def create_watch_backend(name: Optional[str] = None) -> WatchBackend:
+    """Бэкенд по имени или первый доступный на этой системе"""
+    if name:
+        backend_class = WATCH_BACKENDS.get(name)
+        if backend_class is None:
+            raise ValueError(f'Unknown watch backend: {name}')
+        if not backend_class.available():
+            raise OSError(errno.ENOSYS, f'Watch backend is not available: {name}')
+        return backend_class()
+
+    for backend_class in WATCH_BACKENDS.values():
+        if backend_class.available():
+            return backend_class()
+    return PollingBackend()
+
+
+class FileWatcher:
+    """Наблюдение за корнями с устранением дребезга событий
+
+    Событие откладывает проверку файла на debounce секунд после последнего
+    изменения (распаковка сборки даёт десятки событий на файл), но не
+    больше чем на max_delay с первого события. Готовые файлы передаются
+    пачкой в on_files из отдельного потока.
+    """
+
+    def __init__(self,
+                 roots: List[ScanRoot],
+                 on_files: Callable[[List[str]], None],
+                 file_filter: Callable[[str], bool],
+                 skip_dir: Optional[Callable[[str], bool]] = None,
+                 backend: Optional[WatchBackend] = None,
+                 debounce: float = DEFAULT_DEBOUNCE,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        self.roots = list(roots)
+        self.on_files = on_files
+        self.file_filter = file_filter
+        self.skip_dir = skip_dir
+        self.backend = backend or create_watch_backend()
+        self.debounce = debounce
+        self.max_delay = max_delay
+        # path -> (первое событие, последнее событие)
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='file-watcher', daemon=True)
+        self._thread.start()
+        try:
+            self.backend.start(self.roots, self._on_file, self._on_directory, self.skip_dir)
+        except Exception:
+            self.stop()
+            raise
+
+    def stop(self):
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        self.backend.stop()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _on_file(self, path: str):
+        if not self.file_filter(os.path.basename(path)):
+            return
+        now = time.monotonic()
+        with self._condition:
+            first, _ = self._pending.get(path, (now, now))
+            self._pending[path] = (first, now)
+            self._condition.notify()
+
+    def _on_directory(self, root: ScanRoot):
+        """Новая директория: все подходящие файлы в ней (в пределах глубины)"""
+        stack = [(root.path, root.max_depth)]
+        while stack and self._running:
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if (depth is None or depth > 0) and not (self.skip_dir and self.skip_dir(entry.path)):
+                                    stack.append((entry.path, _child_depth(depth)))
+                            elif entry.is_file(follow_symlinks=False):
+                                self._on_file(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _due(self, now: float) -> Tuple[List[str], Optional[float]]:
+        """Файлы, готовые к проверке, и время до следующего срока"""
+        due = []
+        wait = None
+        for path, (first, last) in self._pending.items():
+            deadline = min(last + self.debounce, first + self.max_delay)
+            if deadline <= now:
+                due.append(path)
+            else:
+                wait = deadline - now if wait is None else min(wait, deadline - now)
+        for path in due:
+            del self._pending[path]
+        return due, wait
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    due, wait = self._due(time.monotonic())
+                    if due:
+                        break
+                    self._condition.wait(wait)
+                if not self._running:
+                    return
+
+            try:
+                self.on_files(due)
+            except Exception:
+                # Ошибка проверки одной пачки не должна останавливать наблюдение
+                pass
@@ -0,0 +1,47 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from scanner.cancel import CancellationToken
+
+_token = None
+_started = None
+
+
+def _init(token, started):
+    global _token, _started
+    _token = token
+    _started = started
+
+
+def _wait_for_cancel(timeout):
+    _started.set()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _token.cancelled:
+            return 'cancelled'
+        time.sleep(0.01)
+    return 'not cancelled'
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='нет fork')
+def test_cancel_reaches_forked_worker():
+    """Копия флага при fork (без pickle) видит отмену из родительского процесса"""
+    context = multiprocessing.get_context('fork')
+    token = CancellationToken()
+    started = context.Event()
+    with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                             initializer=_init, initargs=(token, started)) as executor:
+        future = executor.submit(_wait_for_cancel, 30)
+        assert started.wait(10)
+        token.cancel()
+        assert future.result(timeout=10) == 'cancelled'
+
+
+def test_cancel_in_own_process():
+    token = CancellationToken()
+    assert not token.cancelled
+    token.cancel()
+    assert token.cancelled
@@ -0,0 +1,66 @@
+import os
+
+from scanner.checkpoint import ScanCheckpoint
+from scanner.core import ScannerAPI
+from scanner.exclude import IGNORE_FILE
+from scanner.sigpack import SignaturePackLoader
+from scanner.sinks import ScanSink
+
+FOLDERS = 400
+
+
+class _PauseSink(ScanSink):
+    """Собирает результаты и ставит сканирование на паузу после первого"""
+
+    def __init__(self, api: ScannerAPI):
+        self.api = api
+        self.paths = []
+        self.pause = True
+
+    def result(self, result):
+        self.paths.append(result['path'])
+        if self.pause:
+            self.pause = False
+            self.api.pause_scan()
+
+
+def _make_api(state) -> ScannerAPI:
+    api = ScannerAPI()
+    api.signature_loader = SignaturePackLoader(str(state / 'signatures' / 'signatures.mxsig'))
+    api.hash_db_path = str(state / 'known_hashes.mxh')
+    api.checkpoint_path = str(state / 'scan_checkpoint.json')
+    api.use_scan_cache = False
+    api.precount_files = False
+    api.analysis_workers = 0
+    api.walker_workers = 1
+    return api
+
+
+def test_custom_resume_keeps_ignore_file(tmp_path):
+    """Продолжение custom-сканирования не теряет правила .matrixignore исходного корня"""
+    root = tmp_path / 'root'
+    # Папок столько, чтобы к паузе обход не успел их все прочитать
+    for index in range(FOLDERS):
+        folder = root / f'mods{index:03}'
+        (folder / 'skipme').mkdir(parents=True)
+        (folder / 'mod.jar').write_bytes(b'not a zip')
+        (folder / 'skipme' / 'wurst.jar').write_bytes(b'not a zip')
+    (root / IGNORE_FILE).write_text('skipme/\n', encoding='utf-8')
+
+    api = _make_api(tmp_path / 'state')
+    sink = _PauseSink(api)
+    api.add_sink(sink)
+
+    result = api.run_scan('custom', [str(root)])
+    assert result['paused']
+    checkpoint = ScanCheckpoint.load(api.checkpoint_path)
+    assert checkpoint.frontier
+    assert checkpoint.roots[0].path == str(root)
+
+    result = api.run_scan(resume=True)
+    assert not result['paused']
+    assert not os.path.exists(api.checkpoint_path)
+
+    assert len(set(sink.paths)) == FOLDERS
+    assert not [path for path in sink.paths if 'skipme' in path]
+    assert result['threats'] == 0
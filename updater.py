@@ -1,23 +1,105 @@
 import requests
 import os
+import re
 import sys
 import json
 import tempfile
 import subprocess
 import shutil
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import hashlib
 
+# Формат манифеста обновления сигнатур
+SIGNATURE_MANIFEST = 'manifest.json'
+SIGNATURE_MANIFEST_FORMAT = 1
+# Средний размер чанка в сигнатурах (границы чанков определяются содержимым)
+SIGNATURE_CHUNK_AVERAGE = 16
+SIGNATURE_CHUNK_MAX = 64
+# Имя чанка - его SHA-256 (hex); другое значение из манифеста не должно попасть в путь
+_CHUNK_DIGEST = re.compile(r'[0-9a-f]{64}')
+
+
+def _is_chunk_boundary(signature: Dict[str, Any], average: int) -> bool:
+    """Граница чанка после сигнатуры определяется её ключом, а не позицией
+
+    Добавление или удаление сигнатуры меняет только её чанк, остальные
+    чанки (и их адреса) остаются прежними.
+    """
+    digest = hashlib.sha256(str(signature.get('key', '')).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'little') % average == 0
+
+
+def build_signature_update(source_path: str, output_dir: str,
+                           average: int = SIGNATURE_CHUNK_AVERAGE,
+                           max_chunk: int = SIGNATURE_CHUNK_MAX) -> Dict[str, Any]:
+    """Подготовить обновление сигнатур для публикации (зеркало, GitHub, общая папка)
+
+    Пакет сигнатур (JSON) режется на чанки, которые сохраняются в
+    output_dir/chunks/<sha256>; порядок чанков и ревизия пакета
+    записываются в output_dir/manifest.json.
+    """
+    with open(source_path, 'r', encoding='utf-8') as f:
+        pack = json.load(f)
+    
+    groups = []
+    current = []
+    for signature in pack['signatures']:
+        current.append(signature)
+        if _is_chunk_boundary(signature, average) or len(current) >= max_chunk:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    
+    chunks_dir = os.path.join(output_dir, 'chunks')
+    os.makedirs(chunks_dir, exist_ok=True)
+    
+    chunks = []
+    for group in groups:
+        data = json.dumps(group, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        chunk_path = os.path.join(chunks_dir, digest)
+        if not os.path.exists(chunk_path):
+            with open(chunk_path, 'wb') as f:
+                f.write(data)
+        chunks.append({'sha256': digest, 'size': len(data)})
+    
+    manifest = {
+        'format': SIGNATURE_MANIFEST_FORMAT,
+        'revision': int(pack['revision']),
+        'chunks': chunks
+    }
+    with open(os.path.join(output_dir, SIGNATURE_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return manifest
+
+
 class AutoUpdater:
     """Система автоматического обновления программы"""
     
-    def __init__(self, current_version: str, github_repo: str):
+    def __init__(self, current_version: str, github_repo: str,
+                 signature_source: Optional[str] = None, download_workers: int = 4):
         self.current_version = current_version
         self.github_repo = "nalmehelm/matrixchecker"  # Формат: "username/repository"
         self.api_url = f"https://api.github.com/repos/{github_repo}/releases/latest"
         self.update_dir = os.path.join(os.path.expanduser('~'), '.matrix_scanner', 'updates')
         os.makedirs(self.update_dir, exist_ok=True)
+        
+        # Источник обновлений сигнатур: HTTP(S)-зеркало, file:// или локальная папка
+        self.signature_source = (
+            signature_source
+            or os.environ.get('MATRIX_SIGNATURE_SOURCE')
+            or f"https://raw.githubusercontent.com/{github_repo}/main/signatures"
+        )
+        self.download_workers = max(1, download_workers)
+        # Локальное хранилище чанков: уже скачанные чанки повторно не загружаются
+        self.chunks_dir = os.path.join(self.update_dir, 'signature_chunks')
     
     def check_for_updates(self) -> Optional[Dict[str, Any]]:
         """Проверить наличие новой версии"""
@@ -221,4 +303,191 @@ class AutoUpdater:
                     if os.path.isfile(file_path):
                         os.remove(file_path)
         except Exception as e:
-            print(f"Error cleaning up updates: {e}")
\ No newline at end of file
+            print(f"Error cleaning up updates: {e}")
+    
+    def _source_url(self, *parts: str) -> str:
+        """Адрес файла в источнике сигнатур"""
+        return '/'.join([self.signature_source.rstrip('/')] + list(parts))
+    
+    @staticmethod
+    def _local_path(url: str) -> Optional[str]:
+        """Путь к файлу для file:// и обычных путей; None - сетевой адрес"""
+        parsed = urlparse(url)
+        if parsed.scheme == 'file':
+            return url2pathname(parsed.path)
+        if parsed.scheme in ('http', 'https'):
+            return None
+        return url
+    
+    def _fetch(self, url: str) -> bytes:
+        """Прочитать небольшой файл из источника (манифест)"""
+        local_path = self._local_path(url)
+        if local_path is not None:
+            with open(local_path, 'rb') as f:
+                return f.read()
+        
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        return response.content
+    
+    @staticmethod
+    def _validate_manifest(manifest: Dict[str, Any]):
+        """Проверить чанки манифеста: SHA-256 в hex и неотрицательный размер
+
+        Дайджест становится именем файла в chunks_dir и частью адреса,
+        поэтому манифест с любым другим значением (например, "../") отклоняется целиком.
+        """
+        chunks = manifest.get('chunks')
+        if not isinstance(chunks, list):
+            raise ValueError('Signature manifest has no chunk list')
+        for chunk in chunks:
+            digest = chunk.get('sha256') if isinstance(chunk, dict) else None
+            if not isinstance(digest, str) or not _CHUNK_DIGEST.fullmatch(digest):
+                raise ValueError(f'Invalid signature chunk digest: {digest!r}')
+            size = chunk.get('size')
+            if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+                raise ValueError(f'Invalid size for signature chunk {digest}')
+    
+    def check_signature_update(self, current_revision: int) -> Dict[str, Any]:
+        """Проверить наличие новой ревизии сигнатур и объём докачки"""
+        try:
+            manifest = json.loads(self._fetch(self._source_url(SIGNATURE_MANIFEST)))
+            if manifest.get('format') != SIGNATURE_MANIFEST_FORMAT:
+                return {'available': False, 'error': 'Unsupported signature manifest format'}
+            self._validate_manifest(manifest)
+            
+            revision = int(manifest['revision'])
+            if revision <= current_revision:
+                return {'available': False, 'revision': revision, 'message': 'Signatures are up to date'}
+            
+            missing = [chunk for chunk in manifest['chunks'] if not self._has_chunk(chunk['sha256'])]
+            return {
+                'available': True,
+                'revision': revision,
+                'manifest': manifest,
+                'chunks': len(manifest['chunks']),
+                'missing_chunks': len(missing),
+                'download_size': sum(chunk['size'] for chunk in missing)
+            }
+            
+        except requests.RequestException as e:
+            return {'available': False, 'error': f'Network error: {str(e)}'}
+        except Exception as e:
+            return {'available': False, 'error': f'Error checking signature update: {str(e)}'}
+    
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunks_dir, digest)
+    
+    def _has_chunk(self, digest: str) -> bool:
+        return os.path.exists(self._chunk_path(digest))
+    
+    @staticmethod
+    def _file_sha256(file_path: str) -> str:
+        sha256_hash = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha256_hash.update(chunk)
+        return sha256_hash.hexdigest()
+    
+    def _download_chunk(self, chunk: Dict[str, Any], on_data: Callable[[int], None]) -> str:
+        """Скачать чанк с докачкой (.part) и проверкой SHA-256"""
+        digest = chunk['sha256']
+        target = self._chunk_path(digest)
+        if os.path.exists(target):
+            return target
+        
+        part_path = target + '.part'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset > chunk['size']:
+            os.remove(part_path)
+            offset = 0
+        if offset:
+            on_data(offset)
+        
+        url = self._source_url('chunks', digest)
+        local_path = self._local_path(url)
+        
+        if offset < chunk['size']:
+            if local_path is not None:
+                with open(local_path, 'rb') as src, open(part_path, 'ab') as dst:
+                    src.seek(offset)
+                    for data in iter(lambda: src.read(65536), b''):
+                        dst.write(data)
+                        on_data(len(data))
+            else:
+                headers = {'Range': f'bytes={offset}-'} if offset else {}
+                response = requests.get(url, headers=headers, stream=True, timeout=30)
+                response.raise_for_status()
+                # Сервер без поддержки Range отдаёт файл целиком - начинаем заново
+                if offset and response.status_code != 206:
+                    on_data(-offset)
+                    offset = 0
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for data in response.iter_content(chunk_size=65536):
+                        if data:
+                            f.write(data)
+                            on_data(len(data))
+        
+        if self._file_sha256(part_path) != digest:
+            os.remove(part_path)
+            raise ValueError(f'Checksum mismatch for signature chunk {digest}')
+        
+        os.replace(part_path, target)
+        return target
+    
+    def download_signature_update(self, update_info: Dict[str, Any], progress_callback=None) -> Optional[str]:
+        """Докачать недостающие чанки параллельно и собрать пакет сигнатур
+
+        Возвращает путь к собранному пакету (JSON) или None при ошибке.
+        """
+        manifest = update_info['manifest']
+        try:
+            self._validate_manifest(manifest)
+        except ValueError as e:
+            print(f"Error downloading signature update: {e}")
+            return None
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        
+        missing = [chunk for chunk in manifest['chunks'] if not self._has_chunk(chunk['sha256'])]
+        total_size = sum(chunk['size'] for chunk in missing)
+        downloaded = [0]
+        lock = threading.Lock()
+        
+        def on_data(size: int):
+            with lock:
+                downloaded[0] += size
+                current = downloaded[0]
+            if progress_callback and total_size > 0:
+                progress_callback(current / total_size * 100, current, total_size)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                futures = [executor.submit(self._download_chunk, chunk, on_data) for chunk in missing]
+                for future in as_completed(futures):
+                    future.result()
+            
+            signatures: List[Dict[str, Any]] = []
+            for chunk in manifest['chunks']:
+                with open(self._chunk_path(chunk['sha256']), 'rb') as f:
+                    signatures.extend(json.loads(f.read().decode('utf-8')))
+            
+            file_path = os.path.join(self.update_dir, f"signatures-r{manifest['revision']}.json")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump({'revision': manifest['revision'], 'signatures': signatures}, f, ensure_ascii=False)
+            
+            self._prune_chunks(manifest)
+            return file_path
+            
+        except Exception as e:
+            print(f"Error downloading signature update: {e}")
+            return None
+    
+    def _prune_chunks(self, manifest: Dict[str, Any]):
+        """Удалить чанки, которых нет в текущем манифесте"""
+        keep = {chunk['sha256'] for chunk in manifest['chunks']}
+        for name in os.listdir(self.chunks_dir):
+            if name not in keep and not name.endswith('.part'):
+                try:
+                    os.remove(os.path.join(self.chunks_dir, name))
+                except OSError:
+                    pass
@@ -1,12 +1,41 @@
 // Глобальное состояние приложения
 let appState = {
-    files: new Map(),
     selectedFileId: null,
+    selectedFile: null,
     scanning: false,
+    paused: false,
+    watching: false,
     startTime: null,
     timerInterval: null
 };
 
+// Список результатов виртуальный: строки хранятся в Python (get_results),
+// в DOM - только видимые, страницы подгружаются при прокрутке
+const ROW_HEIGHT = 76;
+const LIST_PAGE = 200;
+const LIST_OVERSCAN = 10;
+// Сколько строк держать в кеше (остальные запрашиваются заново)
+const LIST_CACHE_ROWS = LIST_PAGE * 10;
+const LIST_REFRESH_MS = 300;
+
+const LIST_TITLES = {
+    threats: '🎯 DETECTED THREATS',
+    all: '📂 ALL SCANNED FILES',
+    clean: '✅ CLEAN FILES'
+};
+
+let listState = {
+    filter: 'threats',
+    sort: 'scanned',
+    total: 0,
+    rows: new Map(),
+    loading: new Set(),
+    // Ответы на запросы до сброса списка отбрасываются
+    generation: 0,
+    refreshTimer: null,
+    renderPending: false
+};
+
 async function checkForUpdates() {
     try {
         logMessage('info', 'Checking for updates...');
@@ -134,6 +163,29 @@ document.addEventListener('DOMContentLoaded', () => {
     logMessage('info', 'Detecting: LiquidBounce, Wurst, Impact, Meteor, and 60+ more clients');
 });
 
+// Проверяем, есть ли приостановленное сканирование, когда API готово
+window.addEventListener('pywebviewready', async () => {
+    try {
+        const paused = await pywebview.api.get_paused_scan();
+        if (paused.success) {
+            onScanPaused();
+            logMessage('info', `Paused ${paused.mode.toUpperCase()} scan found: ${paused.scanned} file(s) scanned. Click RESUME SCAN to continue`);
+        }
+    } catch (error) {
+        // API недоступно - паузы нет
+    }
+    
+    try {
+        const watch = await pywebview.api.get_watch_status();
+        setWatchControls(watch.watching);
+    } catch (error) {
+        // API недоступно - наблюдение выключено
+    }
+    
+    // Результаты приостановленного сканирования уже лежат в хранилище
+    reloadList();
+});
+
 // Matrix Rain Effect
 function initMatrixBackground() {
     const canvas = document.getElementById('matrix-canvas');
@@ -177,19 +229,42 @@ function initMatrixBackground() {
 function initEventListeners() {
     document.getElementById('btn-start-scan').addEventListener('click', startScan);
     document.getElementById('btn-stop-scan').addEventListener('click', stopScan);
+    document.getElementById('btn-pause-scan').addEventListener('click', togglePause);
+    document.getElementById('btn-watch').addEventListener('click', toggleWatch);
     document.getElementById('btn-clear-threats').addEventListener('click', clearThreats);
     document.getElementById('btn-export').addEventListener('click', exportReport);
     document.getElementById('btn-clear-list').addEventListener('click', clearList);
     document.getElementById('btn-clear-console').addEventListener('click', clearConsole);
     document.getElementById('btn-refresh-list').addEventListener('click', refreshList);
+    
+    document.getElementById('list-filter').addEventListener('change', (event) => {
+        listState.filter = event.target.value;
+        document.getElementById('list-title').textContent = LIST_TITLES[listState.filter];
+        resetList();
+        reloadList();
+    });
+    document.getElementById('list-sort').addEventListener('change', (event) => {
+        listState.sort = event.target.value;
+        resetList();
+        reloadList();
+    });
+    
+    document.querySelector('.file-list-container').addEventListener('scroll', scheduleRender);
+    window.addEventListener('resize', scheduleRender);
+    document.getElementById('file-list').addEventListener('click', (event) => {
+        const item = event.target.closest('.file-item');
+        if (item) {
+            selectFile(parseInt(item.dataset.index));
+        }
+    });
 }
 
 async function startScan() {
     const scanMode = document.querySelector('input[name="scan-mode"]:checked').value;
     
     // Очищаем предыдущие результаты
-    appState.files.clear();
-    document.getElementById('file-list').innerHTML = '';
+    resetList();
+    renderList();
     
     try {
         const result = await pywebview.api.start_scan(scanMode);
@@ -198,15 +273,9 @@ async function startScan() {
             appState.scanning = true;
             appState.startTime = Date.now();
             
-            document.getElementById('btn-start-scan').disabled = true;
-            document.getElementById('btn-stop-scan').disabled = false;
-            document.getElementById('progress-container').style.display = 'block';
+            setScanningControls();
             document.getElementById('empty-state').style.display = 'none';
             
-            const statusEl = document.getElementById('app-status');
-            statusEl.textContent = 'SCANNING';
-            statusEl.classList.add('scanning');
-            
             // Запускаем таймер (обновляется через Python)
             // Таймер будет обновляться функцией updateTimer(), вызываемой из Python
         } else {
@@ -217,6 +286,91 @@ async function startScan() {
     }
 }
 
+function setScanningControls() {
+    appState.scanning = true;
+    appState.paused = false;
+    
+    document.getElementById('btn-start-scan').disabled = true;
+    document.getElementById('btn-stop-scan').disabled = false;
+    
+    const pauseBtn = document.getElementById('btn-pause-scan');
+    pauseBtn.disabled = false;
+    pauseBtn.textContent = '⏸️ PAUSE SCAN';
+    
+    document.getElementById('progress-container').style.display = 'block';
+    
+    const statusEl = document.getElementById('app-status');
+    statusEl.textContent = 'SCANNING';
+    statusEl.classList.add('scanning');
+}
+
+async function togglePause() {
+    try {
+        if (appState.paused) {
+            const result = await pywebview.api.resume_scan();
+            if (result.success) {
+                setScanningControls();
+            } else {
+                logMessage('warning', result.message);
+            }
+        } else {
+            document.getElementById('btn-pause-scan').disabled = true;
+            await pywebview.api.pause_scan();
+        }
+    } catch (error) {
+        logMessage('error', `Failed to pause/resume scan: ${error}`);
+    }
+}
+
+function setWatchControls(watching) {
+    appState.watching = watching;
+    
+    const watchBtn = document.getElementById('btn-watch');
+    watchBtn.disabled = false;
+    watchBtn.textContent = watching ? '🛡️ WATCH: ON' : '🛡️ WATCH: OFF';
+    watchBtn.classList.toggle('btn-success', watching);
+    watchBtn.classList.toggle('btn-secondary', !watching);
+}
+
+// Наблюдение за папками Minecraft: новые .jar/.exe проверяются сразу
+async function toggleWatch() {
+    const watchBtn = document.getElementById('btn-watch');
+    watchBtn.disabled = true;
+    
+    try {
+        const result = appState.watching
+            ? await pywebview.api.stop_watch()
+            : await pywebview.api.start_watch();
+        
+        if (result.success) {
+            setWatchControls(!appState.watching);
+        } else {
+            logMessage('warning', result.message);
+            setWatchControls(appState.watching);
+        }
+    } catch (error) {
+        logMessage('error', `Failed to toggle watch mode: ${error}`);
+        setWatchControls(appState.watching);
+    }
+}
+
+// Сканирование приостановлено (вызывается из Python)
+function onScanPaused() {
+    appState.scanning = false;
+    appState.paused = true;
+    
+    document.getElementById('btn-start-scan').disabled = false;
+    document.getElementById('btn-stop-scan').disabled = true;
+    
+    const pauseBtn = document.getElementById('btn-pause-scan');
+    pauseBtn.disabled = false;
+    pauseBtn.textContent = '▶️ RESUME SCAN';
+    
+    const statusEl = document.getElementById('app-status');
+    statusEl.textContent = 'PAUSED';
+    statusEl.classList.remove('scanning');
+}
+
 async function stopScan() {
     try {
         const result = await pywebview.api.stop_scan();
@@ -236,15 +390,9 @@ async function clearThreats() {
         const result = await pywebview.api.clear_threats();
         
         if (result.success) {
-            // Удаляем угрозы из UI
-            const fileList = document.getElementById('file-list');
-            const threatItems = fileList.querySelectorAll('.file-item.threat');
-            threatItems.forEach(item => item.remove());
-            
-            // Проверяем, остались ли файлы
-            if (fileList.children.length === 0) {
-                document.getElementById('empty-state').style.display = 'flex';
-            }
+            // Удалённые угрозы уходят из списка при перезапросе
+            clearDetails();
+            reloadList();
             
             document.getElementById('btn-clear-threats').disabled = true;
             
@@ -260,21 +408,12 @@ async function clearThreats() {
 
 async function exportReport() {
     try {
-        const reportData = {
-            timestamp: new Date().toISOString(),
-            version: '2.4.1',
-            stats: {
-                scanned: parseInt(document.getElementById('stat-scanned').textContent),
-                threats: parseInt(document.getElementById('stat-threats').textContent),
-                clean: parseInt(document.getElementById('stat-clean').textContent),
-                time: document.getElementById('stat-time').textContent
-            },
-            files: Array.from(appState.files.values())
-        };
-        
-        const result = await pywebview.api.export_report(reportData);
+        // Отчёт пишет Python прямо из хранилища результатов; формат - по расширению файла
+        const result = await pywebview.api.export_report({status: listState.filter});
         if (result.success) {
-            logMessage('info', `Report exported successfully`);
+            logMessage('info', `Report exported successfully: ${result.count} result(s)`);
+        } else if (result.message !== 'Export cancelled') {
+            logMessage('error', result.message);
         }
     } catch (error) {
         logMessage('error', `Failed to export report: ${error}`);
@@ -285,17 +424,9 @@ async function clearList() {
     try {
         const result = await pywebview.api.clear_list();
         if (result.success) {
-            appState.files.clear();
-            appState.selectedFileId = null;
-            
-            document.getElementById('file-list').innerHTML = '';
-            document.getElementById('empty-state').style.display = 'flex';
-            document.getElementById('details-container').innerHTML = `
-                <div class="empty-details">
-                    <div class="empty-icon">👆</div>
-                    <p>Select a threat to view details</p>
-                </div>
-            `;
+            resetList();
+            renderList();
+            clearDetails();
             
             document.getElementById('stat-scanned').textContent = '0';
             document.getElementById('stat-threats').textContent = '0';
@@ -311,6 +442,7 @@ async function clearList() {
 
 function refreshList() {
     logMessage('info', 'Refreshing list...');
+    reloadList();
 }
 
 function clearConsole() {
@@ -324,92 +456,220 @@ function clearConsole() {
 }
 
 // UI Update Functions (called from Python)
+
+// Обработчики событий, которые Python присылает пачками
+const batchHandlers = {
+    addLog,
+    updateStats,
+    updateProgress,
+    updateTimer,
+    addFileToList,
+    updateFileStatus,
+    updateDownloadProgress,
+    onScanComplete,
+    onScanPaused
+};
+
+// Применить пачку событий [[handler, args], ...] за один вызов evaluate_js
+function applyBatch(events) {
+    for (const [handler, args] of events) {
+        const fn = batchHandlers[handler];
+        if (fn) {
+            fn(...args);
+        }
+    }
+}
+
+// Новая угроза (вызывается из Python): список перезапрашивается не чаще раза в LIST_REFRESH_MS
 function addFileToList(fileData) {
-    appState.files.set(fileData.id, fileData);
-    
-    document.getElementById('empty-state').style.display = 'none';
-    
-    const fileList = document.getElementById('file-list');
-    const fileItem = document.createElement('div');
-    fileItem.className = 'file-item scanning';
-    fileItem.dataset.fileId = fileData.id;
-    fileItem.innerHTML = `
-        <div class="file-icon">⏳</div>
-        <div class="file-info">
-            <div class="file-name">${fileData.name}</div>
-            <div class="file-path">${fileData.path}</div>
-        </div>
-        <div class="file-status">
-            <span class="status-badge scanning">scanning</span>
-        </div>
-    `;
-    
-    fileItem.addEventListener('click', () => selectFile(fileData.id));
-    fileList.appendChild(fileItem);
+    scheduleListRefresh();
 }
 
 function updateFileStatus(fileId, status, result) {
-    const fileItem = document.querySelector(`[data-file-id="${fileId}"]`);
-    if (!fileItem) return;
-    
-    fileItem.className = `file-item ${status}`;
-    
-    const icon = fileItem.querySelector('.file-icon');
-    const badge = fileItem.querySelector('.status-badge');
-    
-    switch (status) {
-        case 'scanning':
-            icon.textContent = '⏳';
-            badge.className = 'status-badge scanning';
-            badge.textContent = 'scanning';
-            break;
-        case 'threat':
-            icon.textContent = '🦠';
-            badge.className = 'status-badge threat';
-            badge.textContent = 'THREAT';
-            
-            // Добавляем индикатор запущенного процесса
-            if (result && result.isRunning) {
-                badge.innerHTML = 'THREAT <span style="color: #ff0000;">●</span> RUNNING';
+    for (const row of listState.rows.values()) {
+        if (row.id === fileId) {
+            row.status = status;
+            if (result) {
+                row.result = result;
             }
-            break;
-        case 'clean':
-            icon.textContent = '✅';
-            badge.className = 'status-badge clean';
-            badge.textContent = 'clean';
-            break;
-        case 'error':
-            icon.textContent = '❌';
-            badge.className = 'status-badge pending';
-            badge.textContent = 'error';
-            break;
+        }
     }
+    scheduleRender();
     
-    if (result) {
-        const file = appState.files.get(fileId);
-        if (file) {
-            file.result = result;
-            file.status = status;
-            
-            if (appState.selectedFileId === fileId) {
-                showFileDetails(file);
-            }
+    if (result && appState.selectedFileId === fileId && appState.selectedFile) {
+        appState.selectedFile.status = status;
+        appState.selectedFile.result = result;
+        showFileDetails(appState.selectedFile);
+    }
+}
+
+// Сбросить загруженные строки (смена фильтра, новое сканирование, очистка)
+function resetList() {
+    listState.generation++;
+    listState.total = 0;
+    listState.rows = new Map();
+    listState.loading = new Set();
+    document.querySelector('.file-list-container').scrollTop = 0;
+}
+
+// Перезапросить видимую часть списка; старые строки показываются, пока не придут новые
+function reloadList() {
+    listState.generation++;
+    listState.loading = new Set();
+    loadRows(firstVisibleRow(), true);
+}
+
+function scheduleListRefresh() {
+    if (listState.refreshTimer) return;
+    listState.refreshTimer = setTimeout(() => {
+        listState.refreshTimer = null;
+        reloadList();
+    }, LIST_REFRESH_MS);
+}
+
+function scheduleRender() {
+    if (listState.renderPending) return;
+    listState.renderPending = true;
+    requestAnimationFrame(() => {
+        listState.renderPending = false;
+        renderList();
+    });
+}
+
+function firstVisibleRow() {
+    const container = document.querySelector('.file-list-container');
+    return Math.max(0, Math.floor(container.scrollTop / ROW_HEIGHT) - LIST_OVERSCAN);
+}
+
+async function loadRows(index, replace = false) {
+    const offset = Math.floor(index / LIST_PAGE) * LIST_PAGE;
+    if (listState.loading.has(offset)) return;
+    listState.loading.add(offset);
+    const generation = listState.generation;
+    
+    try {
+        const page = await pywebview.api.get_results(offset, LIST_PAGE, listState.filter, listState.sort);
+        if (generation !== listState.generation) return;
+        listState.loading.delete(offset);
+        if (!page.success) {
+            logMessage('warning', page.message);
+            return;
+        }
+        
+        if (replace) {
+            listState.rows = new Map();
+        }
+        listState.total = page.total;
+        page.rows.forEach((row, i) => listState.rows.set(offset + i, row));
+        trimRowCache(offset);
+        renderList();
+    } catch (error) {
+        listState.loading.delete(offset);
+        logMessage('error', `Failed to load results: ${error}`);
+    }
+}
+
+// Забыть строки далеко от текущей страницы, чтобы кеш не рос с прокруткой
+function trimRowCache(offset) {
+    if (listState.rows.size <= LIST_CACHE_ROWS) return;
+    for (const index of listState.rows.keys()) {
+        if (Math.abs(index - offset) > LIST_CACHE_ROWS / 2) {
+            listState.rows.delete(index);
         }
     }
 }
 
+function renderList() {
+    const container = document.querySelector('.file-list-container');
+    const fileList = document.getElementById('file-list');
+    
+    fileList.style.height = `${listState.total * ROW_HEIGHT}px`;
+    document.getElementById('empty-state').style.display = listState.total === 0 ? 'flex' : 'none';
+    
+    const first = firstVisibleRow();
+    const last = Math.min(
+        listState.total,
+        Math.ceil((container.scrollTop + container.clientHeight) / ROW_HEIGHT) + LIST_OVERSCAN
+    );
+    
+    const fragment = document.createDocumentFragment();
+    let missing = -1;
+    for (let index = first; index < last; index++) {
+        const row = listState.rows.get(index);
+        if (row) {
+            fragment.appendChild(createRowElement(row, index));
+        } else if (missing < 0) {
+            missing = index;
+        }
+    }
+    fileList.replaceChildren(fragment);
+    
+    if (missing >= 0) {
+        loadRows(missing);
+    }
+}
+
+function createRowElement(row, index) {
+    const item = document.createElement('div');
+    item.className = `file-item ${row.status}`;
+    if (row.id === appState.selectedFileId) {
+        item.classList.add('selected');
+    }
+    item.dataset.index = index;
+    item.style.top = `${index * ROW_HEIGHT}px`;
+    
+    const icon = document.createElement('div');
+    icon.className = 'file-icon';
+    icon.textContent = row.status === 'threat' ? '🦠' : '✅';
+    
+    const info = document.createElement('div');
+    info.className = 'file-info';
+    const name = document.createElement('div');
+    name.className = 'file-name';
+    name.textContent = row.name;
+    const path = document.createElement('div');
+    path.className = 'file-path';
+    path.textContent = row.path;
+    info.append(name, path);
+    
+    const status = document.createElement('div');
+    status.className = 'file-status';
+    const badge = document.createElement('span');
+    badge.className = `status-badge ${row.status}`;
+    badge.textContent = row.status === 'threat' ? 'THREAT' : 'clean';
+    // Индикатор запущенного процесса
+    if (row.result && row.result.isRunning) {
+        const dot = document.createElement('span');
+        dot.style.color = '#ff0000';
+        dot.textContent = ' ● ';
+        badge.append(dot, 'RUNNING');
+    }
+    status.appendChild(badge);
+    
+    item.append(icon, info, status);
+    return item;
+}
+
 function updateStats(scanned, threats, clean) {
     document.getElementById('stat-scanned').textContent = scanned;
     document.getElementById('stat-threats').textContent = threats;
     document.getElementById('stat-clean').textContent = clean;
     
     document.getElementById('btn-clear-threats').disabled = threats === 0;
+    
+    // Угрозы приходят через addFileToList, чистые файлы - только через статистику
+    if (appState.scanning && listState.filter !== 'threats') {
+        scheduleListRefresh();
+    }
 }
 
-function updateProgress(percent, fileName) {
+function updateProgress(percent, fileName, eta) {
     document.getElementById('progress-fill').style.width = `${percent}%`;
     document.getElementById('progress-percent').textContent = `${Math.round(percent)}%`;
-    document.getElementById('progress-text').textContent = fileName;
+    
+    // ETA приходит из Python, когда известно общее количество файлов
+    const etaText = (eta !== null && eta !== undefined) ? ` (ETA ${formatTime(eta * 1000)})` : '';
+    document.getElementById('progress-text').textContent = fileName + etaText;
 }
 
 // Функция обновления таймера (вызывается из Python)
@@ -419,10 +679,15 @@ function updateTimer(elapsed) {
 
 function onScanComplete() {
     appState.scanning = false;
+    appState.paused = false;
     
     document.getElementById('btn-start-scan').disabled = false;
     document.getElementById('btn-stop-scan').disabled = true;
     
+    const pauseBtn = document.getElementById('btn-pause-scan');
+    pauseBtn.disabled = true;
+    pauseBtn.textContent = '⏸️ PAUSE SCAN';
+    
     const statusEl = document.getElementById('app-status');
     statusEl.textContent = 'READY';
     statusEl.classList.remove('scanning');
@@ -432,22 +697,36 @@ function onScanComplete() {
     }, 2000);
 }
 
-function selectFile(fileId) {
-    document.querySelectorAll('.file-item').forEach(item => {
-        item.classList.remove('selected');
-    });
+function selectFile(index) {
+    const file = listState.rows.get(index);
+    if (!file) return;
     
-    const fileItem = document.querySelector(`[data-file-id="${fileId}"]`);
-    if (fileItem) {
-        fileItem.classList.add('selected');
+    appState.selectedFileId = file.id;
+    appState.selectedFile = file;
+    scheduleRender();
+    showFileDetails(file);
+}
+
+function clearDetails() {
+    appState.selectedFileId = null;
+    appState.selectedFile = null;
+    document.getElementById('details-container').innerHTML = `
+        <div class="empty-details">
+            <div class="empty-icon">👆</div>
+            <p>Select a threat to view details</p>
+        </div>
+    `;
+}
+
+// Файл для действий из панели деталей: выбранный или из загруженных строк
+function findFile(fileId) {
+    if (appState.selectedFile && appState.selectedFile.id === fileId) {
+        return appState.selectedFile;
     }
-    
-    appState.selectedFileId = fileId;
-    const file = appState.files.get(fileId);
-    
-    if (file) {
-        showFileDetails(file);
+    for (const row of listState.rows.values()) {
+        if (row.id === fileId) return row;
     }
+    return null;
 }
 
 function showFileDetails(file) {
@@ -533,17 +812,12 @@ function showFileDetails(file) {
 }
 
 async function quarantineFile(fileId) {
-    const file = appState.files.get(fileId);
+    const file = findFile(fileId);
     if (!file) return;
     
     try {
         const result = await pywebview.api.quarantine_file(file.path);
         if (result.success) {
-            const fileItem = document.querySelector(`[data-file-id="${fileId}"]`);
-            if (fileItem) fileItem.remove();
-            
-            appState.files.delete(fileId);
-            
             const threats = parseInt(document.getElementById('stat-threats').textContent);
             updateStats(
                 parseInt(document.getElementById('stat-scanned').textContent),
@@ -551,12 +825,8 @@ async function quarantineFile(fileId) {
                 parseInt(document.getElementById('stat-clean').textContent)
             );
             
-            document.getElementById('details-container').innerHTML = `
-                <div class="empty-details">
-                    <div class="empty-icon">👆</div>
-                    <p>Select a threat to view details</p>
-                </div>
-            `;
+            clearDetails();
+            reloadList();
         }
     } catch (error) {
         logMessage('error', `Failed to quarantine file: ${error}`);
@@ -564,7 +834,7 @@ async function quarantineFile(fileId) {
 }
 
 async function deleteFile(fileId) {
-    const file = appState.files.get(fileId);
+    const file = findFile(fileId);
     if (!file) return;
     
     if (!confirm(`Delete ${file.name} and kill its process?`)) {
@@ -574,11 +844,6 @@ async function deleteFile(fileId) {
     try {
         const result = await pywebview.api.delete_file(file.path);
         if (result.success) {
-            const fileItem = document.querySelector(`[data-file-id="${fileId}"]`);
-            if (fileItem) fileItem.remove();
-            
-            appState.files.delete(fileId);
-            
             const threats = parseInt(document.getElementById('stat-threats').textContent);
             updateStats(
                 parseInt(document.getElementById('stat-scanned').textContent),
@@ -586,12 +851,8 @@ async function deleteFile(fileId) {
                 parseInt(document.getElementById('stat-clean').textContent)
             );
             
-            document.getElementById('details-container').innerHTML = `
-                <div class="empty-details">
-                    <div class="empty-icon">👆</div>
-                    <p>Select a threat to view details</p>
-                </div>
-            `;
+            clearDetails();
+            reloadList();
         } else {
             alert(result.message);
         }